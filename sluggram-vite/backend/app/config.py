@@ -11,6 +11,10 @@ class Settings(BaseSettings):
     auth0_domain: str = ""
     auth0_api_audience: str = ""
     auth0_algorithms: str = "RS256"
+    auth0_jwks_url: str = ""  # Defaults to https://{auth0_domain}/.well-known/jwks.json
+    jwks_refresh_interval: int = 3600  # seconds
+    jwks_min_refetch_interval: int = 30  # seconds between unknown-kid refetches
+    admin_user_ids: str = ""  # comma-separated Auth0 user ids allowed on /api/admin
 
     # Cloudinary (optional - for cloud file storage)
     cloudinary_cloud_name: str = ""
@@ -20,6 +24,42 @@ class Settings(BaseSettings):
     # App settings
     upload_dir: str = "uploads"
     max_file_size: int = 100 * 1024 * 1024  # 100MB
+    max_image_size: int = 10 * 1024 * 1024  # 10MB
+    upload_session_ttl: int = 24 * 3600  # seconds of inactivity before expiry
+    upload_session_cleanup_interval: int = 3600  # seconds
+    image_workers: int = 2  # processes generating resized image variants
+    image_queue_size: int = 100
+    comment_preview_size: int = 3  # Latest comments embedded on each post
+    event_timezone: str = "America/Los_Angeles"  # zone of event dates entered as text
+    trending_half_life: int = 6 * 3600  # seconds for an engagement's weight to halve
+    trending_decay_interval: int = 300  # seconds between re-decay passes
+    search_recency_half_life: int = 30 * 86400  # seconds; a post this much older needs twice the text score
+    stream_queue_size: int = 64  # events buffered per live connection before it is dropped
+    stream_max_connections: int = 10000  # live connections per worker
+    stream_heartbeat: int = 15  # seconds between keep-alive comments on idle streams
+    like_buffer: bool = False  # write likes behind, batched, instead of one update each
+    like_buffer_interval: float = 0.01  # seconds between flushes of buffered likes
+    like_buffer_max_ops: int = 1000  # flush early once this many likes are waiting
+
+    # Metrics
+    metrics_enabled: bool = True  # request, MongoDB and event loop metrics at /api/metrics
+    slow_query_ms: int = 100  # MongoDB commands slower than this are logged
+    loop_lag_interval: float = 0.5  # seconds between event loop lag samples
+
+    # Profiling
+    profiling_enabled: bool = False  # per-request profiling; off installs nothing
+    profile_sample_rate: int = 0  # also profile 1 in N requests; 0 only when asked
+    profile_interval: float = 0.001  # seconds between stack samples
+    profile_buffer_size: int = 50  # recent profiles kept for /api/admin/profiles
+
+    # Caches
+    profile_cache_size: int = 10000
+    profile_cache_ttl: int = 300  # seconds
+    token_cache_size: int = 10000
+    feed_cache_backend: str = "memory"  # memory, redis or none
+    feed_cache_url: str = "redis://localhost:6379/0"  # for the redis backend
+    feed_cache_size: int = 1000  # pages, memory backend only
+    feed_cache_ttl: int = 30  # seconds
 
     class Config:
         env_file = ".env"
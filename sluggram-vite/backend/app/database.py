@@ -1,5 +1,7 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from .config import get_settings
+from .indexes import sync_indexes
+from .utils.metrics import mongo_listeners
 
 settings = get_settings()
 
@@ -14,14 +16,12 @@ db = Database()
 
 async def connect_to_mongo():
     """Connect to MongoDB."""
-    db.client = AsyncIOMotorClient(settings.mongodb_url)
+    db.client = AsyncIOMotorClient(settings.mongodb_url, event_listeners=mongo_listeners())
     db.db = db.client[settings.database_name]
 
-    # Create indexes for better performance
-    await db.db.users.create_index("auth0_id", unique=True)
-    await db.db.posts.create_index("author_id")
-    await db.db.posts.create_index("created_at")
-    await db.db.posts.create_index("type")
+    # Only builds missing indexes; changing or removing one is done once per
+    # deploy with scripts/sync_indexes.py
+    await sync_indexes(db.db, reconcile=False)
 
     print(f"Connected to MongoDB: {settings.database_name}")
 
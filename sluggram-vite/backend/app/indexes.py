@@ -0,0 +1,176 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+# Every index the app relies on, by collection. sync_indexes makes the
+# database match this: missing indexes are built and any others dropped,
+# so an index is added or removed here and nowhere else.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("auth0_id", ASCENDING)], unique=True),
+    ],
+    "posts": [
+        # Cursor pagination, newest first with an _id tie-break: the feed,
+        # the feed by type and a user's posts
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("author_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        # Posts using a media blob, for refcounts and image variants
+        IndexModel([("blob_ids", ASCENDING)]),
+        # Upcoming events in start order; only event posts are indexed
+        IndexModel(
+            [("event_starts_at", ASCENDING), ("_id", ASCENDING)],
+            partialFilterExpression={"type": "event"},
+        ),
+        # Study group discovery by normalized course and open seats
+        IndexModel(
+            [
+                ("course_key", ASCENDING),
+                ("has_space", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ],
+            partialFilterExpression={"type": "study"},
+        ),
+        # Trending feed; posts nobody engaged with recently stay out of it
+        IndexModel(
+            [("trending_score", DESCENDING), ("_id", DESCENDING)],
+            partialFilterExpression={"trending_score": {"$gt": 0}},
+        ),
+        # Full-text search; titles, group names and courses outrank body text
+        IndexModel(
+            [
+                ("content", TEXT),
+                ("event_title", TEXT),
+                ("event_location", TEXT),
+                ("group_name", TEXT),
+                ("course", TEXT),
+            ],
+            weights={
+                "event_title": 10,
+                "group_name": 10,
+                "course": 10,
+                "event_location": 3,
+                "content": 1,
+            },
+            name="post_search",
+        ),
+    ],
+    "comments": [
+        IndexModel([("post_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "saves": [
+        # One save per user and post; a user's saves in save order
+        IndexModel([("user_id", ASCENDING), ("post_id", ASCENDING)], unique=True),
+        IndexModel([("user_id", ASCENDING), ("saved_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("post_id", ASCENDING)]),
+    ],
+    "blobs": [
+        # Finds unreferenced media for cleanup
+        IndexModel([("refcount", ASCENDING), ("created_at", ASCENDING)]),
+    ],
+    # Keyed by course; _id is all it needs
+    "course_counts": [],
+}
+
+# Index options that change what an index holds or enforces
+INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+# Server error code for dropping an index that doesn't exist
+INDEX_NOT_FOUND = 27
+
+
+def index_spec(index: dict) -> tuple:
+    """What makes two index definitions the same, from either an IndexModel
+    document or the server's index_information().
+
+    The server stores a text index's fields as weights under a generic
+    _fts/_ftsx key, so text fields are compared by their weights.
+    """
+    fields = index["key"].items() if isinstance(index["key"], dict) else index["key"]
+    weights = dict(index.get("weights") or {})
+    key = []
+    for field, kind in fields:
+        if kind == TEXT:
+            weights.setdefault(field, 1)
+        elif field not in ("_fts", "_ftsx"):
+            key.append((field, kind if isinstance(kind, str) else int(kind)))
+    options = {option: index[option] for option in INDEX_OPTIONS if index.get(option)}
+    return key, weights, options
+
+
+async def drop_index(collection, name: str):
+    """Drop an index, unless another process already dropped it."""
+    try:
+        await collection.drop_index(name)
+    except OperationFailure as e:
+        if e.code != INDEX_NOT_FOUND:
+            raise
+
+
+async def sync_collection_indexes(collection, models: List[IndexModel], reconcile: bool) -> dict:
+    """Make one collection's indexes match `models`.
+
+    Missing indexes are built together in one createIndexes command. With
+    reconcile, indexes whose definition changed are dropped and rebuilt
+    and unlisted ones are dropped once the new ones are ready; without it,
+    they are only reported.
+    """
+    existing = await collection.index_information()
+    wanted = {model.document["name"]: model for model in models}
+
+    changed = [
+        name
+        for name, model in wanted.items()
+        if name in existing and index_spec(existing[name]) != index_spec(model.document)
+    ]
+    stale = [name for name in existing if name != "_id_" and name not in wanted]
+    if reconcile:
+        for name in changed:
+            await drop_index(collection, name)
+
+    rebuilt = changed if reconcile else []
+    missing = [model for name, model in wanted.items() if name not in existing or name in rebuilt]
+    if missing:
+        await collection.create_indexes(missing)
+
+    if reconcile:
+        for name in stale:
+            await drop_index(collection, name)
+
+    return {
+        "created": [model.document["name"] for model in missing],
+        "dropped": stale if reconcile else [],
+        "changed": [] if reconcile else changed,
+        "stale": [] if reconcile else stale,
+    }
+
+
+async def sync_indexes(
+    db,
+    collections: Optional[Iterable[str]] = None,
+    reconcile: bool = True,
+):
+    """Build missing indexes, all collections concurrently.
+
+    reconcile also rebuilds changed indexes and drops stale ones. Only
+    scripts/sync_indexes.py does that: with several workers starting at
+    once, or old and new versions running side by side during a deploy,
+    each would otherwise drop indexes the others rely on or just rebuilt.
+    """
+    names = list(collections or INDEXES)
+    results = await asyncio.gather(
+        *(sync_collection_indexes(db[name], INDEXES[name], reconcile) for name in names)
+    )
+    for name, result in zip(names, results):
+        if result["created"]:
+            print(f"Built indexes on {name}: {', '.join(result['created'])}")
+        if result["dropped"]:
+            print(f"Dropped stale indexes on {name}: {', '.join(result['dropped'])}")
+        if result["changed"] or result["stale"]:
+            print(
+                f"Indexes on {name} differ from app/indexes.py "
+                f"({', '.join(result['changed'] + result['stale'])}); "
+                "run python -m scripts.sync_indexes"
+            )
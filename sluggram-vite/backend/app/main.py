@@ -1,15 +1,57 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
-from .database import connect_to_mongo, close_mongo_connection
-from .routers import users_router, posts_router, upload_router
+import asyncio
+from .config import get_settings
+from .database import connect_to_mongo, close_mongo_connection, get_database
+from .routers import (
+    users_router,
+    posts_router,
+    upload_router,
+    resumable_upload_router,
+    admin_router,
+)
+from .routers.resumable import session_cleanup_loop
+from .utils.auth import is_auth_configured, jwks_provider, token_cache
+from .utils.feed_cache import feed_cache
+from .utils.images import image_pipeline
+from .utils.like_buffer import like_buffer
+from .utils.metrics import CONTENT_TYPE, MetricsMiddleware, event_loop_lag_loop, render_metrics
+from .utils.pagination import NEXT_CURSOR_HEADER
+from .utils.profiles import profile_cache
+from .utils.profiling import PROFILE_ID_HEADER, ProfilingMiddleware
+from .utils.stream import broker
+from .utils.trending import trending_decay_loop
+
+settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events."""
     await connect_to_mongo()
+    if is_auth_configured():
+        await jwks_provider.start()
+    session_cleanup = asyncio.create_task(session_cleanup_loop())
+    trending_decay = asyncio.create_task(trending_decay_loop(get_database()))
+    loop_lag = asyncio.create_task(event_loop_lag_loop()) if settings.metrics_enabled else None
+    await image_pipeline.start(get_database())
+    if like_buffer:
+        await like_buffer.start(get_database())
     yield
+    broker.close()
+    if like_buffer:
+        await like_buffer.stop()
+    await image_pipeline.stop()
+    # Let a cleanup or decay pass in flight unwind before the client closes
+    background = [task for task in (session_cleanup, trending_decay, loop_lag) if task]
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await jwks_provider.stop()
+    if feed_cache:
+        await feed_cache.close()
     await close_mongo_connection()
 
 
@@ -31,12 +73,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        NEXT_CURSOR_HEADER, "Location", "Upload-Offset", "Upload-Length", PROFILE_ID_HEADER,
+    ],
 )
 
+# Not installed at all unless enabled, so it costs nothing when off
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so request timings include every other middleware
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(users_router, prefix="/api")
 app.include_router(posts_router, prefix="/api")
 app.include_router(upload_router, prefix="/api")
+app.include_router(resumable_upload_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
 
 
 @app.get("/")
@@ -52,4 +107,20 @@ async def root():
 @app.get("/api/health")
 async def health_check():
     """API health check."""
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "caches": {
+            "profiles": profile_cache.stats(),
+            "tokens": token_cache.stats(),
+            "feed": feed_cache.stats() if feed_cache else None,
+        },
+        "image_pipeline": image_pipeline.stats(),
+        "stream": broker.stats(),
+        "like_buffer": like_buffer.stats() if like_buffer else None,
+    }
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request, MongoDB and event loop metrics in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
@@ -1,3 +1,5 @@
 from .users import router as users_router
 from .posts import router as posts_router
 from .upload import router as upload_router
+from .resumable import router as resumable_upload_router
+from .admin import router as admin_router
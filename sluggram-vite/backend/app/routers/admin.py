@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+from ..schemas import ProfileSummary
+from ..utils.auth import get_admin_user
+from ..utils.profiling import profile_store
+from ..utils.serialization import json_response
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(get_admin_user)])
+
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+async def list_profiles():
+    """List the recently recorded request profiles, newest first."""
+    return json_response([profile.summary() for profile in profile_store.list()])
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str):
+    """Download a request profile in speedscope format."""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+
+    response = json_response(profile.to_speedscope())
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename="profile-{profile_id}.speedscope.json"'
+    )
+    return response
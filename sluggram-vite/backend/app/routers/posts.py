@@ -1,16 +1,109 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from bson import ObjectId
-from typing import List, Optional
+from pymongo.errors import DuplicateKeyError
+from typing import List, Literal, Optional, Union
+from ..config import get_settings
 from ..database import get_database
-from ..schemas import PostCreate, PostUpdate, PostResponse, CommentCreate
-from ..utils.auth import get_current_user
+from ..schemas import (
+    PostCreate,
+    PostUpdate,
+    PostResponse,
+    PostSummary,
+    CommentCreate,
+    Comment,
+    CourseFacet,
+    BatchRequest,
+    PostBatchResponse,
+    PostSummaryBatchResponse,
+)
+from ..utils.auth import get_current_user, get_optional_user
+from ..utils.comments import copy_embedded_comments
+from ..utils.events import to_utc_naive
+from ..utils.feed_cache import ALL_POSTS, feed_cache
+from ..utils.like_buffer import like_buffer
+from ..utils.pagination import (
+    NEXT_CURSOR_HEADER,
+    after_cursor,
+    aggregate_page,
+    fetch_page,
+    split_page,
+)
+from ..utils.profiles import AuthorLoader, get_author_loader
+from ..utils.serialization import encoded_json_response, json_response
+from ..utils.storage import add_blob_refs, blob_ids_from_urls
+from ..utils.stream import broker, event_stream
+from ..utils.study_groups import HAS_SPACE_STAGE, normalize_course, update_course_counts
+from ..utils.trending import TRENDING_WEIGHTS, toggle_trending_stage, trending_stage
 
 router = APIRouter(prefix="/posts", tags=["posts"])
+settings = get_settings()
+
+# Only the fields post_helper reads, so feeds don't ship blob ids, update
+# timestamps and other internal fields from Mongo. A legacy saved_by array
+# is read only to count it.
+POST_PROJECTION = {
+    field: 1
+    for field in (
+        "type", "author_id", "author_name", "author_avatar", "content",
+        "image_url", "image_variants", "video_url", "likes", "comments",
+        "members", "saved_by", "like_count", "comment_count", "member_count",
+        "save_count", "created_at", "event_title", "event_date", "event_time",
+        "event_starts_at", "event_location", "group_name", "course",
+        "meeting_time", "study_location", "max_members",
+    )
+}
+
+VIEW_DESCRIPTION = "full: id arrays; summary: counts and the viewer's own flags"
+
+# Arrays that view=summary reduces to a count and a flag for the viewer,
+# as (array, count field, flag). Saves live in their own collection, so
+# saved_by_me is filled in by mark_saved instead.
+SUMMARY_ARRAYS = (
+    ("likes", "like_count", "liked_by_me"),
+    ("members", "member_count", "joined_by_me"),
+)
 
 
 def post_helper(post) -> dict:
     """Convert MongoDB post document to response format."""
+    likes = post.get("likes", [])
+    comments = [embedded_comment_helper(c) for c in post.get("comments", [])]
+    members = post.get("members", [])
+    return {
+        "id": str(post["_id"]),
+        "type": post["type"],
+        "author_id": post["author_id"],
+        "author_name": post["author_name"],
+        "author_avatar": post.get("author_avatar"),
+        "content": post["content"],
+        "image_url": post.get("image_url"),
+        "image_variants": variants_helper(post.get("image_variants")),
+        "video_url": post.get("video_url"),
+        "likes": likes,
+        "comments": comments,
+        "members": members,
+        "like_count": post.get("like_count", len(likes)),
+        "comment_count": post.get("comment_count", len(comments)),
+        "member_count": post.get("member_count", len(members)),
+        "save_count": post.get("save_count", len(post.get("saved_by", []))),
+        "created_at": post["created_at"],
+        "event_title": post.get("event_title"),
+        "event_date": post.get("event_date"),
+        "event_time": post.get("event_time"),
+        "event_starts_at": post.get("event_starts_at"),
+        "event_location": post.get("event_location"),
+        "group_name": post.get("group_name"),
+        "course": post.get("course"),
+        "meeting_time": post.get("meeting_time"),
+        "study_location": post.get("study_location"),
+        "max_members": post.get("max_members"),
+    }
+
+
+def summary_helper(post) -> dict:
+    """Convert a post fetched with summary_projection to summary format."""
     return {
         "id": str(post["_id"]),
         "type": post["type"],
@@ -19,15 +112,21 @@ def post_helper(post) -> dict:
         "author_avatar": post.get("author_avatar"),
         "content": post["content"],
         "image_url": post.get("image_url"),
+        "image_variants": variants_helper(post.get("image_variants")),
         "video_url": post.get("video_url"),
-        "likes": post.get("likes", []),
-        "comments": post.get("comments", []),
-        "members": post.get("members", []),
-        "saved_by": post.get("saved_by", []),
+        "comments": [embedded_comment_helper(c) for c in post.get("comments", [])],
+        "like_count": post["like_count"],
+        "comment_count": post["comment_count"],
+        "member_count": post["member_count"],
+        "save_count": post["save_count"],
+        "liked_by_me": post["liked_by_me"],
+        "saved_by_me": post["saved_by_me"],
+        "joined_by_me": post["joined_by_me"],
         "created_at": post["created_at"],
         "event_title": post.get("event_title"),
         "event_date": post.get("event_date"),
         "event_time": post.get("event_time"),
+        "event_starts_at": post.get("event_starts_at"),
         "event_location": post.get("event_location"),
         "group_name": post.get("group_name"),
         "course": post.get("course"),
@@ -37,32 +136,207 @@ def post_helper(post) -> dict:
     }
 
 
-@router.get("/", response_model=List[PostResponse])
+def summary_projection(viewer_id: Optional[str]) -> dict:
+    """$project stage that replaces the id arrays with counts and viewer flags.
+
+    The counts and membership checks are evaluated by MongoDB, so the arrays
+    never leave the server. Counters predating the maintained *_count fields
+    fall back to the array size.
+    """
+    projection = {
+        field: 1
+        for field in POST_PROJECTION
+        if field not in ("likes", "members", "saved_by")
+    }
+    for array, count_field, flag in SUMMARY_ARRAYS:
+        values = {"$ifNull": [f"${array}", []]}
+        projection[count_field] = {"$ifNull": [f"${count_field}", {"$size": values}]}
+        projection[flag] = {"$in": [{"$literal": viewer_id}, values]}
+    projection["save_count"] = {
+        "$ifNull": ["$save_count", {"$size": {"$ifNull": ["$saved_by", []]}}]
+    }
+    projection["comment_count"] = {
+        "$ifNull": ["$comment_count", {"$size": {"$ifNull": ["$comments", []]}}]
+    }
+    return projection
+
+
+def variants_helper(variants) -> Optional[dict]:
+    """Convert a post's stored image variants to response format."""
+    return variants and {
+        name: {
+            "width": v["width"],
+            "height": v["height"],
+            "webp": v["webp"],
+            "jpeg": v["jpeg"],
+        }
+        for name, v in variants.items()
+    }
+
+
+def embedded_comment_helper(comment) -> dict:
+    """Convert a comment embedded in a post to response format."""
+    return {
+        "id": comment["id"],
+        "author_id": comment["author_id"],
+        "author_name": comment["author_name"],
+        "text": comment["text"],
+        "created_at": comment["created_at"],
+    }
+
+
+def comment_helper(comment) -> dict:
+    """Convert MongoDB comment document to response format."""
+    return {
+        "id": str(comment["_id"]),
+        "author_id": comment["author_id"],
+        "author_name": comment["author_name"],
+        "text": comment["text"],
+        "created_at": comment["created_at"],
+    }
+
+
+def post_response(post, status_code: int = status.HTTP_200_OK):
+    """Serialize a single post through the fast JSON path."""
+    return json_response(post_helper(post), status_code)
+
+
+def posts_response(posts, next_cursor: Optional[str] = None, view: str = "full"):
+    """Serialize a page of posts through the fast JSON path."""
+    helper = summary_helper if view == "summary" else post_helper
+    return json_response([helper(post) for post in posts], next_cursor=next_cursor)
+
+
+async def fetch_posts_page(
+    db,
+    query: dict,
+    limit: int,
+    cursor: Optional[str],
+    view: str,
+    viewer: Optional[dict],
+    field: str = "created_at",
+    direction: int = -1,
+    ranked: bool = False,
+):
+    """Fetch and serialize one page of posts in the requested view."""
+    # The sort field has to come back for the next page's cursor
+    if view == "summary":
+        project = {**summary_projection(viewer["sub"] if viewer else None), field: 1}
+        posts, next_cursor = await aggregate_page(
+            db.posts, query, limit, cursor, field,
+            project=project, direction=direction, ranked=ranked,
+        )
+        await mark_saved(db, posts, viewer)
+    else:
+        projection = {**POST_PROJECTION, field: 1}
+        posts, next_cursor = await fetch_page(
+            db.posts, query, limit, cursor, field,
+            projection=projection, direction=direction, ranked=ranked,
+        )
+    return posts_response(posts, next_cursor, view)
+
+
+async def mark_saved(db, posts: list, viewer: Optional[dict]):
+    """Set saved_by_me on a page of summary posts with one query on saves."""
+    saved = set()
+    if viewer and posts:
+        cursor = db.saves.find(
+            {"user_id": viewer["sub"], "post_id": {"$in": [post["_id"] for post in posts]}},
+            {"post_id": 1, "_id": 0},
+        )
+        saved = {save["post_id"] async for save in cursor}
+    for post in posts:
+        post["saved_by_me"] = post["_id"] in saved
+
+
+async def load_posts(db, object_ids: list, view: str, viewer: Optional[dict]) -> dict:
+    """Fetch posts by ID in one $in query, keyed by string ID."""
+    match = {"_id": {"$in": object_ids}}
+    if view == "summary":
+        project = summary_projection(viewer["sub"] if viewer else None)
+        found = db.posts.aggregate([{"$match": match}, {"$project": project}])
+    else:
+        found = db.posts.find(match, POST_PROJECTION)
+    posts = [post async for post in found]
+    if view == "summary":
+        await mark_saved(db, posts, viewer)
+    return {str(post["_id"]): post for post in posts}
+
+
+async def invalidate_feeds(post_type: Optional[str]):
+    """Drop cached feed pages that may show a post of post_type."""
+    if feed_cache:
+        await feed_cache.invalidate(post_type)
+
+
+def publish_delta(event: str, post: dict, **fields):
+    """Push a small change to a post to the live streams."""
+    broker.publish(event, post["type"], {"id": str(post["_id"]), "type": post["type"], **fields})
+
+
+def toggle_pipeline(field: str, count_field: str, user_id: str) -> list:
+    """Build an update pipeline that adds or removes user_id from an array.
+
+    The membership check and the write happen server-side in one atomic
+    update, and count_field is kept equal to the array's length.
+    """
+    values = {"$ifNull": [f"${field}", []]}
+    user = {"$literal": user_id}
+    return [
+        {
+            "$set": {
+                field: {
+                    "$cond": [
+                        {"$in": [user, values]},
+                        {"$filter": {"input": values, "cond": {"$ne": ["$$this", user]}}},
+                        {"$concatArrays": [values, {"$literal": [user_id]}]},
+                    ]
+                },
+                "updated_at": datetime.utcnow(),
+            }
+        },
+        {"$set": {count_field: {"$size": f"${field}"}}},
+    ]
+
+
+@router.get("/", response_model=Union[List[PostResponse], List[PostSummary]])
 async def get_posts(
     post_type: Optional[str] = Query(None, description="Filter by post type"),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
     limit: int = Query(50, ge=1, le=100),
+    view: Literal["full", "summary"] = Query("full", description=VIEW_DESCRIPTION),
+    current_user: Optional[dict] = Depends(get_optional_user),
     db=Depends(get_database),
 ):
-    """Get all posts, optionally filtered by type."""
+    """Get all posts, optionally filtered by type, newest first."""
     query = {}
     if post_type:
         query["type"] = post_type
 
-    cursor = db.posts.find(query).sort("created_at", -1).skip(skip).limit(limit)
-    posts = await cursor.to_list(length=limit)
-    return [post_helper(post) for post in posts]
+    # Summary pages carry the viewer's own flags, so only shared pages are cached
+    if not feed_cache or (view == "summary" and current_user):
+        return await fetch_posts_page(db, query, limit, cursor, view, current_user)
+
+    async def load():
+        response = await fetch_posts_page(db, query, limit, cursor, view, None)
+        return response.body, response.headers.get(NEXT_CURSOR_HEADER)
+
+    body, next_cursor = await feed_cache.get_or_load(
+        post_type or ALL_POSTS, (view, cursor or "", limit), load
+    )
+    return encoded_json_response(body, next_cursor)
 
 
 @router.post("/", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
 async def create_post(
     post: PostCreate,
     current_user: dict = Depends(get_current_user),
+    authors: AuthorLoader = Depends(get_author_loader),
     db=Depends(get_database),
 ):
     """Create a new post."""
     # Get user info for author details
-    user = await db.users.find_one({"auth0_id": current_user["sub"]})
+    user = await authors.load(current_user["sub"])
     author_name = user.get("username") if user else current_user.get("name", "Anonymous")
     author_avatar = user.get("avatar_url") if user else current_user.get("picture")
 
@@ -74,14 +348,212 @@ async def create_post(
         "likes": [],
         "comments": [],
         "members": [current_user["sub"]] if post.type == "study" else [],
-        "saved_by": [],
+        "like_count": 0,
+        "comment_count": 0,
+        "member_count": 1 if post.type == "study" else 0,
+        "save_count": 0,
+        # Content-addressed media this post uses, for blob refcounting
+        "blob_ids": blob_ids_from_urls(post.image_url, post.video_url),
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow(),
     }
 
+    # Resized variants may already exist if the image was processed
+    image_blob_ids = blob_ids_from_urls(post.image_url)
+    if image_blob_ids:
+        blob = await db.blobs.find_one({"_id": image_blob_ids[0]}, {"variants": 1})
+        new_post["image_variants"] = blob.get("variants") if blob else None
+
+    if post.type == "study":
+        max_members = 10 if post.max_members is None else post.max_members
+        new_post["course_key"] = normalize_course(post.course)
+        new_post["has_space"] = new_post["member_count"] < max_members
+
     result = await db.posts.insert_one(new_post)
     new_post["_id"] = result.inserted_id
-    return post_helper(new_post)
+    await add_blob_refs(db, new_post["blob_ids"], 1)
+    if post.type == "study":
+        await update_course_counts(db, new_post["course_key"], 1, int(new_post["has_space"]))
+    await invalidate_feeds(new_post["type"])
+    broker.publish("post.created", new_post["type"], post_helper(new_post))
+    return post_response(new_post, status.HTTP_201_CREATED)
+
+
+@router.get("/search", response_model=Union[List[PostResponse], List[PostSummary]])
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms"),
+    post_type: Optional[str] = Query(None, description="Filter by post type"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    view: Literal["full", "summary"] = Query("full", description=VIEW_DESCRIPTION),
+    current_user: Optional[dict] = Depends(get_optional_user),
+    db=Depends(get_database),
+):
+    """Search posts by text, best matches first, newer posts breaking ties.
+
+    The rank is log2(text score) plus the post's age in half-lives, so a
+    post one half-life older needs twice the text score to rank equally.
+    It doesn't depend on the current time, which keeps cursors stable.
+    """
+    match = {"$text": {"$search": q}}
+    if post_type:
+        match["type"] = post_type
+
+    rank = {
+        "$add": [
+            {"$log": [{"$meta": "textScore"}, 2]},
+            {"$divide": [{"$toLong": "$created_at"}, settings.search_recency_half_life * 1000]},
+        ]
+    }
+    pipeline = [{"$match": match}, {"$addFields": {"rank": rank}}]
+    if cursor:
+        pipeline.append({"$match": after_cursor({}, cursor, "rank", ranked=True)})
+
+    if view == "summary":
+        project = summary_projection(current_user["sub"] if current_user else None)
+    else:
+        project = POST_PROJECTION
+    pipeline += [
+        {"$sort": {"rank": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": {**project, "rank": 1}},
+    ]
+    posts = await db.posts.aggregate(pipeline).to_list(length=limit + 1)
+    posts, next_cursor = split_page(posts, limit, "rank")
+    if view == "summary":
+        await mark_saved(db, posts, current_user)
+    return posts_response(posts, next_cursor, view)
+
+
+@router.get("/events", response_model=Union[List[PostResponse], List[PostSummary]])
+async def get_events(
+    starts_from: Optional[datetime] = Query(
+        None, alias="from", description="Earliest start; defaults to now"
+    ),
+    starts_to: Optional[datetime] = Query(
+        None, alias="to", description="Latest start (exclusive)"
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    view: Literal["full", "summary"] = Query("full", description=VIEW_DESCRIPTION),
+    current_user: Optional[dict] = Depends(get_optional_user),
+    db=Depends(get_database),
+):
+    """Get events starting in a time range, soonest first."""
+    starts_at = {"$gte": to_utc_naive(starts_from) if starts_from else datetime.utcnow()}
+    if starts_to:
+        starts_at["$lt"] = to_utc_naive(starts_to)
+
+    # type=event lets the planner use the partial event_starts_at index
+    query = {"type": "event", "event_starts_at": starts_at}
+    return await fetch_posts_page(
+        db, query, limit, cursor, view, current_user, field="event_starts_at", direction=1
+    )
+
+
+@router.get("/study-groups", response_model=Union[List[PostResponse], List[PostSummary]])
+async def get_study_groups(
+    course: Optional[str] = Query(None, description="Course code, e.g. CSE 101"),
+    has_space: bool = Query(False, description="Only groups with open seats"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    view: Literal["full", "summary"] = Query("full", description=VIEW_DESCRIPTION),
+    current_user: Optional[dict] = Depends(get_optional_user),
+    db=Depends(get_database),
+):
+    """Get study groups, optionally for one course or with open seats, newest first."""
+    query = {"type": "study"}
+    if course:
+        query["course_key"] = normalize_course(course)
+        # Both has_space values, so the course index still serves the sort
+        # by merging its two ranges instead of sorting in memory
+        query["has_space"] = True if has_space else {"$in": [True, False]}
+    elif has_space:
+        query["has_space"] = True
+
+    return await fetch_posts_page(db, query, limit, cursor, view, current_user)
+
+
+@router.get("/study-groups/courses", response_model=List[CourseFacet])
+async def get_study_group_courses(
+    has_space: bool = Query(False, description="Only courses with open groups"),
+    db=Depends(get_database),
+):
+    """Get the number of study groups, and of open ones, per course."""
+    query = {"open_groups": {"$gt": 0}} if has_space else {"groups": {"$gt": 0}}
+    counts = await db.course_counts.find(query).sort("_id", 1).to_list(length=None)
+    return json_response([
+        {"course": c["_id"], "groups": c["groups"], "open_groups": c["open_groups"]}
+        for c in counts
+    ])
+
+
+@router.get("/trending", response_model=Union[List[PostResponse], List[PostSummary]])
+async def get_trending(
+    post_type: Optional[str] = Query(None, description="Filter by post type"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    view: Literal["full", "summary"] = Query("full", description=VIEW_DESCRIPTION),
+    current_user: Optional[dict] = Depends(get_optional_user),
+    db=Depends(get_database),
+):
+    """Get posts by time-decayed engagement, hottest first.
+
+    Scores are kept up to date by the engagement endpoints and a periodic
+    decay pass, so this reads the trending index like the chronological
+    feed reads created_at. Scores keep changing, so a post can move between
+    pages while paging.
+    """
+    query = {"trending_score": {"$gt": 0}}
+    if post_type:
+        query["type"] = post_type
+
+    return await fetch_posts_page(
+        db, query, limit, cursor, view, current_user, field="trending_score", ranked=True
+    )
+
+
+@router.post("/batch", response_model=Union[PostBatchResponse, PostSummaryBatchResponse])
+async def get_posts_batch(
+    batch: BatchRequest,
+    view: Literal["full", "summary"] = Query("full", description=VIEW_DESCRIPTION),
+    current_user: Optional[dict] = Depends(get_optional_user),
+    db=Depends(get_database),
+):
+    """Get many posts by ID in one query, in the order requested."""
+    ids = list(dict.fromkeys(batch.ids))
+    object_ids = [ObjectId(post_id) for post_id in ids if ObjectId.is_valid(post_id)]
+    by_id = await load_posts(db, object_ids, view, current_user)
+
+    helper = summary_helper if view == "summary" else post_helper
+    return json_response({
+        "posts": [helper(by_id[post_id]) for post_id in ids if post_id in by_id],
+        "missing": [post_id for post_id in ids if post_id not in by_id],
+    })
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_posts(
+    post_type: Optional[str] = Query(None, description="Only events for this post type"),
+):
+    """Stream new posts and engagement changes as Server-Sent Events.
+
+    Events are post.created (the post), post.deleted, post.liked,
+    post.commented and post.joined (the post id and type plus the changed
+    fields). A connection that falls more than `stream_queue_size` events
+    behind is sent `overflow` and closed; the client should refetch.
+    """
+    subscriber = broker.subscribe(post_type)
+    if subscriber is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many live connections",
+        )
+    return StreamingResponse(
+        event_stream(subscriber, settings.stream_heartbeat),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{post_id}", response_model=PostResponse)
@@ -91,7 +563,7 @@ async def get_post(
 ):
     """Get a single post by ID."""
     try:
-        post = await db.posts.find_one({"_id": ObjectId(post_id)})
+        post = await db.posts.find_one({"_id": ObjectId(post_id)}, POST_PROJECTION)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -104,7 +576,7 @@ async def get_post(
             detail="Post not found",
         )
 
-    return post_helper(post)
+    return post_response(post)
 
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -135,6 +607,16 @@ async def delete_post(
         )
 
     await db.posts.delete_one({"_id": ObjectId(post_id)})
+    if like_buffer:
+        like_buffer.discard(post["_id"])
+    await db.comments.delete_many({"post_id": ObjectId(post_id)})
+    await db.saves.delete_many({"post_id": ObjectId(post_id)})
+    await add_blob_refs(db, post.get("blob_ids", []), -1)
+    if post["type"] == "study":
+        open_groups = -1 if post.get("has_space") else 0
+        await update_course_counts(db, post.get("course_key"), -1, open_groups)
+    await invalidate_feeds(post["type"])
+    publish_delta("post.deleted", post)
 
 
 @router.post("/{post_id}/like", response_model=PostResponse)
@@ -143,38 +625,40 @@ async def toggle_like(
     current_user: dict = Depends(get_current_user),
     db=Depends(get_database),
 ):
-    """Toggle like on a post."""
+    """Toggle like on a post.
+
+    With LIKE_BUFFER on, the like is applied to the buffered post and
+    written back with the next flush, which also invalidates the feeds.
+    """
     try:
-        post = await db.posts.find_one({"_id": ObjectId(post_id)})
+        object_id = ObjectId(post_id)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid post ID",
         )
 
-    if not post:
+    if like_buffer:
+        result = await like_buffer.toggle(object_id, current_user["sub"])
+    else:
+        result = await db.posts.find_one_and_update(
+            {"_id": object_id},
+            toggle_pipeline("likes", "like_count", current_user["sub"])
+            + [toggle_trending_stage("likes", current_user["sub"])],
+            projection=POST_PROJECTION,
+            return_document=True,
+        )
+
+    if not result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found",
         )
 
-    user_id = current_user["sub"]
-    likes = post.get("likes", [])
-
-    if user_id in likes:
-        # Unlike
-        likes.remove(user_id)
-    else:
-        # Like
-        likes.append(user_id)
-
-    result = await db.posts.find_one_and_update(
-        {"_id": ObjectId(post_id)},
-        {"$set": {"likes": likes, "updated_at": datetime.utcnow()}},
-        return_document=True,
-    )
-
-    return post_helper(result)
+    if not like_buffer:
+        await invalidate_feeds(result["type"])
+    publish_delta("post.liked", result, like_count=result["like_count"])
+    return post_response(result)
 
 
 @router.post("/{post_id}/comment", response_model=PostResponse)
@@ -182,45 +666,102 @@ async def add_comment(
     post_id: str,
     comment: CommentCreate,
     current_user: dict = Depends(get_current_user),
+    authors: AuthorLoader = Depends(get_author_loader),
     db=Depends(get_database),
 ):
     """Add a comment to a post."""
     try:
-        post = await db.posts.find_one({"_id": ObjectId(post_id)})
+        object_id = ObjectId(post_id)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid post ID",
         )
 
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found",
-        )
-
     # Get user info
-    user = await db.users.find_one({"auth0_id": current_user["sub"]})
+    user = await authors.load(current_user["sub"])
     author_name = user.get("username") if user else current_user.get("name", "Anonymous")
 
     new_comment = {
-        "id": str(ObjectId()),
+        "_id": ObjectId(),
+        "post_id": object_id,
         "author_id": current_user["sub"],
         "author_name": author_name or "Anonymous",
         "text": comment.text,
         "created_at": datetime.utcnow(),
     }
+    preview = comment_helper(new_comment)
 
+    post = await db.posts.find_one({"_id": object_id}, {"comment_count": 1, "comments": 1})
+    if not post:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found",
+        )
+    # Posts predating comment_count still embed all their comments; copy them
+    # out before the update below trims the post to a preview
+    if "comment_count" not in post:
+        await copy_embedded_comments(db, object_id, post.get("comments", []))
+
+    # Stored first, so the post never counts or previews a comment that
+    # doesn't exist
+    await db.comments.insert_one(new_comment)
+
+    # The post only keeps the latest few comments for feed rendering; the
+    # full history lives in the comments collection. A pipeline update so the
+    # trending score changes in the same write.
+    comments = {"$concatArrays": [{"$ifNull": ["$comments", []]}, {"$literal": [preview]}]}
+    # Posts predating comment_count still embed all their comments
+    existing = {"$size": {"$ifNull": ["$comments", []]}}
+    preview_size = settings.comment_preview_size
     result = await db.posts.find_one_and_update(
-        {"_id": ObjectId(post_id)},
-        {
-            "$push": {"comments": new_comment},
-            "$set": {"updated_at": datetime.utcnow()},
-        },
+        {"_id": object_id},
+        [
+            {
+                "$set": {
+                    "comments": {"$slice": [comments, -preview_size]} if preview_size else [],
+                    "comment_count": {"$add": [{"$ifNull": ["$comment_count", existing]}, 1]},
+                    "updated_at": datetime.utcnow(),
+                }
+            },
+            trending_stage(TRENDING_WEIGHTS["comments"]),
+        ],
+        projection=POST_PROJECTION,
         return_document=True,
     )
 
-    return post_helper(result)
+    if not result:
+        await db.comments.delete_one({"_id": new_comment["_id"]})
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found",
+        )
+
+    await invalidate_feeds(result["type"])
+    publish_delta(
+        "post.commented", result, comment_count=result["comment_count"], comment=preview
+    )
+    return post_response(result)
+
+
+@router.get("/{post_id}/comments", response_model=List[Comment])
+async def get_comments(
+    post_id: str,
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    db=Depends(get_database),
+):
+    """Get comments on a post, newest first."""
+    try:
+        object_id = ObjectId(post_id)
+    except:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid post ID",
+        )
+
+    comments, next_cursor = await fetch_page(db.comments, {"post_id": object_id}, limit, cursor)
+    return json_response([comment_helper(c) for c in comments], next_cursor=next_cursor)
 
 
 @router.post("/{post_id}/save", response_model=PostResponse)
@@ -229,36 +770,81 @@ async def toggle_save(
     current_user: dict = Depends(get_current_user),
     db=Depends(get_database),
 ):
-    """Toggle save on a post."""
+    """Toggle save on a post.
+
+    The save itself is a document in the saves collection; the post only
+    keeps save_count. The unique (user_id, post_id) index makes concurrent
+    toggles by the same user settle on one save. A save still in the post's
+    legacy saved_by array (see scripts/migrate_saves.py) is unsaved there.
+    """
     try:
-        post = await db.posts.find_one({"_id": ObjectId(post_id)})
+        object_id = ObjectId(post_id)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid post ID",
         )
 
-    if not post:
+    user_id = current_user["sub"]
+    save = {"user_id": user_id, "post_id": object_id}
+    delta = -1
+    if not (await db.saves.delete_one(save)).deleted_count and not await unsave_legacy(
+        db, object_id, user_id
+    ):
+        try:
+            await db.saves.insert_one({**save, "saved_at": datetime.utcnow()})
+            delta = 1
+        except DuplicateKeyError:
+            delta = 0  # a concurrent request saved it first
+
+    saves = {"$ifNull": ["$save_count", {"$size": {"$ifNull": ["$saved_by", []]}}]}
+    result = await db.posts.find_one_and_update(
+        {"_id": object_id},
+        [
+            {
+                "$set": {
+                    "save_count": {"$max": [0, {"$add": [saves, delta]}]},
+                    "updated_at": datetime.utcnow(),
+                }
+            },
+            trending_stage(delta * TRENDING_WEIGHTS["saves"]),
+        ],
+        projection=POST_PROJECTION,
+        return_document=True,
+    )
+
+    if not result:
+        await db.saves.delete_many({"post_id": object_id})
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found",
         )
 
-    user_id = current_user["sub"]
-    saved_by = post.get("saved_by", [])
-
-    if user_id in saved_by:
-        saved_by.remove(user_id)
-    else:
-        saved_by.append(user_id)
-
-    result = await db.posts.find_one_and_update(
-        {"_id": ObjectId(post_id)},
-        {"$set": {"saved_by": saved_by, "updated_at": datetime.utcnow()}},
-        return_document=True,
+    await invalidate_feeds(result["type"])
+    return post_response(result)
+
+
+async def unsave_legacy(db, post_id: ObjectId, user_id: str) -> bool:
+    """Remove user_id from a post's unmigrated saved_by array, if it's there.
+
+    save_count is pinned to the array's size first, so the caller's usual
+    decrement counts the removal once.
+    """
+    user = {"$literal": user_id}
+    result = await db.posts.update_one(
+        {"_id": post_id, "saved_by": user_id},
+        [
+            {
+                "$set": {
+                    "save_count": {"$ifNull": ["$save_count", {"$size": "$saved_by"}]},
+                    "saved_by": {
+                        "$filter": {"input": "$saved_by", "cond": {"$ne": ["$$this", user]}}
+                    },
+                }
+            }
+        ],
     )
-
-    return post_helper(result)
+    return bool(result.modified_count)
 
 
 @router.post("/{post_id}/join", response_model=PostResponse)
@@ -268,14 +854,50 @@ async def toggle_join_study_group(
     db=Depends(get_database),
 ):
     """Toggle membership in a study group."""
+    user_id = current_user["sub"]
+
+    # Members can always leave; anyone else can only join while there is room.
+    # Checking capacity in the filter keeps concurrent joins from overfilling.
+    members = {"$ifNull": ["$members", []]}
+    has_room = {"$lt": [{"$size": members}, {"$ifNull": ["$max_members", 10]}]}
     try:
-        post = await db.posts.find_one({"_id": ObjectId(post_id)})
+        result = await db.posts.find_one_and_update(
+            {
+                "_id": ObjectId(post_id),
+                "type": "study",
+                "$or": [{"members": user_id}, {"$expr": has_room}],
+            },
+            toggle_pipeline("members", "member_count", user_id)
+            + [HAS_SPACE_STAGE, toggle_trending_stage("members", user_id)],
+            projection={**POST_PROJECTION, "course_key": 1, "has_space": 1},
+            return_document=True,
+        )
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid post ID",
         )
 
+    if result:
+        # Keep the course's open-group count in step when the group fills
+        # up or frees a seat.
+        max_members = result.get("max_members")
+        max_members = 10 if max_members is None else max_members
+        joined = user_id in result["members"]
+        count_before = result["member_count"] + (-1 if joined else 1)
+        was_open = count_before < max_members
+        await update_course_counts(
+            db, result.get("course_key"), open_groups=int(result["has_space"]) - int(was_open)
+        )
+        await invalidate_feeds(result["type"])
+        publish_delta(
+            "post.joined", result,
+            member_count=result["member_count"], has_space=result["has_space"],
+        )
+        return post_response(result)
+
+    # The update matched nothing; look the post up only to explain why.
+    post = await db.posts.find_one({"_id": ObjectId(post_id)}, {"type": 1})
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -288,48 +910,47 @@ async def toggle_join_study_group(
             detail="Can only join study group posts",
         )
 
-    user_id = current_user["sub"]
-    members = post.get("members", [])
-    max_members = post.get("max_members", 10)
-
-    if user_id in members:
-        # Leave group
-        members.remove(user_id)
-    else:
-        # Join group (if not full)
-        if len(members) >= max_members:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Study group is full",
-            )
-        members.append(user_id)
-
-    result = await db.posts.find_one_and_update(
-        {"_id": ObjectId(post_id)},
-        {"$set": {"members": members, "updated_at": datetime.utcnow()}},
-        return_document=True,
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Study group is full",
     )
 
-    return post_helper(result)
-
 
-@router.get("/user/{user_id}", response_model=List[PostResponse])
+@router.get("/user/{user_id}", response_model=Union[List[PostResponse], List[PostSummary]])
 async def get_user_posts(
     user_id: str,
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    view: Literal["full", "summary"] = Query("full", description=VIEW_DESCRIPTION),
+    current_user: Optional[dict] = Depends(get_optional_user),
     db=Depends(get_database),
 ):
-    """Get all posts by a specific user."""
-    cursor = db.posts.find({"author_id": user_id}).sort("created_at", -1)
-    posts = await cursor.to_list(length=100)
-    return [post_helper(post) for post in posts]
+    """Get posts by a specific user, newest first."""
+    query = {"author_id": user_id}
+    return await fetch_posts_page(db, query, limit, cursor, view, current_user)
 
 
-@router.get("/saved/me", response_model=List[PostResponse])
+@router.get("/saved/me", response_model=Union[List[PostResponse], List[PostSummary]])
 async def get_saved_posts(
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    limit: int = Query(50, ge=1, le=100),
+    view: Literal["full", "summary"] = Query("full", description=VIEW_DESCRIPTION),
     current_user: dict = Depends(get_current_user),
     db=Depends(get_database),
 ):
-    """Get all posts saved by the current user."""
-    cursor = db.posts.find({"saved_by": current_user["sub"]}).sort("created_at", -1)
-    posts = await cursor.to_list(length=100)
-    return [post_helper(post) for post in posts]
+    """Get posts saved by the current user, most recently saved first.
+
+    Pages through the user's saves, then loads that page's posts in one
+    batched query. Saves of since-deleted posts are skipped.
+    """
+    saves, next_cursor = await fetch_page(
+        db.saves,
+        {"user_id": current_user["sub"]},
+        limit,
+        cursor,
+        "saved_at",
+        projection={"post_id": 1, "saved_at": 1},
+    )
+    by_id = await load_posts(db, [save["post_id"] for save in saves], view, current_user)
+    posts = [by_id[str(save["post_id"])] for save in saves if str(save["post_id"]) in by_id]
+    return posts_response(posts, next_cursor, view)
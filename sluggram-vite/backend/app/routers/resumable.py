@@ -0,0 +1,334 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import json
+import os
+import uuid
+from ..config import get_settings
+from ..database import get_database
+from ..schemas import UploadSessionCreate, UploadSessionResponse
+from ..utils.auth import get_current_user
+from ..utils.storage import CHUNK_SIZE, blob_helper, commit_blob, file_ext
+from .upload import UPLOAD_DIR, IMAGE_TYPES, VIDEO_TYPES, image_upload_helper
+
+# Resumable uploads, loosely following the tus protocol: create a session,
+# PATCH chunks at the current offset, HEAD to find the offset after a
+# dropped connection, then finalize. Session metadata is a JSON file next to
+# the partial data, and the offset is the partial file's size, so sessions
+# survive a server restart.
+router = APIRouter(prefix="/upload/sessions", tags=["upload"])
+settings = get_settings()
+
+SESSION_DIR = UPLOAD_DIR / "sessions"
+SESSION_DIR.mkdir(exist_ok=True)
+
+OFFSET_HEADER = "Upload-Offset"
+LENGTH_HEADER = "Upload-Length"
+
+LIMITS = {
+    "image": (IMAGE_TYPES, settings.max_image_size),
+    "video": (VIDEO_TYPES, settings.max_file_size),
+}
+
+# Serializes PATCH/finalize per session within this worker.
+_session_locks: dict = {}
+
+
+def _meta_path(session_id: str):
+    return SESSION_DIR / f"{session_id}.json"
+
+
+def _part_path(session_id: str):
+    return SESSION_DIR / f"{session_id}.part"
+
+
+def _load_session(session_id: str):
+    try:
+        with open(_meta_path(session_id)) as f:
+            session = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    try:
+        session["offset"] = os.path.getsize(_part_path(session_id))
+    except FileNotFoundError:
+        return None
+    return session
+
+
+def _save_session(session: dict):
+    data = {k: v for k, v in session.items() if k != "offset"}
+    tmp_path = _meta_path(session["id"]).with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, _meta_path(session["id"]))
+
+
+def _remove_session(session_id: str):
+    for path in (_part_path(session_id), _meta_path(session_id)):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _write_at(session_id: str, offset: int, chunk: bytes):
+    with open(_part_path(session_id), "r+b") as f:
+        f.seek(offset)
+        f.write(chunk)
+
+
+def _truncate(session_id: str, offset: int):
+    with open(_part_path(session_id), "r+b") as f:
+        f.truncate(offset)
+
+
+def _hash_file(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _seal(session_id: str) -> str:
+    """Flush the completed upload to disk and return its SHA-256."""
+    part = _part_path(session_id)
+    with open(part, "rb+") as f:
+        os.fsync(f.fileno())
+    return _hash_file(part)
+
+
+def session_helper(session) -> dict:
+    """Convert a stored upload session to response format."""
+    return {
+        "id": session["id"],
+        "kind": session["kind"],
+        "filename": session["filename"],
+        "content_type": session["content_type"],
+        "size": session["size"],
+        "offset": session["offset"],
+        "expires_at": session["expires_at"],
+    }
+
+
+def _offset_headers(response: Response, session: dict):
+    response.headers[OFFSET_HEADER] = str(session["offset"])
+    response.headers[LENGTH_HEADER] = str(session["size"])
+    response.headers["Cache-Control"] = "no-store"
+
+
+async def _get_owned_session(session_id: str, current_user: dict) -> dict:
+    """Load a live session owned by the current user, or raise 404."""
+    try:
+        uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+
+    session = await run_in_threadpool(_load_session, session_id)
+    if (
+        not session
+        or session["owner"] != current_user["sub"]
+        or datetime.fromisoformat(session["expires_at"]) <= datetime.utcnow()
+    ):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+
+def _touch(session: dict):
+    """Push back the session's expiry after activity."""
+    expires_at = datetime.utcnow() + timedelta(seconds=settings.upload_session_ttl)
+    session["expires_at"] = expires_at.isoformat()
+
+
+@router.post("", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def create_upload_session(
+    upload: UploadSessionCreate,
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+):
+    """Start a resumable upload."""
+    allowed_types, max_size = LIMITS[upload.kind]
+    if upload.content_type not in allowed_types:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed: {', '.join(allowed_types)}",
+        )
+    if upload.size > max_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum size is {max_size // (1024 * 1024)}MB for {upload.kind}s.",
+        )
+
+    session = {
+        "id": str(uuid.uuid4()),
+        "owner": current_user["sub"],
+        "kind": upload.kind,
+        "filename": upload.filename,
+        "content_type": upload.content_type,
+        "size": upload.size,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    _touch(session)
+    await run_in_threadpool(_save_session, session)
+    await run_in_threadpool(_part_path(session["id"]).touch)
+    session["offset"] = 0
+
+    response.headers["Location"] = f"/api/upload/sessions/{session['id']}"
+    _offset_headers(response, session)
+    return session_helper(session)
+
+
+@router.head("/{session_id}")
+async def get_upload_offset(
+    session_id: str,
+    current_user: dict = Depends(get_current_user),
+):
+    """Report how many bytes of an upload the server has."""
+    session = await _get_owned_session(session_id, current_user)
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    _offset_headers(response, session)
+    return response
+
+
+@router.get("/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    session_id: str,
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+):
+    """Get the state of an upload session."""
+    session = await _get_owned_session(session_id, current_user)
+    _offset_headers(response, session)
+    return session_helper(session)
+
+
+@router.patch("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_chunk(
+    session_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+):
+    """Append the request body to an upload at the offset in Upload-Offset."""
+    try:
+        offset = int(request.headers[OFFSET_HEADER])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Missing or invalid {OFFSET_HEADER} header")
+
+    # Check ownership before creating a lock entry for the id
+    await _get_owned_session(session_id, current_user)
+    lock = _session_locks.setdefault(session_id, asyncio.Lock())
+    async with lock:
+        session = await _get_owned_session(session_id, current_user)
+        if offset != session["offset"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Offset mismatch; server has {session['offset']} bytes",
+            )
+
+        # Data received before a dropped connection is kept, so the client
+        # can resume from whatever offset HEAD reports.
+        position = offset
+        try:
+            async for chunk in request.stream():
+                if position + len(chunk) > session["size"]:
+                    await run_in_threadpool(_truncate, session_id, offset)
+                    position = offset
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Chunk extends past the declared upload size",
+                    )
+                if chunk:
+                    await run_in_threadpool(_write_at, session_id, position, chunk)
+                    position += len(chunk)
+        finally:
+            session["offset"] = position
+            _touch(session)
+            await run_in_threadpool(_save_session, session)
+
+    response = Response(status_code=status.HTTP_204_NO_CONTENT)
+    _offset_headers(response, session)
+    return response
+
+
+@router.post("/{session_id}/finalize")
+async def finalize_upload(
+    session_id: str,
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_database),
+):
+    """Complete an upload and move it into the media store."""
+    await _get_owned_session(session_id, current_user)
+    lock = _session_locks.setdefault(session_id, asyncio.Lock())
+    async with lock:
+        session = await _get_owned_session(session_id, current_user)
+        if session["offset"] != session["size"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Upload incomplete; server has {session['offset']} of {session['size']} bytes",
+            )
+
+        default_ext = "mp4" if session["kind"] == "video" else "jpg"
+        sha256 = await run_in_threadpool(_seal, session_id)
+        blob = await commit_blob(
+            db,
+            str(_part_path(session_id)),
+            sha256,
+            session["size"],
+            file_ext(session["filename"], default_ext),
+            session["content_type"],
+        )
+        await run_in_threadpool(_remove_session, session_id)
+    _session_locks.pop(session_id, None)
+
+    if session["kind"] == "image":
+        return await image_upload_helper(blob)
+    return blob_helper(blob)
+
+
+@router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_upload(
+    session_id: str,
+    current_user: dict = Depends(get_current_user),
+):
+    """Abandon an upload and discard its data."""
+    await _get_owned_session(session_id, current_user)
+    await run_in_threadpool(_remove_session, session_id)
+    _session_locks.pop(session_id, None)
+
+
+def _expired_session_ids(now: datetime) -> list:
+    expired = []
+    for path in SESSION_DIR.glob("*.json"):
+        try:
+            with open(path) as f:
+                expires_at = datetime.fromisoformat(json.load(f)["expires_at"])
+        except (OSError, ValueError, KeyError):
+            continue
+        if expires_at <= now:
+            expired.append(path.stem)
+    return expired
+
+
+async def cleanup_expired_sessions() -> int:
+    """Delete abandoned upload sessions and their partial data."""
+    expired = await run_in_threadpool(_expired_session_ids, datetime.utcnow())
+    for session_id in expired:
+        if session_id in _session_locks and _session_locks[session_id].locked():
+            continue
+        await run_in_threadpool(_remove_session, session_id)
+        _session_locks.pop(session_id, None)
+    return len(expired)
+
+
+async def session_cleanup_loop():
+    """Periodically expire abandoned upload sessions."""
+    while True:
+        try:
+            removed = await cleanup_expired_sessions()
+            if removed:
+                print(f"Removed {removed} expired upload sessions")
+        except Exception as e:
+            print(f"Upload session cleanup failed: {e}")
+        await asyncio.sleep(settings.upload_session_cleanup_interval)
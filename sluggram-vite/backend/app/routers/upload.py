@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
-import os
-import uuid
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pathlib import Path
 from ..config import get_settings
+from ..database import get_database
 from ..utils.auth import get_current_user
+from ..utils.images import VARIANT_FILENAME, image_pipeline, variant_path
+from ..utils.media import media_response
+from ..utils.storage import (
+    BLOB_FILENAME,
+    blob_helper,
+    blob_path,
+    store_upload,
+)
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 settings = get_settings()
@@ -15,90 +21,115 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 (UPLOAD_DIR / "images").mkdir(exist_ok=True)
 (UPLOAD_DIR / "videos").mkdir(exist_ok=True)
 
+IMAGE_TYPES = ["image/jpeg", "image/png", "image/gif", "image/webp"]
+VIDEO_TYPES = ["video/mp4", "video/webm", "video/quicktime"]
+
+# The upload handlers parse the body themselves (see stream_upload), so the
+# form they expect is described for the API docs here.
+UPLOAD_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
 
-@router.post("/image")
-async def upload_image(
-    file: UploadFile = File(...),
-    current_user: dict = Depends(get_current_user),
-):
-    """Upload an image file."""
-    # Validate file type
-    allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type. Allowed: {', '.join(allowed_types)}",
-        )
-
-    # Validate file size (10MB max for images)
-    contents = await file.read()
-    if len(contents) > 10 * 1024 * 1024:
-        raise HTTPException(
-            status_code=400,
-            detail="File too large. Maximum size is 10MB for images.",
-        )
-
-    # Generate unique filename
-    ext = file.filename.split(".")[-1] if "." in file.filename else "jpg"
-    filename = f"{uuid.uuid4()}.{ext}"
-    file_path = UPLOAD_DIR / "images" / filename
-
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(contents)
 
+async def image_upload_helper(blob) -> dict:
+    """Upload response for an image, queuing its resized variants if needed."""
     return {
-        "url": f"/upload/files/images/{filename}",
-        "filename": filename,
+        **blob_helper(blob),
+        "variants_status": await image_pipeline.submit(blob),
+        "variants": blob.get("variants"),
     }
 
 
-@router.post("/video")
+@router.post("/image", openapi_extra=UPLOAD_FORM)
+async def upload_image(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    db=Depends(get_database),
+):
+    """Upload an image file."""
+    # Stream to disk, validating file type and size (10MB max for images)
+    blob = await store_upload(
+        db,
+        request,
+        IMAGE_TYPES,
+        "jpg",
+        max_size=settings.max_image_size,
+        too_large_detail="File too large. Maximum size is 10MB for images.",
+    )
+    return await image_upload_helper(blob)
+
+
+@router.post("/video", openapi_extra=UPLOAD_FORM)
 async def upload_video(
-    file: UploadFile = File(...),
+    request: Request,
     current_user: dict = Depends(get_current_user),
+    db=Depends(get_database),
 ):
     """Upload a video file."""
-    # Validate file type
-    allowed_types = ["video/mp4", "video/webm", "video/quicktime"]
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type. Allowed: {', '.join(allowed_types)}",
-        )
-
-    # Validate file size (100MB max for videos)
-    contents = await file.read()
-    if len(contents) > settings.max_file_size:
-        raise HTTPException(
-            status_code=400,
-            detail="File too large. Maximum size is 100MB for videos.",
-        )
-
-    # Generate unique filename
-    ext = file.filename.split(".")[-1] if "." in file.filename else "mp4"
-    filename = f"{uuid.uuid4()}.{ext}"
-    file_path = UPLOAD_DIR / "videos" / filename
-
-    # Save file
-    with open(file_path, "wb") as f:
-        f.write(contents)
+    # Stream to disk, validating file type and size (100MB max for videos)
+    blob = await store_upload(
+        db,
+        request,
+        VIDEO_TYPES,
+        "mp4",
+        max_size=settings.max_file_size,
+        too_large_detail="File too large. Maximum size is 100MB for videos.",
+    )
+    return blob_helper(blob)
+
+
+@router.api_route("/blobs/{filename}", methods=["GET", "HEAD"])
+async def get_blob(filename: str, request: Request):
+    """Serve content-addressed media."""
+    match = BLOB_FILENAME.match(filename)
+    if not match:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return media_response(request, blob_path(match.group(1), match.group(2)))
+
+
+@router.get("/images/{sha256}/variants")
+async def get_image_variants(
+    sha256: str,
+    db=Depends(get_database),
+):
+    """Get the processing status and resized variants of an uploaded image."""
+    blob = await db.blobs.find_one({"_id": sha256}, {"variants": 1, "variants_status": 1})
+    if not blob:
+        raise HTTPException(status_code=404, detail="Image not found")
 
     return {
-        "url": f"/upload/files/videos/{filename}",
-        "filename": filename,
+        "sha256": sha256,
+        "status": blob.get("variants_status", "pending"),
+        "variants": blob.get("variants"),
     }
 
 
-@router.get("/files/{file_type}/{filename}")
-async def get_file(file_type: str, filename: str):
-    """Serve uploaded files."""
-    if file_type not in ["images", "videos"]:
-        raise HTTPException(status_code=400, detail="Invalid file type")
+@router.api_route("/variants/{filename}", methods=["GET", "HEAD"])
+async def get_variant(filename: str, request: Request):
+    """Serve a resized image variant."""
+    match = VARIANT_FILENAME.match(filename)
+    if not match:
+        raise HTTPException(status_code=404, detail="File not found")
 
-    file_path = UPLOAD_DIR / file_type / filename
+    return media_response(request, variant_path(*match.groups()))
 
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(file_path)
+@router.api_route("/files/{file_type}/{filename}", methods=["GET", "HEAD"])
+async def get_file(file_type: str, filename: str, request: Request):
+    """Serve files uploaded before the blob store, with byte ranges and conditional requests."""
+    if file_type not in ["images", "videos"]:
+        raise HTTPException(status_code=400, detail="Invalid file type")
+
+    return media_response(request, UPLOAD_DIR / file_type / filename)
@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from datetime import datetime
 from bson import ObjectId
 from ..database import get_database
-from ..schemas import UserCreate, UserUpdate, UserResponse
+from ..schemas import UserCreate, UserUpdate, UserResponse, BatchRequest, UserBatchResponse
 from ..utils.auth import get_current_user
+from ..utils.profiles import profile_cache
+from ..utils.serialization import json_response
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -48,6 +50,7 @@ async def get_current_user_profile(
         }
         result = await db.users.insert_one(new_user)
         new_user["_id"] = result.inserted_id
+        profile_cache.invalidate(current_user["sub"])
         return user_helper(new_user)
 
     return user_helper(user)
@@ -75,19 +78,47 @@ async def update_current_user_profile(
             detail="User not found",
         )
 
+    profile_cache.invalidate(current_user["sub"])
     return user_helper(result)
 
 
+@router.post("/batch", response_model=UserBatchResponse)
+async def get_users_batch(
+    batch: BatchRequest,
+    db=Depends(get_database),
+):
+    """Get many public profiles in one query, in the order requested.
+
+    Like get_user_by_id, each id may be a Mongo id or an auth0 id.
+    """
+    ids = list(dict.fromkeys(batch.ids))
+    object_ids = [ObjectId(user_id) for user_id in ids if ObjectId.is_valid(user_id)]
+    query = {"auth0_id": {"$in": ids}}
+    if object_ids:
+        query = {"$or": [{"_id": {"$in": object_ids}}, query]}
+
+    by_id = {}
+    async for user in db.users.find(query):
+        by_id[str(user["_id"])] = user
+        by_id[user["auth0_id"]] = user
+
+    return json_response({
+        "users": [user_helper(by_id[user_id]) for user_id in ids if user_id in by_id],
+        "missing": [user_id for user_id in ids if user_id not in by_id],
+    })
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: str,
     db=Depends(get_database),
 ):
     """Get a user's public profile by ID."""
-    try:
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
-    except:
-        user = await db.users.find_one({"auth0_id": user_id})
+    # Accept either the Mongo id or the auth0 id in a single lookup
+    query = {"auth0_id": user_id}
+    if ObjectId.is_valid(user_id):
+        query = {"$or": [{"_id": ObjectId(user_id)}, query]}
+    user = await db.users.find_one(query)
 
     if not user:
         raise HTTPException(
@@ -1,2 +1,5 @@
 from .user import UserCreate, UserUpdate, UserResponse, UserInDB
-from .post import PostCreate, PostUpdate, PostResponse, PostInDB, CommentCreate, Comment
+from .post import PostCreate, PostUpdate, PostResponse, PostSummary, PostInDB, CommentCreate, Comment, CourseFacet, ImageVariant
+from .upload import UploadSessionCreate, UploadSessionResponse
+from .batch import BatchRequest, PostBatchResponse, PostSummaryBatchResponse, UserBatchResponse
+from .admin import ProfileSummary
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    route: Optional[str] = None  # Route template, e.g. /api/posts/{post_id}
+    status: Optional[int] = None
+    sampled: bool  # Picked by 1-in-N sampling rather than requested
+    started_at: datetime
+    duration_ms: float
+    samples: int
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import List
+from .post import PostResponse, PostSummary
+from .user import UserResponse
+
+MAX_BATCH_IDS = 100
+
+
+class BatchRequest(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=MAX_BATCH_IDS)
+
+
+class PostBatchResponse(BaseModel):
+    posts: List[PostResponse]
+    missing: List[str]  # Requested ids that don't exist or aren't valid
+
+
+class PostSummaryBatchResponse(BaseModel):
+    posts: List[PostSummary]
+    missing: List[str]
+
+
+class UserBatchResponse(BaseModel):
+    users: List[UserResponse]
+    missing: List[str]
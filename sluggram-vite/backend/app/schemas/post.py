@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Literal
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Literal, Dict
 from datetime import datetime
+from ..utils.events import event_local_fields, parse_event_start, to_utc_naive
 
 
 class Comment(BaseModel):
@@ -11,6 +12,19 @@ class Comment(BaseModel):
     created_at: datetime
 
 
+class ImageVariant(BaseModel):
+    width: int
+    height: int
+    webp: str
+    jpeg: str
+
+
+class CourseFacet(BaseModel):
+    course: str
+    groups: int
+    open_groups: int
+
+
 class CommentCreate(BaseModel):
     text: str
 
@@ -24,6 +38,7 @@ class PostBase(BaseModel):
     event_title: Optional[str] = None
     event_date: Optional[str] = None
     event_time: Optional[str] = None
+    event_starts_at: Optional[datetime] = None  # UTC
     event_location: Optional[str] = None
     # Study group fields
     group_name: Optional[str] = None
@@ -34,7 +49,24 @@ class PostBase(BaseModel):
 
 
 class PostCreate(PostBase):
-    pass
+    @model_validator(mode="after")
+    def check_event_start(self):
+        """Events need a start time, given directly or as date/time strings."""
+        if self.type != "event":
+            return self
+
+        if self.event_starts_at:
+            self.event_starts_at = to_utc_naive(self.event_starts_at)
+            if not self.event_date:
+                local = event_local_fields(self.event_starts_at)
+                self.event_date = local["event_date"]
+                self.event_time = self.event_time or local["event_time"]
+            return self
+
+        self.event_starts_at = parse_event_start(self.event_date, self.event_time)
+        if self.event_starts_at is None:
+            raise ValueError("Events need event_starts_at or an event_date like 2026-05-01")
+        return self
 
 
 class PostUpdate(BaseModel):
@@ -44,6 +76,7 @@ class PostUpdate(BaseModel):
     event_title: Optional[str] = None
     event_date: Optional[str] = None
     event_time: Optional[str] = None
+    event_starts_at: Optional[datetime] = None
     event_location: Optional[str] = None
     group_name: Optional[str] = None
     course: Optional[str] = None
@@ -58,9 +91,13 @@ class PostInDB(PostBase):
     author_name: str
     author_avatar: Optional[str] = None
     likes: List[str] = []
-    comments: List[Comment] = []
+    comments: List[Comment] = []  # Latest few only; see the comments collection
     members: List[str] = []  # For study groups
-    saved_by: List[str] = []
+    saved_by: List[str] = []  # Legacy; saves now live in the saves collection
+    like_count: int = 0
+    comment_count: int = 0
+    member_count: int = 0
+    save_count: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -76,16 +113,55 @@ class PostResponse(BaseModel):
     author_avatar: Optional[str] = None
     content: str
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, ImageVariant]] = None  # thumb, feed, full
     video_url: Optional[str] = None
     likes: List[str] = []
     comments: List[Comment] = []
     members: List[str] = []
-    saved_by: List[str] = []
+    like_count: int = 0
+    comment_count: int = 0
+    member_count: int = 0
+    save_count: int = 0
+    created_at: datetime
+    # Event fields
+    event_title: Optional[str] = None
+    event_date: Optional[str] = None
+    event_time: Optional[str] = None
+    event_starts_at: Optional[datetime] = None
+    event_location: Optional[str] = None
+    # Study group fields
+    group_name: Optional[str] = None
+    course: Optional[str] = None
+    meeting_time: Optional[str] = None
+    study_location: Optional[str] = None
+    max_members: Optional[int] = None
+
+
+class PostSummary(BaseModel):
+    """Feed card: counts and the viewer's own flags instead of id arrays."""
+    id: str
+    type: str
+    author_id: str
+    author_name: str
+    author_avatar: Optional[str] = None
+    content: str
+    image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, ImageVariant]] = None
+    video_url: Optional[str] = None
+    comments: List[Comment] = []  # Latest few only
+    like_count: int = 0
+    comment_count: int = 0
+    member_count: int = 0
+    save_count: int = 0
+    liked_by_me: bool = False
+    saved_by_me: bool = False
+    joined_by_me: bool = False
     created_at: datetime
     # Event fields
     event_title: Optional[str] = None
     event_date: Optional[str] = None
     event_time: Optional[str] = None
+    event_starts_at: Optional[datetime] = None
     event_location: Optional[str] = None
     # Study group fields
     group_name: Optional[str] = None
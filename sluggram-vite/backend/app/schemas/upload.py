@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Literal
+from datetime import datetime
+
+
+class UploadSessionCreate(BaseModel):
+    kind: Literal["image", "video"] = "video"
+    filename: str
+    content_type: str
+    size: int = Field(gt=0)
+
+
+class UploadSessionResponse(BaseModel):
+    id: str
+    kind: str
+    filename: str
+    content_type: str
+    size: int
+    offset: int
+    expires_at: datetime
@@ -1,37 +1,121 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
+import asyncio
+import hashlib
 import httpx
-from functools import lru_cache
+import time
+from typing import Dict, Optional
 from ..config import get_settings
+from .cache import MISSING, TTLCache
 
 settings = get_settings()
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-@lru_cache()
-def get_jwks():
-    """Fetch JWKS from Auth0."""
-    jwks_url = f"https://{settings.auth0_domain}/.well-known/jwks.json"
-    response = httpx.get(jwks_url)
-    return response.json()
+class JWKSProvider:
+    """Async, kid-indexed cache of the Auth0 signing keys.
 
+    Keys are refreshed in the background every `refresh_interval` seconds so
+    key rotation does not need a restart. A token signed with an unknown kid
+    triggers an immediate refetch, rate limited to one per
+    `min_refetch_interval` seconds so bogus tokens can't hammer Auth0.
+    """
 
-def get_public_key(token: str):
-    """Get the public key for verifying the JWT."""
-    jwks = get_jwks()
-    unverified_header = jwt.get_unverified_header(token)
+    def __init__(self, url: str, refresh_interval: float, min_refetch_interval: float):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refetch_interval = min_refetch_interval
+        self._keys: Dict[str, dict] = {}
+        self._last_fetch_attempt = float("-inf")
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
 
-    for key in jwks["keys"]:
-        if key["kid"] == unverified_header["kid"]:
-            return {
+    async def fetch(self):
+        """Download the JWKS and replace the key map."""
+        self._last_fetch_attempt = time.monotonic()
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+        self._keys = {
+            key["kid"]: {
                 "kty": key["kty"],
                 "kid": key["kid"],
-                "use": key["use"],
+                "use": key.get("use"),
                 "n": key["n"],
                 "e": key["e"],
             }
-    return None
+            for key in response.json()["keys"]
+            if key.get("kty") == "RSA"
+        }
+
+    async def get_key(self, kid: str) -> Optional[dict]:
+        """Return the public key for kid, refetching once if it is unknown."""
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        async with self._lock:
+            key = self._keys.get(kid)
+            elapsed = time.monotonic() - self._last_fetch_attempt
+            if key is None and elapsed >= self.min_refetch_interval:
+                try:
+                    await self.fetch()
+                except (httpx.HTTPError, ValueError, KeyError) as e:
+                    print(f"Failed to fetch JWKS: {e}")
+                key = self._keys.get(kid)
+        return key
+
+    async def start(self):
+        """Load the keys and start the background refresh task."""
+        try:
+            await self.fetch()
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            print(f"Failed to fetch JWKS: {e}")
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.fetch()
+            except (httpx.HTTPError, ValueError, KeyError) as e:
+                print(f"Failed to refresh JWKS: {e}")
+
+
+jwks_provider = JWKSProvider(
+    url=settings.auth0_jwks_url or f"https://{settings.auth0_domain}/.well-known/jwks.json",
+    refresh_interval=settings.jwks_refresh_interval,
+    min_refetch_interval=settings.jwks_min_refetch_interval,
+)
+
+# Claims of already verified tokens, keyed by the token's SHA-256 so raw
+# tokens are never held in memory. Entries expire at the token's `exp`.
+token_cache = TTLCache(maxsize=settings.token_cache_size, ttl=0)
+
+
+def is_auth_configured() -> bool:
+    """Whether Auth0 is configured; otherwise tokens are not verified."""
+    return settings.auth0_domain not in ("", "your-tenant.us.auth0.com")
+
+
+def user_from_claims(payload: dict) -> dict:
+    return {
+        "sub": payload.get("sub", ""),
+        "email": payload.get("email", ""),
+        "name": payload.get("name", ""),
+        "picture": payload.get("picture", ""),
+    }
 
 
 async def get_current_user(
@@ -42,18 +126,18 @@ async def get_current_user(
 
     try:
         # For development, allow a simple token format
-        if settings.auth0_domain == "" or settings.auth0_domain == "your-tenant.us.auth0.com":
+        if not is_auth_configured():
             # Development mode - decode without verification
-            payload = jwt.get_unverified_claims(token)
-            return {
-                "sub": payload.get("sub", ""),
-                "email": payload.get("email", ""),
-                "name": payload.get("name", ""),
-                "picture": payload.get("picture", ""),
-            }
+            return user_from_claims(jwt.get_unverified_claims(token))
+
+        # Production mode - verify with Auth0, reusing earlier verifications
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        user = token_cache.get(token_hash)
+        if user is not MISSING:
+            return user
 
-        # Production mode - verify with Auth0
-        public_key = get_public_key(token)
+        unverified_header = jwt.get_unverified_header(token)
+        public_key = await jwks_provider.get_key(unverified_header.get("kid"))
         if not public_key:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,15 +152,40 @@ async def get_current_user(
             issuer=f"https://{settings.auth0_domain}/",
         )
 
-        return {
-            "sub": payload.get("sub", ""),
-            "email": payload.get("email", ""),
-            "name": payload.get("name", ""),
-            "picture": payload.get("picture", ""),
-        }
+        user = user_from_claims(payload)
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)) and exp > time.time():
+            token_cache.set(token_hash, user, ttl=exp - time.time())
+        return user
 
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Could not validate credentials: {str(e)}",
         )
+
+
+def is_admin(user: dict) -> bool:
+    """Whether the user is listed in ADMIN_USER_IDS."""
+    return user["sub"] in {
+        user_id.strip() for user_id in settings.admin_user_ids.split(",") if user_id.strip()
+    }
+
+
+async def get_admin_user(user: dict = Depends(get_current_user)) -> dict:
+    """Like get_current_user, but only for admins."""
+    if not is_admin(user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return user
+
+
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> Optional[dict]:
+    """Return the user when a token is sent, None for anonymous requests."""
+    if credentials is None:
+        return None
+    return await get_current_user(credentials)
@@ -0,0 +1,38 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+
+
+def comment_document(post_id, comment) -> dict:
+    """Convert an embedded comment into a comments collection document."""
+    try:
+        comment_id = ObjectId(comment["id"])
+    except (InvalidId, KeyError, TypeError):
+        comment_id = ObjectId()
+
+    return {
+        "_id": comment_id,
+        "post_id": post_id,
+        "author_id": comment["author_id"],
+        "author_name": comment["author_name"],
+        "text": comment["text"],
+        "created_at": comment["created_at"],
+    }
+
+
+async def copy_embedded_comments(db, post_id, comments: list):
+    """Copy a post's embedded comments into the comments collection.
+
+    Comments keep their original ids, so ones copied earlier are skipped.
+    """
+    if not comments:
+        return
+    try:
+        await db.comments.insert_many(
+            [comment_document(post_id, comment) for comment in comments],
+            ordered=False,
+        )
+    except BulkWriteError as e:
+        # Duplicate keys mean the comment was already copied.
+        if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+            raise
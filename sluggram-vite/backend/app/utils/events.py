@@ -0,0 +1,87 @@
+import re
+from datetime import date, datetime, time, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+from ..config import get_settings
+
+settings = get_settings()
+
+# Event dates and times are entered as campus wall-clock time; datetimes are
+# stored as naive UTC like every other timestamp.
+EVENT_TZ = ZoneInfo(settings.event_timezone)
+
+DATE_FORMATS = (
+    "%Y-%m-%d",  # <input type="date">
+    "%m/%d/%Y",
+    "%m/%d/%y",
+    "%B %d, %Y",
+    "%b %d, %Y",
+    "%A, %B %d, %Y",
+    "%B %d %Y",
+    "%b %d %Y",
+    "%d %B %Y",
+)
+TIME_FORMATS = (
+    "%H:%M",  # <input type="time">
+    "%H:%M:%S",
+    "%I:%M %p",
+    "%I:%M%p",
+    "%I %p",
+    "%I%p",
+)
+TIME_RANGE_SEPARATOR = re.compile(r"\s*(?:-|–|TO)\s*")
+
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC; naive input is taken as UTC."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_event_date(value: str) -> Optional[date]:
+    value = " ".join(value.strip().split())
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def parse_event_time(value: str) -> Optional[time]:
+    # "7-9pm" and "18:00 - 20:00" start at the first time given
+    parts = TIME_RANGE_SEPARATOR.split(value.strip().upper().replace(".", ""), maxsplit=1)
+    start = parts[0]
+    if len(parts) == 2 and parts[1][-2:] in ("AM", "PM") and start[-2:] not in ("AM", "PM"):
+        start += parts[1][-2:]
+    if start == "NOON":
+        return time(12, 0)
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(start, fmt).time()
+        except ValueError:
+            pass
+    return None
+
+
+def parse_event_start(event_date: Optional[str], event_time: Optional[str]) -> Optional[datetime]:
+    """Combine the legacy date and time strings into a naive UTC datetime.
+
+    Returns None when the date can't be parsed. A missing or unparseable
+    time means the start of the day.
+    """
+    day = parse_event_date(event_date) if event_date else None
+    if day is None:
+        return None
+    start = (parse_event_time(event_time) if event_time else None) or time(0, 0)
+    return to_utc_naive(datetime.combine(day, start, tzinfo=EVENT_TZ))
+
+
+def event_local_fields(starts_at: datetime) -> dict:
+    """The legacy date/time strings for a naive UTC start, in campus time."""
+    local = starts_at.replace(tzinfo=timezone.utc).astimezone(EVENT_TZ)
+    return {
+        "event_date": local.strftime("%Y-%m-%d"),
+        "event_time": local.strftime("%H:%M"),
+    }
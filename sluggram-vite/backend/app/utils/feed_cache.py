@@ -0,0 +1,196 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from ..config import get_settings
+from .cache import MISSING, TTLCache
+
+settings = get_settings()
+
+# A cached page is the encoded JSON body plus the X-Next-Cursor value.
+Page = Tuple[bytes, Optional[str]]
+
+# Feed scope that every post belongs to, next to its own post type.
+ALL_POSTS = "all"
+POST_TYPES = ("general", "event", "study", "reel")
+
+
+class MemoryFeedBackend:
+    """Pages in a size-bounded LRU inside this process.
+
+    Generations live in the process too, so a worker only sees the writes
+    it handled itself: with several workers, the others keep serving their
+    cached pages until they expire. Use it with a single worker only.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._pages = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = self._pages.get(key)
+        return None if value is MISSING else value
+
+    async def set(self, key: str, value: bytes):
+        self._pages.set(key, value)
+
+    async def generation(self, scope: str) -> int:
+        return self._generations.get(scope, 0)
+
+    async def bump(self, *scopes: str):
+        for scope in scopes:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+
+    async def close(self):
+        pass
+
+    def stats(self) -> dict:
+        stats = self._pages.stats()
+        return {
+            "size": stats["size"],
+            "maxsize": stats["maxsize"],
+            "evictions": stats["evictions"],
+        }
+
+
+class RedisFeedBackend:
+    """Pages in Redis (or anything speaking its protocol), shared by workers.
+
+    Entries expire with SETEX; memory beyond that is bounded by the server's
+    maxmemory policy. Generations are plain counters, so an invalidation
+    from any worker is seen by all of them.
+    """
+
+    def __init__(self, url: str, ttl: int):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(f"feed:page:{key}")
+
+    async def set(self, key: str, value: bytes):
+        await self.client.set(f"feed:page:{key}", value, ex=self.ttl)
+
+    async def generation(self, scope: str) -> int:
+        value = await self.client.get(f"feed:gen:{scope}")
+        return int(value) if value else 0
+
+    async def bump(self, *scopes: str):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                pipe.incr(f"feed:gen:{scope}")
+            await pipe.execute()
+
+    async def close(self):
+        await self.client.aclose()
+
+    def stats(self) -> dict:
+        return {"ttl": self.ttl}
+
+
+class FeedCache:
+    """Pre-serialized feed pages keyed by (scope, view, cursor, limit).
+
+    Invalidation is by generation: every key embeds the current generation
+    of its scope (a post type, or "all"), and a write bumps the generation
+    of the post's type and of "all". Older pages are never read again and
+    age out of the backend. Concurrent misses on one key share a single
+    load, so a cold page costs one query however many requests hit it.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def get_or_load(
+        self,
+        scope: str,
+        key: tuple,
+        load: Callable[[], Awaitable[Page]],
+    ) -> Page:
+        """Return the cached page, loading and storing it on a miss."""
+        generation = await self.backend.generation(scope)
+        full_key = ":".join([scope, str(generation), *map(str, key)])
+
+        cached = await self.backend.get(full_key)
+        if cached is not None:
+            self.hits += 1
+            return unpack_page(cached)
+
+        inflight = self._inflight.get(full_key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[full_key] = future
+        try:
+            page = await load()
+            # Stored under the generation read before loading, so a write
+            # that lands mid-load leaves this page unreachable.
+            await self.backend.set(full_key, pack_page(page))
+            future.set_result(page)
+            return page
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; don't warn when nobody was waiting.
+            future.exception()
+            raise
+        finally:
+            del self._inflight[full_key]
+
+    async def invalidate(self, post_type: Optional[str] = None):
+        """Drop cached pages that could contain a post of post_type."""
+        self.invalidations += 1
+        scopes = [ALL_POSTS, post_type] if post_type else [ALL_POSTS]
+        await self.backend.bump(*scopes)
+
+    async def invalidate_all(self):
+        """Drop every cached page, e.g. after a write touching many posts."""
+        self.invalidations += 1
+        await self.backend.bump(ALL_POSTS, *POST_TYPES)
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            **self.backend.stats(),
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+def pack_page(page: Page) -> bytes:
+    body, next_cursor = page
+    return (next_cursor or "").encode() + b"\n" + body
+
+
+def unpack_page(value: bytes) -> Page:
+    cursor, _, body = value.partition(b"\n")
+    return body, cursor.decode() or None
+
+
+def create_feed_cache() -> Optional[FeedCache]:
+    """Build the feed cache selected by FEED_CACHE_BACKEND, or None if off."""
+    if settings.feed_cache_backend == "memory":
+        return FeedCache(MemoryFeedBackend(settings.feed_cache_size, settings.feed_cache_ttl))
+    if settings.feed_cache_backend == "redis":
+        return FeedCache(RedisFeedBackend(settings.feed_cache_url, settings.feed_cache_ttl))
+    return None
+
+
+feed_cache = create_feed_cache()
@@ -0,0 +1,257 @@
+import asyncio
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+from PIL import Image, ImageOps
+from ..config import get_settings
+from .feed_cache import feed_cache
+from .storage import BLOB_DIR, blob_path
+
+settings = get_settings()
+
+# Resized copies generated for every uploaded image, by longest side in px.
+# Clients pick the smallest variant that fits the slot they render into.
+VARIANT_SIZES = {
+    "thumb": 320,
+    "feed": 1080,
+    "full": 2048,
+}
+
+# A "queued" status older than this was lost with a restarted worker's
+# in-memory queue, so the next upload of the image may queue it again
+QUEUED_EXPIRY = timedelta(minutes=10)
+
+VARIANT_DIR = BLOB_DIR / "variants"
+VARIANT_FILENAME = re.compile(r"^([0-9a-f]{64})-(thumb|feed|full)\.(webp|jpg)$")
+
+
+def variant_path(sha256: str, name: str, fmt: str) -> Path:
+    return VARIANT_DIR / sha256[:2] / sha256[2:4] / f"{sha256}-{name}.{fmt}"
+
+
+def _save_atomic(image: Image.Image, destination: Path, **options):
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            image.save(out, **options)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def render_variants(source: str, sha256: str) -> dict:
+    """Write WebP and JPEG variants of an image; runs in a worker process.
+
+    EXIF orientation is applied to the pixels and all metadata is dropped,
+    so variants carry no location data from the original photo.
+    """
+    with Image.open(source) as original:
+        original.seek(0)  # first frame of animated GIF/WebP
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        variants = {}
+        for name, max_side in VARIANT_SIZES.items():
+            resized = image.copy()
+            resized.thumbnail((max_side, max_side), Image.LANCZOS)
+
+            _save_atomic(
+                resized,
+                variant_path(sha256, name, "webp"),
+                format="WEBP",
+                quality=80,
+                method=4,
+            )
+            _save_atomic(
+                resized.convert("RGB"),
+                variant_path(sha256, name, "jpg"),
+                format="JPEG",
+                quality=85,
+                optimize=True,
+                progressive=True,
+            )
+            variants[name] = {
+                "width": resized.width,
+                "height": resized.height,
+                "webp": f"/upload/variants/{sha256}-{name}.webp",
+                "jpeg": f"/upload/variants/{sha256}-{name}.jpg",
+            }
+    return variants
+
+
+class ImagePipeline:
+    """Bounded queue of variant jobs processed in a ProcessPoolExecutor.
+
+    Image decoding and encoding happen in worker processes, so they never
+    block the event loop. Results are stored on the blob record and copied
+    to every post that uses the image.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue: Optional[asyncio.Queue] = None
+        self.queue_size = queue_size
+        self.db = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks = []
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # Workers are started from a clean server process rather than forked
+        # from this one, which already runs the MongoDB driver's threads
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(method),
+        )
+
+    async def start(self, db):
+        self.db = db
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._pool = self._new_pool()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def submit(self, blob: dict) -> str:
+        """Queue variant generation for an image blob and return its status.
+
+        Each image is queued once: a blob that is already queued, or whose
+        variants failed, is left as it is when the same content is uploaded
+        again.
+        """
+        if blob.get("variants"):
+            return "ready"
+        if not (blob.get("content_type") or "").startswith("image/"):
+            return "unsupported"
+        if self.queue is None:
+            return "disabled"
+        if self.queue.full():
+            self.rejected += 1
+            await self.db.blobs.update_one(
+                {"_id": blob["_id"]}, {"$set": {"variants_status": "rejected"}}
+            )
+            return "rejected"
+
+        # Claim the blob before queuing so a fast worker's "ready" wins and
+        # concurrent duplicate uploads don't queue it twice
+        now = datetime.utcnow()
+        claimed = await self.db.blobs.update_one(
+            {
+                "_id": blob["_id"],
+                "variants": {"$exists": False},
+                "$or": [
+                    {"variants_status": {"$nin": ["queued", "failed"]}},
+                    {
+                        "variants_status": "queued",
+                        "variants_queued_at": {"$lt": now - QUEUED_EXPIRY},
+                    },
+                ],
+            },
+            {"$set": {"variants_status": "queued", "variants_queued_at": now}},
+        )
+        if not claimed.matched_count:
+            current = await self.db.blobs.find_one(
+                {"_id": blob["_id"]}, {"variants": 1, "variants_status": 1}
+            )
+            if current and current.get("variants"):
+                return "ready"
+            return (current or {}).get("variants_status", "queued")
+        try:
+            self.queue.put_nowait(blob["_id"])
+        except asyncio.QueueFull:
+            self.rejected += 1
+            await self.db.blobs.update_one(
+                {"_id": blob["_id"]}, {"$set": {"variants_status": "rejected"}}
+            )
+            return "rejected"
+        return "queued"
+
+    async def _render(self, source: str, sha256: str, retry: bool = True) -> dict:
+        """Run render_variants in the pool, replacing the pool if it broke.
+
+        A worker process that dies (e.g. killed for memory) breaks the whole
+        pool and every job in flight on it. Those jobs are retried once on a
+        new pool; an image that breaks that one too is given up on.
+        """
+        pool = self._pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, render_variants, source, sha256
+            )
+        except BrokenProcessPool:
+            if self._pool is pool:
+                print("Image worker process died; starting a new pool")
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+                self.restarts += 1
+            if not retry:
+                raise
+            return await self._render(source, sha256, retry=False)
+
+    async def _worker(self):
+        while True:
+            sha256 = await self.queue.get()
+            try:
+                blob = await self.db.blobs.find_one({"_id": sha256})
+                if not blob or blob.get("variants"):
+                    continue
+                source = str(blob_path(sha256, blob["ext"]))
+                variants = await self._render(source, sha256)
+                await self.db.blobs.update_one(
+                    {"_id": sha256},
+                    {"$set": {"variants": variants, "variants_status": "ready"}},
+                )
+                result = await self.db.posts.update_many(
+                    {"blob_ids": sha256},
+                    {"$set": {"image_variants": variants}},
+                )
+                if result.modified_count and feed_cache:
+                    await feed_cache.invalidate_all()
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                print(f"Image variants failed for {sha256}: {e}")
+                await self.db.blobs.update_one(
+                    {"_id": sha256}, {"$set": {"variants_status": "failed"}}
+                )
+            finally:
+                self.queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "queue_size": self.queue_size,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
+
+
+image_pipeline = ImagePipeline(
+    workers=settings.image_workers,
+    queue_size=settings.image_queue_size,
+)
@@ -0,0 +1,196 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+from bson import ObjectId
+from pymongo import UpdateOne
+from ..config import get_settings
+from .feed_cache import feed_cache
+from .trending import TRENDING_WEIGHTS, trending_stage
+
+settings = get_settings()
+
+
+class BufferedPost:
+    """A post loaded into the buffer plus the likes not yet written back."""
+
+    __slots__ = ("post", "changes")
+
+    def __init__(self, post: dict):
+        post["likes"] = list(post.get("likes") or [])
+        post["like_count"] = len(post["likes"])
+        self.post = post
+        # user id -> liked; a user who toggles twice nets out to no entry
+        self.changes: Dict[str, bool] = {}
+
+
+class LikeBuffer:
+    """Write-behind buffer for likes on hot posts.
+
+    Toggles are applied to an in-memory copy of the post, so each caller
+    sees their own like at once, and are written back with one bulk_write
+    every `interval` seconds, or sooner once `max_ops` toggles are waiting.
+    A user liking and unliking within one interval costs no write at all.
+
+    Each flush writes absolute adds and removes, so likes buffered by other
+    workers don't conflict. The buffered copies are dropped on flush and
+    reloaded on the next toggle, which bounds how stale they can get.
+    Buffered likes are lost if the process dies before they are flushed.
+    """
+
+    def __init__(self, interval: float, max_ops: int):
+        self.interval = interval
+        self.max_ops = max_ops
+        self.db = None
+        self._posts: Dict[ObjectId, BufferedPost] = {}
+        self._loading: Dict[ObjectId, asyncio.Future] = {}
+        self._flushing: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._early_flush: Optional[asyncio.Task] = None
+        self._ops = 0
+        self.toggles = 0
+        self.writes = 0
+        self.flushes = 0
+        self.failed = 0
+
+    async def start(self, db):
+        self.db = db
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write back whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._early_flush:
+            await self._early_flush
+        while self._flushing:
+            await self._flushing
+        await self.flush()
+
+    async def toggle(self, post_id: ObjectId, user_id: str) -> Optional[dict]:
+        """Like or unlike a post; returns the post as buffered, or None if missing."""
+        # Loop in case a flush took the post between loading and resuming
+        while post_id not in self._posts:
+            if await self._load(post_id) is None:
+                return None
+        buffered = self._posts[post_id]
+
+        likes = buffered.post["likes"]
+        liked = user_id not in likes
+        if liked:
+            likes.append(user_id)
+        else:
+            likes.remove(user_id)
+        buffered.post["like_count"] = len(likes)
+        if buffered.changes.pop(user_id, None) is None:
+            buffered.changes[user_id] = liked
+
+        self.toggles += 1
+        self._ops += 1
+        if self._ops >= self.max_ops and not (self._early_flush and not self._early_flush.done()):
+            self._early_flush = asyncio.create_task(self.flush())
+        return buffered.post
+
+    def discard(self, post_id: ObjectId):
+        """Forget a post's buffered likes, e.g. because it was deleted."""
+        self._posts.pop(post_id, None)
+
+    async def _load(self, post_id: ObjectId) -> Optional[BufferedPost]:
+        # A post being flushed is reloaded only once its likes are written.
+        while self._flushing:
+            await self._flushing
+        if post_id in self._posts:
+            return self._posts[post_id]
+        if post_id in self._loading:
+            return await asyncio.shield(self._loading[post_id])
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[post_id] = future
+        try:
+            post = await self.db.posts.find_one({"_id": post_id})
+            buffered = BufferedPost(post) if post else None
+            if buffered:
+                self._posts[post_id] = buffered
+            future.set_result(buffered)
+            return buffered
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._loading[post_id]
+
+    def _update(self, post_id: ObjectId, changes: Dict[str, bool]) -> UpdateOne:
+        added = [user_id for user_id, liked in changes.items() if liked]
+        removed = [user_id for user_id, liked in changes.items() if not liked]
+        kept = {
+            "$filter": {
+                "input": {"$ifNull": ["$likes", []]},
+                "cond": {"$not": {"$in": ["$$this", {"$literal": added + removed}]}},
+            }
+        }
+        delta = (len(added) - len(removed)) * TRENDING_WEIGHTS["likes"]
+        return UpdateOne(
+            {"_id": post_id},
+            [
+                {
+                    "$set": {
+                        "likes": {"$concatArrays": [kept, {"$literal": added}]},
+                        "updated_at": datetime.utcnow(),
+                    }
+                },
+                {"$set": {"like_count": {"$size": "$likes"}}},
+                trending_stage(delta),
+            ],
+        )
+
+    async def flush(self):
+        """Write every buffered post's net like changes in one bulk_write."""
+        if not self._posts or self._flushing:
+            return
+        self._flushing = asyncio.get_running_loop().create_future()
+        posts, self._posts = self._posts, {}
+        self._ops = 0
+        try:
+            updates: List[UpdateOne] = [
+                self._update(post_id, buffered.changes)
+                for post_id, buffered in posts.items()
+                if buffered.changes
+            ]
+            if updates:
+                await self.db.posts.bulk_write(updates, ordered=False)
+                self.writes += len(updates)
+                if feed_cache:
+                    for post_type in {b.post["type"] for b in posts.values() if b.changes}:
+                        await feed_cache.invalidate(post_type)
+            self.flushes += 1
+        except Exception as e:
+            # Keep the likes buffered and try again on the next flush
+            print(f"Flushing buffered likes failed: {e}")
+            self.failed += 1
+            self._posts = {**self._posts, **posts}
+        finally:
+            self._flushing.set_result(None)
+            self._flushing = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            # Shielded so stop() never cancels a bulk_write halfway
+            await asyncio.shield(self.flush())
+
+    def stats(self) -> dict:
+        return {
+            "buffered_posts": len(self._posts),
+            "toggles": self.toggles,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "failed": self.failed,
+        }
+
+
+like_buffer = (
+    LikeBuffer(settings.like_buffer_interval, settings.like_buffer_max_ops)
+    if settings.like_buffer
+    else None
+)
@@ -0,0 +1,195 @@
+import mimetypes
+import os
+import stat
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+import anyio
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from .storage import CHUNK_SIZE
+
+# Uploaded files are named by UUID (or content hash) and never rewritten, so
+# clients and CDNs may cache them for as long as they like.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# More ranges than this in one request is treated as abuse and answered
+# with the whole file instead.
+MAX_RANGES = 16
+
+
+def make_etag(st: os.stat_result) -> str:
+    """Strong ETag from file size and mtime.
+
+    Stored media is immutable, so size and mtime identify the content
+    without hashing the file on every request.
+    """
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if weak and tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, st: os.stat_result) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(st.st_mtime) <= since
+
+
+def _if_range_matches(header: str, etag: str, st: os.stat_result) -> bool:
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        # If-Range requires a strong comparison
+        return header == etag
+    try:
+        return int(parsedate_to_datetime(header).timestamp()) == int(st.st_mtime)
+    except (TypeError, ValueError):
+        return False
+
+
+def parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """Parse a `bytes=` Range header into merged, inclusive (start, end) pairs.
+
+    Returns None when the header should be ignored (malformed, a unit other
+    than bytes, or too many ranges) and an empty list when no range can be
+    satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        start_text, sep, end_text = part.strip().partition("-")
+        if not sep:
+            return None
+        try:
+            if start_text == "":
+                # Suffix range: the last N bytes
+                length = int(end_text)
+                if length <= 0:
+                    continue
+                start, end = max(size - length, 0), size - 1
+            else:
+                start = int(start_text)
+                end = int(end_text) if end_text else size - 1
+        except ValueError:
+            return None
+        if start < 0 or end < start:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+async def _read_ranges(path: Path, ranges: List[Tuple[int, int]], parts: List[bytes] = None):
+    """Yield the bytes of each range, interleaved with multipart headers."""
+    async with await anyio.open_file(path, "rb") as f:
+        for i, (start, end) in enumerate(ranges):
+            if parts:
+                yield parts[i]
+            await f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        if parts:
+            yield parts[-1]
+
+
+def media_response(request: Request, path: Path) -> Response:
+    """Serve a stored media file with validators, conditional GET and ranges."""
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="File not found")
+    if not stat.S_ISREG(st.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    size = st.st_size
+    etag = make_etag(st)
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    # Conditional GET; If-None-Match takes precedence over If-Modified-Since
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag, weak=True):
+            return Response(status_code=304, headers=headers)
+    elif _not_modified_since(request.headers.get("if-modified-since", ""), st):
+        return Response(status_code=304, headers=headers)
+
+    ranges = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or _if_range_matches(if_range, etag, st)):
+        ranges = parse_range(range_header, size)
+        if ranges == []:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    head = request.method == "HEAD"
+    if not ranges:
+        headers["Content-Length"] = str(size)
+        if head or size == 0:
+            return Response(status_code=200, headers=headers, media_type=content_type)
+        body = _read_ranges(path, [(0, size - 1)])
+        return StreamingResponse(body, headers=headers, media_type=content_type)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        if head:
+            return Response(status_code=206, headers=headers, media_type=content_type)
+        body = _read_ranges(path, ranges)
+        return StreamingResponse(body, status_code=206, headers=headers, media_type=content_type)
+
+    boundary = uuid.uuid4().hex
+    parts = [
+        (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode()
+        for start, end in ranges
+    ]
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+    length = sum(len(p) for p in parts) + sum(end - start + 1 for start, end in ranges)
+    headers["Content-Length"] = str(length)
+    media_type = f"multipart/byteranges; boundary={boundary}"
+    if head:
+        return Response(status_code=206, headers=headers, media_type=media_type)
+    body = _read_ranges(path, ranges, parts)
+    return StreamingResponse(body, status_code=206, headers=headers, media_type=media_type)
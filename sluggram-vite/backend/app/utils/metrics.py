@@ -0,0 +1,283 @@
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+from pymongo import monitoring
+from ..config import get_settings
+
+settings = get_settings()
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Prometheus text exposition format; the response adds the charset
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(
+        '{}="{}"'.format(
+            name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in zip(names, values)
+    )
+
+
+def label_set(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    labels = format_labels(names, values)
+    return f"{{{labels}}}" if labels else ""
+
+
+class Counter:
+    """Prometheus counter with one series per combination of label values.
+
+    Thread-safe, since the MongoDB listeners run on Motor's worker threads.
+    """
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+        for label_values, value in series:
+            lines.append(f"{self.name}{label_set(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    """Prometheus histogram with one series per combination of label values.
+
+    Thread-safe, since the MongoDB listeners run on Motor's worker threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # Per series: a count per bucket, then +Inf, then the sum
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            all_series = sorted((key, list(series)) for key, series in self._series.items())
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        for label_values, series in all_series:
+            labels = format_labels(self.labels, label_values)
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            labels = label_set(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+request_duration = Histogram(
+    "sluggram_http_request_duration_seconds",
+    "Time to handle an HTTP request, by route template and status.",
+    ("method", "route", "status"),
+)
+mongo_command_duration = Histogram(
+    "sluggram_mongodb_command_duration_seconds",
+    "MongoDB command round trip time, by command and collection.",
+    ("command", "collection", "outcome"),
+)
+mongo_slow_commands = Counter(
+    "sluggram_mongodb_slow_commands_total",
+    "MongoDB commands slower than SLOW_QUERY_MS.",
+    ("command", "collection"),
+)
+pool_checkout_duration = Histogram(
+    "sluggram_mongodb_pool_checkout_seconds",
+    "Time spent waiting for a MongoDB connection from the pool.",
+)
+pool_checkout_failures = Counter(
+    "sluggram_mongodb_pool_checkout_failures_total",
+    "Failed MongoDB connection checkouts, by reason.",
+    ("reason",),
+)
+event_loop_lag = Histogram(
+    "sluggram_event_loop_lag_seconds",
+    "How late the event loop ran a timer, sampled every LOOP_LAG_INTERVAL seconds.",
+)
+
+METRICS = (
+    request_duration,
+    mongo_command_duration,
+    mongo_slow_commands,
+    pool_checkout_duration,
+    pool_checkout_failures,
+    event_loop_lag,
+)
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text format."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each request by route template and status.
+
+    Labels use the matched route's path, e.g. /api/posts/{post_id}, so
+    series don't multiply with ids; requests no route matched share one.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                route.path if route else "unmatched",
+                str(status_code),
+            )
+
+
+def command_collection(event) -> str:
+    """The collection a command targets, or "" for database commands."""
+    if event.command_name == "getMore":
+        return event.command.get("collection", "")
+    target = event.command.get(event.command_name)
+    return target if isinstance(target, str) else ""
+
+
+class CommandTimer(monitoring.CommandListener):
+    """Times every MongoDB command and logs the slow ones."""
+
+    def __init__(self):
+        # The collection is only in the started event's command
+        self._collections: Dict[Tuple[object, int], str] = {}
+
+    def started(self, event):
+        self._collections[(event.connection_id, event.request_id)] = command_collection(event)
+
+    def succeeded(self, event):
+        self._record(event, "ok")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+    def _record(self, event, outcome: str):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        seconds = event.duration_micros / 1e6
+        mongo_command_duration.observe(seconds, event.command_name, collection, outcome)
+        if seconds * 1000 >= settings.slow_query_ms:
+            mongo_slow_commands.inc(event.command_name, collection)
+            print(
+                f"Slow MongoDB command: {event.command_name} on "
+                f"{event.database_name}.{collection} took {seconds * 1000:.0f} ms"
+            )
+
+
+class PoolTimer(monitoring.ConnectionPoolListener):
+    """Times how long operations wait to check a connection out of the pool.
+
+    A checkout starts and finishes on the same thread, so the start time
+    is kept thread-locally.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        pool_checkout_duration.observe(time.perf_counter() - self._local.started)
+
+    def connection_check_out_failed(self, event):
+        pool_checkout_failures.inc(str(event.reason))
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+def mongo_listeners() -> list:
+    """Event listeners for the MongoDB client, none when metrics are off."""
+    if not settings.metrics_enabled:
+        return []
+    return [CommandTimer(), PoolTimer()]
+
+
+async def event_loop_lag_loop():
+    """Sample how late the event loop wakes a sleeping task."""
+    interval = settings.loop_lag_interval
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(0.0, time.perf_counter() - started - interval))
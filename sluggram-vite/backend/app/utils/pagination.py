@@ -0,0 +1,123 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+# Header carrying the cursor for the next page, so list endpoints can keep
+# returning a plain JSON array.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(value, object_id: ObjectId) -> str:
+    """Encode the sort key of the last item on a page as an opaque cursor.
+
+    The key is a datetime for chronological pages, or a number for pages
+    ranked by a score.
+    """
+    key = {"t": value.isoformat()} if isinstance(value, datetime) else {"r": value}
+    raw = json.dumps({**key, "id": str(object_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ranked: bool = False) -> tuple:
+    """Decode a cursor back into its (value, _id) sort key.
+
+    ranked says whether the cursor must come from a page ranked by a score
+    or from a chronological one; a cursor of the other kind is rejected
+    rather than quietly matching nothing.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = float(data["r"]) if ranked else datetime.fromisoformat(data["t"])
+        return value, ObjectId(data["id"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def after_cursor(
+    query: dict,
+    cursor: Optional[str],
+    field: str = "created_at",
+    direction: int = -1,
+    ranked: bool = False,
+) -> dict:
+    """Restrict a query to documents that sort after the given cursor.
+
+    Pass ranked=True when `field` is a score rather than a datetime.
+    """
+    if not cursor:
+        return query
+
+    value, object_id = decode_cursor(cursor, ranked)
+    after = "$lt" if direction < 0 else "$gt"
+    position = {
+        "$or": [
+            {field: {after: value}},
+            {field: value, "_id": {after: object_id}},
+        ]
+    }
+    # $and rather than merging, so an $or already in the query is kept
+    return {"$and": [query, position]} if query else position
+
+
+async def fetch_page(
+    collection,
+    query: dict,
+    limit: int,
+    cursor: Optional[str] = None,
+    field: str = "created_at",
+    projection: Optional[dict] = None,
+    direction: int = -1,
+    ranked: bool = False,
+):
+    """Fetch one page sorted newest first on `field`, then `_id`.
+
+    Pass direction=1 to page oldest first instead, and ranked=True when
+    `field` is a score. Returns the documents and the cursor for the
+    following page, or None when this is the last page.
+    """
+    sort = [(field, direction), ("_id", direction)]
+    find = collection.find(after_cursor(query, cursor, field, direction, ranked), projection)
+    docs = await find.sort(sort).limit(limit + 1).to_list(length=limit + 1)
+    return split_page(docs, limit, field)
+
+
+async def aggregate_page(
+    collection,
+    query: dict,
+    limit: int,
+    cursor: Optional[str] = None,
+    field: str = "created_at",
+    project: Optional[dict] = None,
+    direction: int = -1,
+    ranked: bool = False,
+):
+    """Like fetch_page, but shapes documents with an aggregation $project.
+
+    Use this when the projection computes fields (counts, flags) from the
+    stored document instead of just selecting them.
+    """
+    pipeline = [
+        {"$match": after_cursor(query, cursor, field, direction, ranked)},
+        {"$sort": {field: direction, "_id": direction}},
+        {"$limit": limit + 1},
+    ]
+    if project:
+        pipeline.append({"$project": project})
+    docs = await collection.aggregate(pipeline).to_list(length=limit + 1)
+    return split_page(docs, limit, field)
+
+
+def split_page(docs: list, limit: int, field: str = "created_at"):
+    """Trim a limit + 1 result to one page and work out the next cursor."""
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1][field], docs[-1]["_id"])
+    return docs, next_cursor
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Dict, List, Optional, Set
+from fastapi import Depends
+from ..config import get_settings
+from ..database import get_database
+from .cache import MISSING, TTLCache
+
+settings = get_settings()
+
+# Author details denormalized onto posts and comments, keyed by auth0_id.
+# Users without a profile are cached as None so repeat lookups stay cheap;
+# creating or updating a profile must invalidate the entry.
+profile_cache = TTLCache(
+    maxsize=settings.profile_cache_size,
+    ttl=settings.profile_cache_ttl,
+)
+
+PROFILE_PROJECTION = {"_id": 0, "auth0_id": 1, "username": 1, "avatar_url": 1}
+
+
+def profile_helper(user) -> dict:
+    """Reduce a MongoDB user document to the author fields we cache."""
+    return {
+        "username": user.get("username"),
+        "avatar_url": user.get("avatar_url"),
+    }
+
+
+class AuthorLoader:
+    """Request-scoped batcher for author profile lookups.
+
+    Every load() issued during the same event-loop tick is merged into a
+    single `$in` query against users; cached profiles skip the query.
+    """
+
+    def __init__(self, db, cache: TTLCache = profile_cache):
+        self.db = db
+        self.cache = cache
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._dispatch_scheduled = False
+        # asyncio only keeps weak references to tasks; these keep running
+        # dispatches alive until they have resolved their futures
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def load(self, auth0_id: str) -> Optional[dict]:
+        """Return the cached author fields for auth0_id, or None if no profile."""
+        profile = self.cache.get(auth0_id)
+        if profile is not MISSING:
+            return profile
+
+        future = self._pending.get(auth0_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[auth0_id] = future
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                # Starts on the next loop iteration, after this tick's loads
+                task = loop.create_task(self._dispatch())
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+        return await future
+
+    async def load_many(self, auth0_ids: List[str]) -> List[Optional[dict]]:
+        return list(await asyncio.gather(*(self.load(i) for i in auth0_ids)))
+
+    async def _dispatch(self):
+        pending, self._pending = self._pending, {}
+        self._dispatch_scheduled = False
+
+        try:
+            cursor = self.db.users.find(
+                {"auth0_id": {"$in": list(pending)}},
+                PROFILE_PROJECTION,
+            )
+            users = await cursor.to_list(length=None)
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        found = {user["auth0_id"]: profile_helper(user) for user in users}
+        for auth0_id, future in pending.items():
+            profile = found.get(auth0_id)
+            self.cache.set(auth0_id, profile)
+            if not future.done():
+                future.set_result(profile)
+
+
+def get_author_loader(db=Depends(get_database)) -> AuthorLoader:
+    """Dependency providing a fresh AuthorLoader for each request."""
+    return AuthorLoader(db)
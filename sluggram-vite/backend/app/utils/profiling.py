@@ -0,0 +1,267 @@
+import asyncio
+import secrets
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from ..config import get_settings
+from .auth import get_current_user, is_admin
+
+settings = get_settings()
+
+# Only requests to these routers can be profiled
+PROFILED_PREFIXES = ("/api/posts", "/api/users", "/api/upload")
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Leaf frame of samples taken while the request was waiting, e.g. on MongoDB
+WAITING = ("(waiting)", "", 0)
+
+Frame = Tuple[str, str, int]
+
+# Requests being profiled, and the GIL switch interval to restore after them
+_active = 0
+_switch_interval = sys.getswitchinterval()
+
+
+class RequestProfile:
+    """Wall-clock sampling profile of one request.
+
+    A thread samples the event loop thread every `interval` seconds. While
+    the request's task is running, the sample is the thread's stack; while
+    it is suspended, it is the chain of coroutines the task is awaiting in,
+    ending in a (waiting) frame. Stacks are cut at the profiling
+    middleware, so they don't include the server or other requests.
+
+    The sampler needs the GIL to take a sample, so while any request is
+    profiled the interpreter's switch interval (5 ms by default) is
+    lowered to half the sampling interval.
+    """
+
+    def __init__(self, method: str, path: str, interval: float, root_code):
+        self.id = secrets.token_hex(8)
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.sampled = False
+        self.started_at = datetime.utcnow()
+        self.duration = 0.0
+        self._started = 0.0
+        self.interval = interval
+        self.frames: List[Frame] = []
+        self.samples: List[Tuple[int, ...]] = []
+        self.weights: List[float] = []
+        self._frame_ids: Dict[Frame, int] = {}
+        self._root_code = root_code
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        global _active, _switch_interval
+        if not _active:
+            _switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(_switch_interval, self.interval / 2))
+        _active += 1
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        global _active
+        self.duration = time.perf_counter() - self._started
+        self._stop.set()
+        self._thread.join()
+        _active -= 1
+        if not _active:
+            sys.setswitchinterval(_switch_interval)
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            stack = self._stack()
+            now = time.perf_counter()
+            # Don't record the request waiting for this thread to stop
+            if stack and not self._stop.is_set():
+                self.samples.append(tuple(self._frame_id(frame) for frame in stack))
+                self.weights.append(now - last)
+            last = now
+
+    def _frame_id(self, frame: Frame) -> int:
+        frame_id = self._frame_ids.get(frame)
+        if frame_id is None:
+            frame_id = self._frame_ids[frame] = len(self.frames)
+            self.frames.append(frame)
+        return frame_id
+
+    def _stack(self) -> List[Frame]:
+        """The request's current stack, root first."""
+        frames = []
+        if asyncio.current_task(self._loop) is self._task:
+            frame = sys._current_frames().get(self._thread_id)
+            while frame is not None and frame.f_code is not self._root_code:
+                frames.append(frame)
+                frame = frame.f_back
+            if frame is None:
+                return []
+            frames.append(frame)
+            frames.reverse()
+            waiting = False
+        else:
+            coro = self._task.get_coro()
+            while coro is not None:
+                frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+                if frame is None:
+                    break
+                frames.append(frame)
+                coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+            for i, frame in enumerate(frames):
+                if frame.f_code is self._root_code:
+                    frames = frames[i:]
+                    break
+            else:
+                return []
+            waiting = True
+
+        stack = [
+            (f.f_code.co_qualname, f.f_code.co_filename, f.f_code.co_firstlineno)
+            for f in frames
+        ]
+        return stack + [WAITING] if waiting else stack
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "sampled": self.sampled,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "samples": len(self.samples),
+        }
+
+    def to_speedscope(self) -> dict:
+        """The profile in speedscope's file format (https://www.speedscope.app)."""
+        name = f"{self.method} {self.path}"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "sluggram",
+            "shared": {
+                "frames": [
+                    {"name": n, "file": file, "line": line} if file else {"name": n}
+                    for n, file, line in self.frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(self.weights),
+                    "samples": [list(sample) for sample in self.samples],
+                    "weights": self.weights,
+                }
+            ],
+        }
+
+
+class ProfileStore:
+    """The most recent profiles, oldest dropped first."""
+
+    def __init__(self, size: int):
+        self._profiles: Deque[RequestProfile] = deque(maxlen=size)
+
+    def add(self, profile: RequestProfile):
+        self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        for profile in self._profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def list(self) -> List[RequestProfile]:
+        return list(reversed(self._profiles))
+
+
+profile_store = ProfileStore(settings.profile_buffer_size)
+
+
+async def requested_by_admin(scope) -> bool:
+    """Whether an admin asked for this request to be profiled.
+
+    Asking is an X-Profile header or a ?profile= query parameter; anyone
+    else's flag is ignored and the request runs normally.
+    """
+    headers = dict(scope["headers"])
+    if PROFILE_HEADER not in headers and b"profile=" not in scope["query_string"]:
+        return False
+    scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user = await get_current_user(
+            HTTPAuthorizationCredentials(scheme=scheme, credentials=token)
+        )
+    except HTTPException:
+        return False
+    return is_admin(user)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling admin-flagged requests and 1 in N others.
+
+    Only installed when PROFILING_ENABLED is set. Profiled responses carry
+    an X-Profile-Id header; the profile itself is kept in profile_store.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(PROFILED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        requested = await requested_by_admin(scope)
+        sampled = False
+        if not requested and settings.profile_sample_rate:
+            self._requests += 1
+            sampled = self._requests % settings.profile_sample_rate == 0
+        if not (requested or sampled):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(
+            scope["method"], scope["path"], settings.profile_interval,
+            ProfilingMiddleware.__call__.__code__,
+        )
+        profile.sampled = sampled
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER.lower().encode(), profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            route = scope.get("route")
+            profile.route = route.path if route else None
+            profile_store.add(profile)
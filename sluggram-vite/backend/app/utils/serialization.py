@@ -0,0 +1,26 @@
+from typing import Any, Optional
+from fastapi.responses import ORJSONResponse, Response
+from .pagination import NEXT_CURSOR_HEADER
+
+# Hot read paths build response dicts that already match their
+# response_model field for field, in the same order, so they skip FastAPI's
+# second validation pass and are encoded with orjson. The bytes are the same
+# as the validated path produces: orjson writes naive datetimes in the same
+# ISO format as pydantic and does not escape non-ASCII, like FastAPI's
+# JSONResponse.
+
+
+def json_response(
+    content: Any,
+    status_code: int = 200,
+    next_cursor: Optional[str] = None,
+) -> ORJSONResponse:
+    """Encode already-shaped response content without re-validating it."""
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def encoded_json_response(body: bytes, next_cursor: Optional[str] = None) -> Response:
+    """Send a JSON body that was encoded earlier, e.g. a cached page."""
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return Response(body, media_type="application/json", headers=headers)
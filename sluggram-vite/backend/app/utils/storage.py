@@ -0,0 +1,302 @@
+import hashlib
+import os
+import re
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from pymongo.errors import DuplicateKeyError
+from ..config import get_settings
+
+settings = get_settings()
+
+# Uploads are copied in fixed-size chunks so memory use per request stays
+# constant no matter how large the file is.
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Room in a multipart body for boundaries, part headers and small fields,
+# on top of the file itself
+FORM_OVERHEAD = 64 * 1024  # 64KB
+
+# Content-addressed media store: each distinct file is kept once, named by
+# its SHA-256 and sharded two levels deep (ab/cd/abcd....ext) so no single
+# directory grows too large. The `blobs` collection tracks how many posts
+# reference each file.
+BLOB_DIR = Path(settings.upload_dir) / "blobs"
+BLOB_TMP_DIR = BLOB_DIR / "tmp"
+BLOB_TMP_DIR.mkdir(parents=True, exist_ok=True)
+
+BLOB_FILENAME = re.compile(r"^([0-9a-f]{64})\.([A-Za-z0-9]{1,10})$")
+BLOB_URL = re.compile(r"/upload/blobs/([0-9a-f]{64})\.[A-Za-z0-9]{1,10}$")
+
+
+def blob_path(sha256: str, ext: str) -> Path:
+    return BLOB_DIR / sha256[:2] / sha256[2:4] / f"{sha256}.{ext}"
+
+
+def file_ext(filename: Optional[str], default: str) -> str:
+    """Extension to store a file under, falling back to default if unusable."""
+    ext = filename.split(".")[-1].lower() if filename and "." in filename else ""
+    return ext if re.fullmatch(r"[a-z0-9]{1,10}", ext) else default
+
+
+def blob_helper(blob) -> dict:
+    """Convert a MongoDB blob document to the upload response format."""
+    filename = f"{blob['_id']}.{blob['ext']}"
+    return {
+        "url": f"/upload/blobs/{filename}",
+        "filename": filename,
+        "size": blob["size"],
+        "sha256": blob["_id"],
+    }
+
+
+def blob_ids_from_urls(*urls: Optional[str]) -> List[str]:
+    """Extract blob references from media URLs stored on a post."""
+    ids = []
+    for url in urls:
+        match = BLOB_URL.search(url or "")
+        if match and match.group(1) not in ids:
+            ids.append(match.group(1))
+    return ids
+
+
+def _write_chunk(out, digest, chunk: bytes):
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _finish(out):
+    out.flush()
+    os.fsync(out.fileno())
+    out.close()
+
+
+def _unlink(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _discard(out, tmp_path: str):
+    out.close()
+    _unlink(tmp_path)
+
+
+class _FormFile:
+    """python-multipart callbacks that keep the bytes of one file field.
+
+    The parser calls these synchronously from write(); they only queue the
+    field's data, which the caller then writes out off the event loop.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.found = False
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.pending: List[bytes] = []
+        self._in_field = False
+        self._headers = {}
+        self._header_name = b""
+        self._header_value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if self.found or name != self.field or b"filename" not in options:
+            return
+        self.found = self._in_field = True
+        self.filename = options[b"filename"].decode("utf-8", "replace")
+        self.content_type = self._headers.get(b"content-type", b"").decode("latin-1")
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_field:
+            self.pending.append(data[start:end])
+
+    def on_part_end(self):
+        self._in_field = False
+
+
+async def stream_upload(
+    request: Request,
+    allowed_types: List[str],
+    max_size: int,
+    too_large_detail: str,
+    field: str = "file",
+) -> dict:
+    """Stream the `field` file of a multipart request to a temp file.
+
+    The body is parsed straight off the connection instead of through
+    request.form(), which spools the whole body to disk before the handler
+    runs. A Content-Length over the limit is rejected before anything is
+    read, and any other body as soon as the limit is crossed. Disk writes
+    and hashing run off the event loop. Returns the temp file's path with
+    the size and SHA-256 of the content and the part's filename and content
+    type; the caller is expected to commit or delete the file.
+    """
+    too_large = HTTPException(status_code=400, detail=too_large_detail)
+    body_limit = max_size + FORM_OVERHEAD
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > body_limit:
+        raise too_large
+
+    mimetype, options = parse_options_header(request.headers.get("content-type", ""))
+    if mimetype != b"multipart/form-data" or not options.get(b"boundary"):
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    form = _FormFile(field)
+    parser = MultipartParser(options[b"boundary"], form.callbacks())
+    fd, tmp_path = tempfile.mkstemp(dir=BLOB_TMP_DIR, prefix="upload-", suffix=".part")
+    out = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    received = size = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > body_limit:
+                raise too_large
+            try:
+                parser.write(chunk)
+            except MultipartParseError:
+                raise HTTPException(status_code=400, detail="Malformed multipart upload")
+            if form.found and form.content_type not in allowed_types:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid file type. Allowed: {', '.join(allowed_types)}",
+                )
+            if form.pending:
+                data = b"".join(form.pending)
+                form.pending.clear()
+                size += len(data)
+                if size > max_size:
+                    raise too_large
+                await run_in_threadpool(_write_chunk, out, digest, data)
+        if not form.found:
+            raise HTTPException(status_code=400, detail=f"Missing {field} upload")
+        await run_in_threadpool(_finish, out)
+    except BaseException:
+        await run_in_threadpool(_discard, out, tmp_path)
+        raise
+
+    return {
+        "path": tmp_path,
+        "size": size,
+        "sha256": digest.hexdigest(),
+        "filename": form.filename,
+        "content_type": form.content_type,
+    }
+
+
+def _place(tmp_path: str, destination: Path) -> bool:
+    """Rename tmp_path into place unless the blob already exists on disk."""
+    if destination.exists():
+        os.unlink(tmp_path)
+        return False
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_path, destination)
+    return True
+
+
+async def commit_blob(
+    db,
+    tmp_path: str,
+    sha256: str,
+    size: int,
+    ext: str,
+    content_type: str,
+) -> dict:
+    """Move a fully written temp file into the blob store.
+
+    If the content is already stored, the temp file is dropped and the
+    existing blob is returned, so duplicates never take extra space. The
+    file is placed before its record is written, so a record never points
+    at a file that failed to land.
+    """
+    existing = await db.blobs.find_one({"_id": sha256}, {"ext": 1})
+    if existing:
+        ext = existing["ext"]
+    destination = blob_path(sha256, ext)
+    placed = await run_in_threadpool(_place, tmp_path, destination)
+
+    try:
+        blob = await db.blobs.find_one_and_update(
+            {"_id": sha256},
+            {
+                "$setOnInsert": {
+                    "ext": ext,
+                    "size": size,
+                    "content_type": content_type,
+                    "refcount": 0,
+                    "created_at": datetime.utcnow(),
+                }
+            },
+            upsert=True,
+            return_document=True,
+        )
+    except DuplicateKeyError:
+        # A concurrent upload of the same content won the upsert
+        blob = await db.blobs.find_one({"_id": sha256})
+    if placed and blob["ext"] != ext:
+        # ...and recorded it under another extension, so ours is unused
+        await run_in_threadpool(_unlink, str(destination))
+    return blob
+
+
+async def store_upload(
+    db,
+    request: Request,
+    allowed_types: List[str],
+    default_ext: str,
+    max_size: int,
+    too_large_detail: str,
+) -> dict:
+    """Stream a multipart upload into the blob store and return its blob record."""
+    stored = await stream_upload(request, allowed_types, max_size, too_large_detail)
+    try:
+        return await commit_blob(
+            db,
+            stored["path"],
+            stored["sha256"],
+            stored["size"],
+            file_ext(stored["filename"], default_ext),
+            stored["content_type"],
+        )
+    except BaseException:
+        await run_in_threadpool(_unlink, stored["path"])
+        raise
+
+
+async def add_blob_refs(db, blob_ids: List[str], delta: int):
+    """Adjust the reference counts of blobs used by a post."""
+    if blob_ids:
+        await db.blobs.update_many({"_id": {"$in": blob_ids}}, {"$inc": {"refcount": delta}})
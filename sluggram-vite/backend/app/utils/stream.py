@@ -0,0 +1,117 @@
+import asyncio
+from typing import Optional, Set
+import orjson
+from ..config import get_settings
+
+settings = get_settings()
+
+# Last event sent to a subscriber dropped for falling behind; it missed
+# events, so its client should refetch before listening again.
+OVERFLOW = b"event: overflow\ndata: {}\n\n"
+
+
+class Subscriber:
+    """One live connection: a bounded queue of encoded events."""
+
+    __slots__ = ("queue", "post_type")
+
+    def __init__(self, maxsize: int, post_type: Optional[str]):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.post_type = post_type
+
+    def close(self, last: Optional[bytes] = None):
+        """End the stream after the queued events, making room if needed.
+
+        `last` is sent just before the end, after discarding the oldest
+        events when the queue is too full to take it.
+        """
+        closing = ([last] if last else []) + [None]
+        while self.queue.maxsize - self.queue.qsize() < len(closing):
+            self.queue.get_nowait()
+        for item in closing:
+            self.queue.put_nowait(item)
+
+
+class Broker:
+    """In-process pub/sub fanning post deltas out to live connections.
+
+    Each event is encoded once and the same bytes are queued for every
+    subscriber. publish never waits: a subscriber whose queue is full has
+    stopped keeping up, so it is dropped with an `overflow` event telling
+    its client to refetch, instead of events piling up in memory.
+    """
+
+    def __init__(self, queue_size: int, max_connections: int):
+        self.queue_size = max(2, queue_size)  # room for overflow + end
+        self.max_connections = max_connections
+        self._subscribers: Set[Subscriber] = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, post_type: Optional[str] = None) -> Optional[Subscriber]:
+        """Register a connection, or return None when the worker is full."""
+        if len(self._subscribers) >= self.max_connections:
+            return None
+        subscriber = Subscriber(self.queue_size, post_type)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event: str, post_type: str, data: dict):
+        """Queue an event for every subscriber following post_type."""
+        if not self._subscribers:
+            return
+        message = b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+        self.published += 1
+        slow = []
+        for subscriber in self._subscribers:
+            if subscriber.post_type not in (None, post_type):
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                slow.append(subscriber)
+        for subscriber in slow:
+            self._subscribers.discard(subscriber)
+            subscriber.close(OVERFLOW)
+            self.dropped += 1
+
+    def close(self):
+        """End every stream, e.g. on shutdown."""
+        for subscriber in self._subscribers:
+            subscriber.close()
+        self._subscribers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "connections": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+async def event_stream(subscriber: Subscriber, heartbeat: float):
+    """Yield a subscriber's events as Server-Sent Events.
+
+    A comment line goes out when nothing happened for `heartbeat` seconds,
+    which keeps proxies from closing idle connections and lets the server
+    notice clients that went away.
+    """
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if message is None:
+                break
+            yield message
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+broker = Broker(settings.stream_queue_size, settings.stream_max_connections)
@@ -0,0 +1,40 @@
+import re
+from typing import Optional
+
+# "cse101", "CSE 101" and "Cse-101" are all the same course
+COURSE_CODE = re.compile(r"^([A-Z]+)\s*-?\s*(\d+[A-Z]*)$")
+
+# Pipeline stage keeping a study group's has_space flag in step with its
+# maintained member_count, so open groups can be found through an index.
+HAS_SPACE_STAGE = {
+    "$set": {
+        "has_space": {"$lt": ["$member_count", {"$ifNull": ["$max_members", 10]}]}
+    }
+}
+
+
+def normalize_course(course: Optional[str]) -> Optional[str]:
+    """Canonical form of a course code, e.g. "cse101" -> "CSE 101"."""
+    if not course:
+        return None
+    course = " ".join(course.upper().split())
+    match = COURSE_CODE.match(course)
+    if match:
+        return f"{match.group(1)} {match.group(2)}"
+    return course
+
+
+async def update_course_counts(
+    db,
+    course_key: Optional[str],
+    groups: int = 0,
+    open_groups: int = 0,
+):
+    """Adjust the per-course study group counts served by the course facets."""
+    if not course_key or not (groups or open_groups):
+        return
+    await db.course_counts.update_one(
+        {"_id": course_key},
+        {"$inc": {"groups": groups, "open_groups": open_groups}},
+        upsert=True,
+    )
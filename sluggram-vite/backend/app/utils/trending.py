@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+from ..config import get_settings
+
+settings = get_settings()
+
+# Engagement weight per kind of engagement a user can add or take back.
+TRENDING_WEIGHTS = {
+    "likes": 1,
+    "saves": 2,
+    "comments": 2,
+    "members": 3,
+}
+
+# Scores that have decayed below this drop out of the trending index.
+MIN_TRENDING_SCORE = 0.01
+
+
+def decayed_score(now: datetime) -> dict:
+    """Expression for a post's trending score decayed to `now`.
+
+    The score halves every `trending_half_life` seconds since it was last
+    written.
+    """
+    elapsed = {"$subtract": [now, {"$ifNull": ["$trending_updated_at", now]}]}
+    return {
+        "$multiply": [
+            {"$ifNull": ["$trending_score", 0]},
+            {"$pow": [0.5, {"$divide": [elapsed, settings.trending_half_life * 1000]}]},
+        ]
+    }
+
+
+def trending_stage(delta) -> dict:
+    """Pipeline stage decaying the score to now and then adding delta.
+
+    delta may be a number or an expression evaluated against the updated
+    document, e.g. one that checks whether a toggle added or removed a user.
+    """
+    now = datetime.utcnow()
+    return {
+        "$set": {
+            "trending_score": {"$max": [0, {"$add": [decayed_score(now), delta]}]},
+            "trending_updated_at": now,
+        }
+    }
+
+
+def toggle_trending_stage(field: str, user_id: str) -> dict:
+    """Score a toggle on field: +weight if the user was added, -weight if removed.
+
+    Goes after toggle_pipeline, so it sees the array after the toggle.
+    """
+    weight = TRENDING_WEIGHTS[field]
+    added = {"$in": [{"$literal": user_id}, {"$ifNull": [f"${field}", []]}]}
+    return trending_stage({"$cond": [added, weight, -weight]})
+
+
+async def decay_trending_scores(db) -> int:
+    """Bring stale trending scores up to date and drop the ones that faded.
+
+    Between passes, scores only decay when their post is engaged with, so
+    untouched posts are overrated by at most one interval's worth of decay.
+    Scores written within the last interval are already that accurate and
+    are left alone.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=settings.trending_decay_interval)
+    score = decayed_score(now)
+    result = await db.posts.update_many(
+        {"trending_score": {"$gt": 0}, "trending_updated_at": {"$lt": stale}},
+        [
+            {
+                "$set": {
+                    "trending_score": {
+                        "$cond": [{"$lt": [score, MIN_TRENDING_SCORE]}, 0, score]
+                    },
+                    "trending_updated_at": now,
+                }
+            }
+        ],
+    )
+    return result.modified_count
+
+
+async def trending_decay_loop(db):
+    """Periodically re-decay trending scores."""
+    while True:
+        await asyncio.sleep(settings.trending_decay_interval)
+        try:
+            await decay_trending_scores(db)
+        except Exception as e:
+            print(f"Trending decay failed: {e}")
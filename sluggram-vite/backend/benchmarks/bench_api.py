@@ -0,0 +1,268 @@
+"""Mixed API load: throughput and p50/p95/p99 latency per endpoint.
+
+Boots app.main:app in-process (ASGI, lifespan included), seeds `--posts`
+posts with benchmarks.dataset, then runs `--concurrency` clients for
+`--duration` seconds, each picking its next request from the `--mix` of
+feed reads, single-post reads, likes, comments and image uploads. Reads
+favour recent posts, as real traffic does. Settings come from the
+environment as usual, e.g. FEED_CACHE_BACKEND=none to measure uncached
+feeds.
+
+By default it runs against the MongoDB at MONGODB_URL, normally a local
+server. `--mongo memory` swaps in an in-memory stand-in (mongomock-motor,
+not a dependency of the app) for machines without one. It executes queries
+in Python, one at a time and far slower than MongoDB, so keep it to a few
+thousand posts and only compare its numbers with each other.
+
+`--output` saves the results as JSON. `--baseline` compares against an
+earlier file and exits non-zero if any endpoint's p95 latency rose, or its
+throughput fell, by more than `--threshold`.
+
+Run from the backend directory (seeding 1M posts takes a few minutes):
+
+    python -m benchmarks.bench_api --posts 100000 --output before.json
+    python -m benchmarks.bench_api --posts 100000 --baseline before.json
+    python -m benchmarks.bench_api --mongo memory --posts 2000 --concurrency 10
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from benchmarks.stats import percentile
+
+ENDPOINTS = ("feed", "post", "like", "comment", "upload")
+DEFAULT_MIX = "feed=50,post=30,like=10,comment=7,upload=3"
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS or not weight.isdigit():
+            raise argparse.ArgumentTypeError(
+                f"expected e.g. {DEFAULT_MIX}; endpoints are {', '.join(ENDPOINTS)}"
+            )
+        mix[name] = int(weight)
+    return {name: weight for name, weight in mix.items() if weight}
+
+
+def summarize(timings: dict, errors: dict, duration: float) -> dict:
+    results = {}
+    for name, samples in timings.items():
+        results[name] = {
+            "requests": len(samples),
+            "errors": errors[name],
+            "throughput": round(len(samples) / duration, 1),
+            "p50_ms": round(percentile(samples, 0.50), 2) if samples else None,
+            "p95_ms": round(percentile(samples, 0.95), 2) if samples else None,
+            "p99_ms": round(percentile(samples, 0.99), 2) if samples else None,
+        }
+    return results
+
+
+def regressions(results: dict, baseline: dict, threshold: float) -> list:
+    """Endpoints whose p95 or throughput got worse than the baseline by > threshold."""
+    found = []
+    for name, current in results["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if not before or not before["requests"] or not current["requests"]:
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            found.append(f"{name}: p95 {before['p95_ms']} ms -> {current['p95_ms']} ms")
+        if current["throughput"] < before["throughput"] * (1 - threshold):
+            found.append(
+                f"{name}: throughput {before['throughput']} -> {current['throughput']} req/s"
+            )
+    return found
+
+
+def make_images(count: int) -> list:
+    """Distinct small JPEGs, so uploads aren't deduplicated against each other."""
+    from PIL import Image
+
+    rng = random.Random(2)
+    images = []
+    for _ in range(count):
+        image = Image.effect_noise((256, 256), rng.uniform(10, 100)).convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+
+async def run(client, post_ids, args, images):
+    """Drive the mix for the warm-up and then the measured duration."""
+    from jose import jwt
+
+    # Auth0 is unconfigured here, so the dev-mode unverified token is accepted.
+    tokens = []
+    for i in range(min(args.users, 1000)):
+        token = jwt.encode({"sub": f"auth0|user{i}"}, "bench", algorithm="HS256")
+        tokens.append({"Authorization": f"Bearer {token}"})
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    post_types = (None, "general", "event", "study", "reel")
+    timings = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    uploads = 0
+
+    def recent_post(rng):
+        # Reads and engagement cluster on the newest posts
+        return post_ids[min(len(post_ids) - 1, int(rng.expovariate(1 / 200)))]
+
+    async def request(name, rng, headers):
+        nonlocal uploads
+        if name == "feed":
+            post_type = rng.choice(post_types)
+            params = {"limit": 20, "view": rng.choice(("full", "summary"))}
+            if post_type:
+                params["post_type"] = post_type
+            return await client.get("/api/posts/", params=params, headers=headers)
+        if name == "post":
+            return await client.get(f"/api/posts/{recent_post(rng)}", headers=headers)
+        if name == "like":
+            return await client.post(f"/api/posts/{recent_post(rng)}/like", headers=headers)
+        if name == "comment":
+            return await client.post(
+                f"/api/posts/{recent_post(rng)}/comment",
+                json={"text": "see you there!"},
+                headers=headers,
+            )
+        uploads += 1
+        image = images[uploads % len(images)]
+        return await client.post(
+            "/api/upload/image",
+            files={"file": ("photo.jpg", image, "image/jpeg")},
+            headers=headers,
+        )
+
+    async def worker(n, started, deadline):
+        rng = random.Random(n)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            name = rng.choices(names, weights)[0]
+            headers = rng.choice(tokens)
+            begin = time.perf_counter()
+            response = await request(name, rng, headers)
+            elapsed = time.perf_counter() - begin
+            if begin < started:
+                continue  # warm-up
+            if response.status_code >= 400:
+                errors[name] += 1
+            else:
+                timings[name].append(elapsed)
+            # In-memory queries don't yield; let the other clients run
+            await asyncio.sleep(0)
+
+    started = time.perf_counter() + args.warmup
+    deadline = started + args.duration
+    await asyncio.gather(*(worker(n, started, deadline) for n in range(args.concurrency)))
+    return timings, errors
+
+
+async def benchmark(args):
+    workdir = Path(tempfile.mkdtemp(prefix="sluggram-bench-"))
+    os.environ["UPLOAD_DIR"] = str(workdir / "uploads")
+    os.environ["DATABASE_NAME"] = args.database
+
+    import httpx
+    from app import database
+    from app.main import app
+    from benchmarks.dataset import seed
+
+    if args.mongo == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--mongo memory needs mongomock-motor: pip install mongomock-motor")
+        database.AsyncIOMotorClient = AsyncMongoMockClient
+
+    images = make_images(200)
+    try:
+        async with app.router.lifespan_context(app):
+            try:
+                post_ids = await seed(database.db.db, args.posts, args.users)
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://bench", timeout=None
+                ) as client:
+                    timings, errors = await run(client, post_ids, args, images)
+            finally:
+                await database.db.client.drop_database(args.database)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "started_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "mongo": args.mongo,
+            "posts": args.posts,
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "mix": args.mix,
+            "feed_cache": os.environ.get("FEED_CACHE_BACKEND", "memory"),
+        },
+        "endpoints": summarize(timings, errors, args.duration),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo", choices=("server", "memory"), default="server")
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--users", type=int, help="defaults to one per 20 posts, at least 100")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="earlier --output file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--database", default="sluggram_bench")
+    args = parser.parse_args()
+    if args.users is None:
+        args.users = max(100, args.posts // 20)
+
+    results = asyncio.run(benchmark(args))
+
+    total = 0
+    for name, result in results["endpoints"].items():
+        total += result["throughput"]
+        print(
+            f"{name:>8}: {result['throughput']:8.1f} req/s  "
+            f"p50 {result['p50_ms'] or 0:7.2f} ms  p95 {result['p95_ms'] or 0:7.2f} ms  "
+            f"p99 {result['p99_ms'] or 0:7.2f} ms  {result['errors']} errors"
+        )
+    print(f"   total: {total:8.1f} req/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline, args.threshold)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Per-request auth overhead with and without the verified-token cache.
+
+Starts a local stub JWKS server, signs RS256 tokens with a throwaway key and
+times get_current_user in production mode. "cold" clears the token cache
+before every call, so each request pays for RSA verification; "cached"
+reuses the verified claims. Also checks that an unknown kid is picked up
+after a key rotation without a restart.
+
+Run from the backend directory (no MongoDB needed):
+
+    python -m benchmarks.bench_auth --requests 2000
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+DOMAIN = "bench.example.com"
+AUDIENCE = "https://sluggram-bench"
+
+
+def b64url_uint(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+class SigningKey:
+    def __init__(self, kid: str):
+        self.kid = kid
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def jwk(self) -> dict:
+        numbers = self.private_key.public_key().public_numbers()
+        return {
+            "kty": "RSA",
+            "kid": self.kid,
+            "use": "sig",
+            "alg": "RS256",
+            "n": b64url_uint(numbers.n),
+            "e": b64url_uint(numbers.e),
+        }
+
+    def token(self, sub: str) -> str:
+        pem = self.private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        claims = {
+            "sub": sub,
+            "aud": AUDIENCE,
+            "iss": f"https://{DOMAIN}/",
+            "exp": int(time.time()) + 3600,
+        }
+        return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": self.kid})
+
+
+class StubJWKSServer:
+    """Serves a mutable list of keys at /.well-known/jwks.json."""
+
+    def __init__(self):
+        self.keys = []
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                body = json.dumps({"keys": stub.keys}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{port}/.well-known/jwks.json"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+async def time_requests(get_current_user, credentials, requests, clear_cache=None):
+    started = time.perf_counter()
+    for _ in range(requests):
+        if clear_cache:
+            clear_cache()
+        await get_current_user(credentials)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    stub = StubJWKSServer()
+    first = SigningKey("bench-1")
+    stub.keys = [first.jwk()]
+
+    # Settings are read at import time, so configure them before importing.
+    os.environ.update({
+        "AUTH0_DOMAIN": DOMAIN,
+        "AUTH0_API_AUDIENCE": AUDIENCE,
+        "AUTH0_JWKS_URL": stub.url,
+        "JWKS_MIN_REFETCH_INTERVAL": "0",
+    })
+    from fastapi.security import HTTPAuthorizationCredentials
+    from app.utils.auth import get_current_user, jwks_provider, token_cache
+
+    await jwks_provider.start()
+    try:
+        credentials = HTTPAuthorizationCredentials(
+            scheme="Bearer", credentials=first.token("bench|user")
+        )
+        cold = await time_requests(
+            get_current_user, credentials, args.requests, token_cache.clear
+        )
+        cached = await time_requests(get_current_user, credentials, args.requests)
+        print(f" cold: {cold:8.1f} us/request (RSA verify every request)")
+        print(f"cached: {cached:8.1f} us/request (verified claims reused)")
+
+        # Rotate keys: a token from a new kid must verify without a restart.
+        second = SigningKey("bench-2")
+        stub.keys = [first.jwk(), second.jwk()]
+        fetches = stub.requests
+        rotated = HTTPAuthorizationCredentials(
+            scheme="Bearer", credentials=second.token("bench|rotated")
+        )
+        user = await get_current_user(rotated)
+        print(
+            f"rotation: verified {user['sub']} after "
+            f"{stub.requests - fetches} JWKS refetch(es)"
+        )
+    finally:
+        await jwks_provider.stop()
+        stub.server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""Batch fetch endpoints vs one request per item.
+
+Seeds posts and users with benchmarks.dataset, then times fetching N of each through the app
+(in-process ASGI, so network latency is not included; real clients pay it
+once per request on top): N sequential GETs, N concurrent GETs, and a
+single POST to the batch endpoint.
+
+Run from the backend directory against a local MongoDB:
+
+    python -m benchmarks.bench_batch --sizes 10 50 100
+"""
+import argparse
+import asyncio
+import os
+import time
+
+
+async def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database", default="sluggram_bench")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_NAME"] = args.database
+    import httpx
+    from app.database import close_mongo_connection, connect_to_mongo, db
+    from app.main import app
+    from benchmarks.dataset import seed
+
+    await connect_to_mongo()
+    try:
+        count = max(args.sizes)
+        post_ids = await seed(db.db, count, count)
+        user_ids = await db.db.users.distinct("_id")
+        kinds = {
+            "posts": [str(i) for i in post_ids],
+            "users": [str(i) for i in user_ids],
+        }
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for kind, all_ids in kinds.items():
+                for size in args.sizes:
+                    ids = all_ids[:size]
+
+                    async def sequential():
+                        for item_id in ids:
+                            (await client.get(f"/api/{kind}/{item_id}")).raise_for_status()
+
+                    async def concurrent():
+                        responses = await asyncio.gather(
+                            *(client.get(f"/api/{kind}/{item_id}") for item_id in ids)
+                        )
+                        for response in responses:
+                            response.raise_for_status()
+
+                    async def batch():
+                        response = await client.post(f"/api/{kind}/batch", json={"ids": ids})
+                        response.raise_for_status()
+                        assert not response.json()["missing"]
+
+                    seq = await timed(sequential, args.repeat)
+                    conc = await timed(concurrent, args.repeat)
+                    one = await timed(batch, args.repeat)
+                    print(
+                        f"{kind:>5} x{size:<4} sequential {seq:8.2f} ms  "
+                        f"concurrent {conc:8.2f} ms  batch {one:7.2f} ms  "
+                        f"({seq / one:.0f}x / {conc / one:.0f}x)"
+                    )
+    finally:
+        await db.client.drop_database(args.database)
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
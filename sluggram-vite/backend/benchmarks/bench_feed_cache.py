@@ -0,0 +1,135 @@
+"""Feed page cache: hit rate, latency and stampede protection.
+
+Seeds a feed, then replays a read-heavy mix against get_posts (first two
+pages of each post type, with a like every `--write-every` requests) once
+without a cache and once per cache backend. Reports Mongo page loads, hit
+rate and p50/p99 latency. A cold-key burst checks that concurrent misses
+are coalesced into a single query.
+
+Run from the backend directory against a local MongoDB; add --redis-url to
+include the shared backend (any Redis-compatible server works):
+
+    python -m benchmarks.bench_feed_cache --requests 5000 --redis-url redis://localhost:6379/15
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import get_settings
+from app.routers import posts
+from app.utils.feed_cache import FeedCache, MemoryFeedBackend, RedisFeedBackend
+from benchmarks.stats import percentile
+
+POST_TYPES = [None, "general", "event", "study", "reel"]
+
+
+async def seed(db, count):
+    now = datetime.utcnow()
+    result = await db.posts.insert_many([
+        {
+            "type": POST_TYPES[1 + i % 4],
+            "author_id": f"auth0|user{i % 200}",
+            "author_name": f"Sammy Slug {i}",
+            "content": f"post {i}",
+            "likes": [],
+            "comments": [],
+            "members": [],
+            "saved_by": [],
+            "like_count": 0,
+            "comment_count": 0,
+            "member_count": 0,
+            "save_count": 0,
+            "created_at": now - timedelta(seconds=i),
+            "updated_at": now,
+        }
+        for i in range(count)
+    ])
+    await db.posts.create_index([("created_at", -1), ("_id", -1)])
+    await db.posts.create_index([("type", 1), ("created_at", -1), ("_id", -1)])
+    return [str(post_id) for post_id in result.inserted_ids[:50]]
+
+
+async def read_page(db, post_type, second_page):
+    cursor = None
+    if second_page:
+        first = await read_page(db, post_type, False)
+        cursor = first.headers.get("X-Next-Cursor")
+    return await posts.get_posts(
+        post_type=post_type, cursor=cursor, limit=20, view="full",
+        current_user=None, db=db,
+    )
+
+
+async def run(db, name, cache, post_ids, args):
+    posts.feed_cache = cache
+    if cache:
+        await cache.invalidate_all()  # a shared backend may hold older runs' pages
+    rng = random.Random(1)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    timings = []
+
+    async def one(i):
+        async with semaphore:
+            started = time.perf_counter()
+            if args.write_every and i % args.write_every == 0:
+                await posts.toggle_like(
+                    rng.choice(post_ids), current_user={"sub": f"auth0|liker{i}"}, db=db
+                )
+            else:
+                await read_page(db, rng.choice(POST_TYPES), rng.random() < 0.3)
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    stats = cache.stats() if cache else {"misses": "-", "hit_rate": 0.0}
+    print(
+        f"{name:>8}: {args.requests / elapsed:8.0f} req/s  loads={stats['misses']}  "
+        f"hit_rate={stats['hit_rate']:.1%}  p50 {percentile(timings, 0.5):6.2f} ms  "
+        f"p99 {percentile(timings, 0.99):6.2f} ms"
+    )
+
+
+async def cold_burst(db, name, cache, burst):
+    posts.feed_cache = cache
+    await cache.invalidate_all()
+    loads = cache.misses
+    await asyncio.gather(*(read_page(db, None, False) for _ in range(burst)))
+    print(f"{name:>8}: {burst} concurrent cold requests -> {cache.misses - loads} Mongo load(s)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--write-every", type=int, default=50, help="0 for read-only")
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--redis-url", default="")
+    parser.add_argument("--database", default="sluggram_bench")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(get_settings().mongodb_url)
+    db = client[args.database]
+    await db.posts.drop()
+    caches = {"memory": FeedCache(MemoryFeedBackend(maxsize=1000, ttl=30))}
+    if args.redis_url:
+        caches["redis"] = FeedCache(RedisFeedBackend(args.redis_url, ttl=30))
+    try:
+        post_ids = await seed(db, args.posts)
+        await run(db, "none", None, post_ids, args)
+        for name, cache in caches.items():
+            await run(db, name, cache, post_ids, args)
+        for name, cache in caches.items():
+            await cold_burst(db, name, cache, args.burst)
+    finally:
+        for cache in caches.values():
+            await cache.close()
+        await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""Feed payload size and latency, view=full vs view=summary.
+
+Seeds posts whose like, save and member arrays hold realistic numbers of
+auth0 ids, then calls get_posts for a page of each view and reports the
+response body size and mean/p99 latency. The summary view reduces those
+arrays to counts and the viewer's own flags inside MongoDB.
+
+Run from the backend directory against a local MongoDB:
+
+    python -m benchmarks.bench_feed_views --posts 500 --likes 2000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import get_settings
+from app.routers.posts import get_posts
+from benchmarks.stats import percentile
+
+VIEWER = "auth0|user1"
+
+
+def make_post(i: int, likes: int, now: datetime) -> dict:
+    users = [f"auth0|user{n}" for n in random.sample(range(likes * 4), likes)]
+    study = i % 4 == 2
+    return {
+        "type": "study" if study else "general",
+        "author_id": users[0],
+        "author_name": f"Sammy Slug {i}",
+        "author_avatar": None,
+        "content": "Study session at Science & Engineering Library, bring snacks!",
+        "likes": users,
+        "comments": [],
+        "members": users[:10] if study else [],
+        "saved_by": users[: likes // 10],
+        "like_count": len(users),
+        "comment_count": 0,
+        "member_count": 10 if study else 0,
+        "save_count": likes // 10,
+        "created_at": now - timedelta(minutes=i),
+        "updated_at": now,
+    }
+
+
+async def time_view(db, view, limit, requests):
+    viewer = {"sub": VIEWER}
+    timings = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await get_posts(
+            post_type=None, cursor=None, limit=limit, view=view,
+            current_user=viewer, db=db,
+        )
+        timings.append(time.perf_counter() - started)
+        size = len(response.body)
+    return size, statistics.mean(timings) * 1000, percentile(timings, 0.99)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--likes", type=int, default=2000, help="likes per post")
+    parser.add_argument("--limit", type=int, default=50, help="page size")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--database", default="sluggram_bench")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(get_settings().mongodb_url)
+    db = client[args.database]
+    await db.posts.drop()
+    try:
+        random.seed(1)
+        now = datetime.utcnow()
+        await db.posts.insert_many([make_post(i, args.likes, now) for i in range(args.posts)])
+        await db.posts.create_index([("created_at", -1), ("_id", -1)])
+
+        for view in ("full", "summary"):
+            await time_view(db, view, args.limit, 5)  # warm up
+            size, mean, p99 = await time_view(db, view, args.limit, args.requests)
+            print(
+                f"{view:>8}: {size / 1024:9.1f} KiB/page  "
+                f"mean {mean:7.2f} ms  p99 {p99:7.2f} ms"
+            )
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""Image variant throughput per core.
+
+Generates synthetic phone-sized JPEGs and runs render_variants over them in
+a ProcessPoolExecutor, the same way the upload pipeline does. Reports images
+processed per second overall and per worker process.
+
+Run from the backend directory (no MongoDB needed):
+
+    python -m benchmarks.bench_images --images 40 --workers 4
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+def make_photo(path: Path, width: int, height: int, seed: int):
+    from PIL import Image, ImageDraw
+
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for i in range(0, width, 97):
+        draw.line([(i, 0), (width - i, height)], fill=((seed * 37 + i) % 256, i % 256, 128), width=9)
+    image.save(path, format="JPEG", quality=92)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="sluggram-bench-"))
+    os.environ["UPLOAD_DIR"] = str(workdir / "uploads")
+    from app.utils.images import render_variants
+
+    try:
+        sources = []
+        for i in range(args.images):
+            path = workdir / f"photo-{i}.jpg"
+            make_photo(path, args.width, args.height, i)
+            sources.append((str(path), f"{i:064x}"))
+
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            # Warm the workers so process start-up isn't measured
+            list(pool.map(render_variants, *zip(*sources[: args.workers])))
+            started = time.perf_counter()
+            list(pool.map(render_variants, *zip(*sources)))
+            elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    rate = args.images / elapsed
+    print(f"{args.images} images of {args.width}x{args.height} with {args.workers} workers")
+    print(f"throughput: {rate:.2f} images/s ({rate / args.workers:.2f} images/s per core)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Sustained likes per second on one hot post, buffered vs direct.
+
+Runs `--concurrency` concurrent requests toggling likes on the same post
+for `--duration` seconds, each by a random one of `--fans` users, first
+with every toggle its own findOneAndUpdate and then through the
+write-behind like buffer. The post is seeded with benchmarks.dataset. Reports toggles per second, the
+toggle latency and how many writes reached MongoDB, then checks that the
+stored like_count matches the likes array.
+
+Run from the backend directory against a local MongoDB:
+
+    python -m benchmarks.bench_like_buffer --concurrency 200 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from benchmarks.stats import percentile
+
+
+async def run(toggle_like, post_id, database, concurrency, fans, duration):
+    rng = random.Random(1)
+    timings = []
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        while time.perf_counter() < deadline:
+            current_user = {"sub": f"auth0|fan{rng.randrange(fans)}"}
+            started = time.perf_counter()
+            await toggle_like(post_id, current_user=current_user, db=database)
+            timings.append(time.perf_counter() - started)
+            # Buffered toggles may not await I/O; let the other requests run
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--fans", type=int, default=5000)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--interval", type=float, default=0.01, help="buffer flush interval")
+    parser.add_argument("--max-ops", type=int, default=1000)
+    parser.add_argument("--database", default="sluggram_bench")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_NAME"] = args.database
+    os.environ["FEED_CACHE_BACKEND"] = "none"
+    from app.database import close_mongo_connection, connect_to_mongo, db
+    from app.routers import posts
+    from app.utils.like_buffer import LikeBuffer
+    from benchmarks.dataset import seed
+
+    await connect_to_mongo()
+    try:
+        (hot_post,) = await seed(db.db, 1, 100)
+        post_id = str(hot_post)
+
+        for mode in ("direct", "buffered"):
+            buffer = None
+            if mode == "buffered":
+                buffer = LikeBuffer(args.interval, args.max_ops)
+                await buffer.start(db.db)
+            posts.like_buffer = buffer
+
+            timings = await run(
+                posts.toggle_like, post_id, db.db, args.concurrency, args.fans, args.duration
+            )
+            if buffer:
+                await buffer.stop()
+            posts.like_buffer = None
+
+            p50, p99 = percentile(timings, 0.5), percentile(timings, 0.99)
+            writes = buffer.writes if buffer else len(timings)
+            print(
+                f"{mode:>8}: {len(timings) / args.duration:9.0f} likes/s  "
+                f"p50 {p50:6.2f} ms  p99 {p99:7.2f} ms  {writes} writes"
+            )
+
+            post = await db.db.posts.find_one({"_id": hot_post})
+            assert post["like_count"] == len(post["likes"]), "like_count out of step"
+    finally:
+        await db.client.drop_database(args.database)
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
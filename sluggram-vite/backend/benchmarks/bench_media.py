@@ -0,0 +1,86 @@
+"""Throughput and latency of concurrent range reads on served media.
+
+Writes a video into a scratch upload directory and issues random
+`Range: bytes=start-end` requests against /api/upload/files/videos/...
+in-process, the way a player scrubbing through reels would. Reports served
+MB/s and p50/p99 latency, plus the share of revalidations answered with 304.
+
+Run from the backend directory (no MongoDB needed):
+
+    python -m benchmarks.bench_media --requests 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.stats import percentile
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--range-kb", type=int, default=512)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="sluggram-bench-"))
+    os.environ["UPLOAD_DIR"] = str(workdir / "uploads")
+
+    import httpx
+    from app.main import app
+
+    size = args.size_mb * 1024 * 1024
+    video = Path(os.environ["UPLOAD_DIR"]) / "videos" / "bench.mp4"
+    with open(video, "wb") as f:
+        for _ in range(args.size_mb):
+            f.write(os.urandom(1024 * 1024))
+
+    url = "/api/upload/files/videos/bench.mp4"
+    span = args.range_kb * 1024
+    latencies = []
+    served = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            etag = (await client.head(url)).headers["etag"]
+
+            async def range_read():
+                nonlocal served
+                start = random.randrange(0, size - span)
+                headers = {"Range": f"bytes={start}-{start + span - 1}", "If-Range": etag}
+                async with semaphore:
+                    began = time.perf_counter()
+                    response = await client.get(url, headers=headers)
+                    latencies.append(time.perf_counter() - began)
+                assert response.status_code == 206, response.status_code
+                served += len(response.content)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(range_read() for _ in range(args.requests)))
+            elapsed = time.perf_counter() - started
+
+            revalidations = await asyncio.gather(*(
+                client.get(url, headers={"If-None-Match": etag}) for _ in range(100)
+            ))
+            not_modified = sum(r.status_code == 304 for r in revalidations)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"range reads: {args.requests} x {args.range_kb} KB, concurrency {args.concurrency}")
+    print(f"throughput: {served / 2**20 / elapsed:.0f} MB/s ({args.requests / elapsed:.0f} req/s)")
+    print(
+        f"latency: p50={percentile(latencies, 0.5):.2f}ms "
+        f"p99={percentile(latencies, 0.99):.2f}ms"
+    )
+    print(f"revalidation: {not_modified}/100 answered 304")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
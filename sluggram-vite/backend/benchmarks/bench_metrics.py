@@ -0,0 +1,150 @@
+"""Overhead of the metrics middleware and MongoDB listeners.
+
+Runs the same request mix through the app (in-process ASGI, feed cache off)
+in fresh processes, alternating METRICS_ENABLED=false and metrics on, i.e.
+the request middleware, the command and pool listeners and the event loop
+lag sampler. Reports the best requests per second of `--rounds` runs per
+endpoint and the difference. Since run-to-run noise can exceed the
+overhead, it also times the middleware and the command listener on their
+own.
+
+Run from the backend directory against a local MongoDB:
+
+    python -m benchmarks.bench_metrics --requests 5000 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+
+async def measure(args):
+    """Child process: time the request mix with the current settings."""
+    os.environ["DATABASE_NAME"] = args.database
+    os.environ["FEED_CACHE_BACKEND"] = "none"
+    import httpx
+    from app.config import get_settings
+    from app.database import close_mongo_connection, connect_to_mongo, db
+    from app.main import app
+    from app.utils.metrics import event_loop_lag_loop
+    from benchmarks.dataset import seed
+
+    await connect_to_mongo()
+    loop_lag = None
+    if get_settings().metrics_enabled:
+        loop_lag = asyncio.create_task(event_loop_lag_loop())
+    try:
+        post_ids = await seed(db.db, 200, 100)
+        post_id = str(post_ids[0])
+        paths = {
+            "health": "/api/health",
+            "post": f"/api/posts/{post_id}",
+            "feed": "/api/posts/?limit=20",
+        }
+
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, path in paths.items():
+                remaining = args.requests // 10  # warm up
+
+                async def worker():
+                    nonlocal remaining
+                    while remaining > 0:
+                        remaining -= 1
+                        (await client.get(path)).raise_for_status()
+
+                await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+                remaining = args.requests
+                started = time.perf_counter()
+                await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+                results[name] = args.requests / (time.perf_counter() - started)
+        print(json.dumps(results))
+    finally:
+        if loop_lag:
+            loop_lag.cancel()
+        await db.client.drop_database(args.database)
+        await close_mongo_connection()
+
+
+async def instrumentation_cost(count: int = 100_000):
+    """Microseconds added per request by the middleware and per command by the listener."""
+    from app.utils.metrics import CommandTimer, MetricsMiddleware
+
+    route = SimpleNamespace(path="/api/posts/{post_id}")
+
+    async def endpoint(scope, receive, send):
+        scope["route"] = route
+        await send({"type": "http.response.start", "status": 200})
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET"}
+    timings = {}
+    for name, app in (("bare", endpoint), ("middleware", MetricsMiddleware(endpoint))):
+        started = time.perf_counter()
+        for _ in range(count):
+            await app(dict(scope), None, send)
+        timings[name] = time.perf_counter() - started
+    per_request = (timings["middleware"] - timings["bare"]) / count * 1e6
+
+    listener = CommandTimer()
+    command = {"find": "posts", "filter": {}}
+    started = time.perf_counter()
+    for i in range(count):
+        event = SimpleNamespace(
+            connection_id=("localhost", 27017), request_id=i, command_name="find",
+            command=command, database_name="sluggram", duration_micros=800,
+        )
+        listener.started(event)
+        listener.succeeded(event)
+    per_command = (time.perf_counter() - started) / count * 1e6
+    return per_request, per_command
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--database", default="sluggram_bench")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(measure(args))
+        return
+
+    best = {"false": {}, "true": {}}
+    for _ in range(args.rounds):
+        for enabled in best:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_metrics", "--child", *sys.argv[1:]],
+                env={**os.environ, "METRICS_ENABLED": enabled},
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            # The child also logs its MongoDB connection; the results are
+            # the one JSON line
+            line = next(line for line in output.splitlines() if line.startswith("{"))
+            for name, rate in json.loads(line).items():
+                best[enabled][name] = max(rate, best[enabled].get(name, 0))
+
+    for name, off in best["false"].items():
+        on = best["true"][name]
+        print(
+            f"{name:>7}: metrics off {off:8.0f} req/s  on {on:8.0f} req/s  "
+            f"overhead {(off - on) / off * 100:5.1f}%"
+        )
+    per_request, per_command = asyncio.run(instrumentation_cost())
+    print(f"middleware {per_request:.1f} us per request, listener {per_command:.1f} us per command")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Post search latency over a large seeded corpus.
+
+Creates the indexes through connect_to_mongo, seeds `--posts` posts (1M by
+default) with a mix of course codes, event titles and body text, then
+times search_posts for queries of different selectivity: a rare term, a
+course code, a common word, the same with a type filter, and a second page
+fetched with the returned cursor.
+
+Run from the backend directory against a local MongoDB (seeding 1M posts
+takes a few minutes):
+
+    python -m benchmarks.bench_search --posts 1000000 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from benchmarks.stats import percentile
+
+COURSES = [
+    f"{dept} {num}"
+    for dept in ("CSE", "AM", "MATH", "PHYS", "ECON", "LIT")
+    for num in range(1, 200, 5)
+]
+WORDS = (
+    "study session library midterm final review snacks quiz homework lab "
+    "slug banana campus porter kresge cowell stevenson oakes merrill crown "
+    "coffee music hike beach redwoods bus metro dining hall project group"
+).split()
+QUERIES = [
+    ("rare term", "xylophone", None),
+    ("course", '"CSE 101"', None),
+    ("common word", "study", None),
+    ("common + type", "study", "study"),
+    ("two words", "midterm review", None),
+]
+
+
+def make_post(i: int, now: datetime, rng: random.Random) -> dict:
+    post_type = ("general", "event", "study", "reel")[i % 4]
+    words = rng.choices(WORDS, k=12)
+    if i % 50000 == 0:
+        words.append("xylophone")
+    post = {
+        "type": post_type,
+        "author_id": f"auth0|user{i % 5000}",
+        "author_name": f"Sammy Slug {i % 5000}",
+        "content": " ".join(words),
+        "likes": [],
+        "comments": [],
+        "members": [],
+        "saved_by": [],
+        "like_count": 0,
+        "comment_count": 0,
+        "member_count": 0,
+        "save_count": 0,
+        "created_at": now - timedelta(minutes=i),
+        "updated_at": now,
+    }
+    if post_type == "event":
+        post.update(
+            event_title=f"{rng.choice(WORDS).title()} night",
+            event_location=rng.choice(WORDS).title(),
+        )
+    if post_type == "study":
+        post.update(
+            group_name=f"{rng.choice(WORDS).title()} crew",
+            course=rng.choice(COURSES),
+            max_members=10,
+        )
+    return post
+
+
+async def seed(db, count, batch=10000):
+    rng = random.Random(1)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    for offset in range(0, count, batch):
+        await db.posts.insert_many(
+            [make_post(i, now, rng) for i in range(offset, min(offset + batch, count))],
+            ordered=False,
+        )
+    print(f"seeded {count} posts in {time.perf_counter() - started:.0f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--database", default="sluggram_bench")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_NAME"] = args.database
+    from app.database import close_mongo_connection, connect_to_mongo, db
+    from app.routers.posts import search_posts
+
+    await connect_to_mongo()
+    try:
+        await seed(db.db, args.posts)
+
+        async def search(q, post_type, cursor=None):
+            return await search_posts(
+                q=q, post_type=post_type, cursor=cursor, limit=args.limit,
+                view="full", current_user=None, db=db.db,
+            )
+
+        for name, q, post_type in QUERIES:
+            matches = {"$text": {"$search": q}}
+            if post_type:
+                matches["type"] = post_type
+            total = await db.db.posts.count_documents(matches)
+            first = await search(q, post_type)
+            cursor = first.headers.get("X-Next-Cursor")
+            for label, page_cursor in (("page 1", None), ("page 2", cursor)):
+                if label == "page 2" and not cursor:
+                    continue
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    await search(q, post_type, page_cursor)
+                    timings.append(time.perf_counter() - started)
+                print(
+                    f"{name:>14} {label}: {total:8d} matches  "
+                    f"p50 {percentile(timings, 0.5):8.1f} ms  "
+                    f"p99 {percentile(timings, 0.99):8.1f} ms"
+                )
+    finally:
+        await db.client.drop_database(args.database)
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
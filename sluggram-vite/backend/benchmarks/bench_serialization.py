@@ -0,0 +1,99 @@
+"""Post serialization: validated response_model path vs the fast path.
+
+The old path is what FastAPI does for `response_model=List[PostResponse]`:
+validate post_helper's dicts into PostResponse models, dump them in JSON
+mode and encode with the stdlib json module. The new path encodes
+post_helper's output directly with orjson. Both outputs are checked to be
+byte-for-byte identical before timing.
+
+Run from the backend directory (no MongoDB needed):
+
+    python -m benchmarks.bench_serialization
+"""
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from pydantic import TypeAdapter
+from app.routers.posts import post_helper
+from app.schemas import PostResponse
+from app.utils.serialization import json_response
+
+POST_TYPES = ["general", "event", "study", "reel"]
+
+
+def make_post(i: int) -> dict:
+    created_at = datetime(2026, 1, 1) + timedelta(minutes=i, microseconds=i * 1000)
+    users = [f"auth0|user{n}" for n in random.sample(range(5000), 40)]
+    post = {
+        "_id": ObjectId(),
+        "type": POST_TYPES[i % 4],
+        "author_id": users[0],
+        "author_name": f"Sammy Slug {i} 🐌",
+        "author_avatar": None,
+        "content": "Study session at Science & Engineering Library — bring snacks! " * 3,
+        "image_url": f"/upload/blobs/{i:064x}.jpg",
+        "likes": users[:25],
+        "comments": [
+            {
+                "id": str(ObjectId()),
+                "author_id": users[n],
+                "author_name": f"Commenter {n}",
+                "text": "See you there",
+                "created_at": created_at + timedelta(seconds=n),
+            }
+            for n in range(3)
+        ],
+        "members": users[:8] if i % 4 == 2 else [],
+        "saved_by": users[25:30],
+        "like_count": 25,
+        "comment_count": 3,
+        "member_count": 8 if i % 4 == 2 else 0,
+        "save_count": 5,
+        "created_at": created_at,
+    }
+    if post["type"] == "event":
+        post.update(event_title="Slug Fest", event_date="2026-05-01", event_location="East Field")
+    if post["type"] == "study":
+        post.update(group_name="CSE 101 grind", course="CSE 101", max_members=10)
+    return post
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[PostResponse])
+
+    def old(posts):
+        validated = adapter.validate_python([post_helper(p) for p in posts])
+        content = adapter.dump_python(validated, mode="json")
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def new(posts):
+        return json_response([post_helper(p) for p in posts]).body
+
+    random.seed(1)
+    for size in (10, 50, 100):
+        posts = [make_post(i) for i in range(size)]
+        assert old(posts) == new(posts), "fast path output differs"
+        old_time = timeit.timeit(lambda: old(posts), number=args.repeat) / args.repeat
+        new_time = timeit.timeit(lambda: new(posts), number=args.repeat) / args.repeat
+        print(
+            f"{size:>4} posts: old {old_time * 1000:7.3f} ms  "
+            f"new {new_time * 1000:7.3f} ms  ({old_time / new_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Soak test of the live stream: memory with many idle connections.
+
+Opens `--connections` streams against the app in this process (driving the
+ASGI app directly, so no sockets or MongoDB are involved), then publishes
+`--rate` events per second for `--duration` seconds while sampling the
+process RSS. Memory should level off once the connections are open and stay
+flat while events flow. A few connections that never read are included to
+check that slow consumers get dropped instead of buffering without bound.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_stream --connections 10000 --duration 60
+"""
+import argparse
+import asyncio
+import os
+import time
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Connection:
+    """A client of GET /api/posts/stream speaking ASGI to the app."""
+
+    def __init__(self, app, reading: bool = True):
+        self.app = app
+        self.reading = reading
+        self.disconnected = asyncio.Event()
+        self.stalled = asyncio.Event()
+        self.events = 0
+        self.task = None
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        if message["type"] != "http.response.body":
+            return
+        body = message.get("body", b"")
+        self.events += body.count(b"\n\n")
+        if not self.reading and self.events > 1:
+            await self.stalled.wait()  # a client that stopped reading
+
+    def open(self):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/posts/stream",
+            "raw_path": b"/api/posts/stream",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"bench"), (b"accept", b"text/event-stream")],
+            "client": ("127.0.0.1", 1),
+            "server": ("bench", 80),
+        }
+        self.task = asyncio.create_task(self.app(scope, self.receive, self.send))
+
+    async def close(self):
+        self.disconnected.set()
+        self.stalled.set()
+        await asyncio.wait_for(self.task, 5)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--slow", type=int, default=10, help="connections that never read")
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--rate", type=float, default=20, help="events published per second")
+    parser.add_argument("--sample", type=float, default=5, help="seconds between RSS samples")
+    args = parser.parse_args()
+
+    os.environ.setdefault("STREAM_MAX_CONNECTIONS", str(args.connections + args.slow))
+    from app.main import app
+    from app.utils.stream import broker
+
+    baseline = rss_mb()
+    print(f"baseline           rss {baseline:8.1f} MB")
+
+    started = time.perf_counter()
+    connections = [Connection(app) for _ in range(args.connections)]
+    slow = [Connection(app, reading=False) for _ in range(args.slow)]
+    for connection in connections + slow:
+        connection.open()
+    while broker.stats()["connections"] < len(connections) + len(slow):
+        await asyncio.sleep(0.1)
+    opened = rss_mb()
+    print(
+        f"{len(connections) + len(slow)} connections open in "
+        f"{time.perf_counter() - started:.1f}s  rss {opened:8.1f} MB  "
+        f"({(opened - baseline) * 1024 / (len(connections) + len(slow)):.1f} KB each)"
+    )
+
+    interval = 1 / args.rate
+    started = time.perf_counter()
+    next_sample = args.sample
+    published = 0
+    while (elapsed := time.perf_counter() - started) < args.duration:
+        delta = {"id": f"{published:024x}", "type": "general", "like_count": published}
+        broker.publish("post.liked", "general", delta)
+        published += 1
+        if elapsed >= next_sample:
+            stats = broker.stats()
+            print(
+                f"t={elapsed:5.0f}s  published {published:6d}  "
+                f"connections {stats['connections']:6d}  dropped {stats['dropped']:3d}  "
+                f"rss {rss_mb():8.1f} MB"
+            )
+            next_sample += args.sample
+        await asyncio.sleep(interval)
+
+    # Let the readers drain what is still queued
+    await asyncio.sleep(1)
+    delivered = min(connection.events for connection in connections) - 1  # minus retry
+    print(
+        f"every reader got >= {delivered} of {published} events "
+        f"({published / args.duration:.0f}/s); "
+        f"{broker.stats()['dropped']} connections dropped for falling behind"
+    )
+
+    await asyncio.gather(*(connection.close() for connection in connections + slow))
+    print(f"closed             rss {rss_mb():8.1f} MB  connections {broker.stats()['connections']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
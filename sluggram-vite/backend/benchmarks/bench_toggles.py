@@ -0,0 +1,89 @@
+"""Contention benchmark for like toggles on a single hot post.
+
+Compares the old read-modify-write toggle (find_one + $set of the whole
+array) with the atomic pipeline update used by toggle_like. Every simulated
+user likes the post exactly once, so the final like count should equal the
+number of users; anything lower is a lost update.
+
+Run from the backend directory against a local MongoDB:
+
+    python -m benchmarks.bench_toggles --users 500 --concurrency 64
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import get_settings
+from app.routers.posts import toggle_like
+
+
+async def legacy_toggle_like(db, post_id, user_id):
+    """The pre-pipeline implementation, kept here for comparison."""
+    post = await db.posts.find_one({"_id": post_id})
+    likes = post.get("likes", [])
+    if user_id in likes:
+        likes.remove(user_id)
+    else:
+        likes.append(user_id)
+    await db.posts.find_one_and_update(
+        {"_id": post_id},
+        {"$set": {"likes": likes, "updated_at": datetime.utcnow()}},
+    )
+
+
+async def atomic_toggle_like(db, post_id, user_id):
+    await toggle_like(str(post_id), current_user={"sub": user_id}, db=db)
+
+
+async def run(db, name, toggle, users, concurrency):
+    now = datetime.utcnow()
+    result = await db.posts.insert_one({
+        "type": "general",
+        "author_id": "bench",
+        "author_name": "bench",
+        "content": "hot post",
+        "likes": [],
+        "like_count": 0,
+        "created_at": now,
+        "updated_at": now,
+    })
+    post_id = result.inserted_id
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await toggle(db, post_id, f"bench|user{i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(users)))
+    elapsed = time.perf_counter() - started
+
+    post = await db.posts.find_one({"_id": post_id})
+    likes = len(post.get("likes", []))
+    print(
+        f"{name:>8}: {users / elapsed:8.0f} toggles/s  "
+        f"likes={likes}/{users}  lost={users - likes}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--database", default="sluggram_bench")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(get_settings().mongodb_url)
+    db = client[args.database]
+    await db.posts.drop()
+    try:
+        await run(db, "legacy", legacy_toggle_like, args.users, args.concurrency)
+        await run(db, "atomic", atomic_toggle_like, args.users, args.concurrency)
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""Trending feed vs chronological feed read latency at 1M posts.
+
+Creates the indexes through connect_to_mongo and seeds `--posts` posts, a
+fraction of which carry engagement and therefore a trending score. Then
+times the first two pages of get_posts (feed cache off) and get_trending,
+the cost of a like now that it also updates the score, and one full
+re-decay pass.
+
+Run from the backend directory against a local MongoDB (seeding 1M posts
+takes a few minutes):
+
+    python -m benchmarks.bench_trending --posts 1000000 --engaged 0.2
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from benchmarks.stats import percentile
+
+
+async def seed(db, count, engaged, batch=10000):
+    rng = random.Random(1)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    for offset in range(0, count, batch):
+        docs = []
+        for i in range(offset, min(offset + batch, count)):
+            created_at = now - timedelta(seconds=i * 5)
+            post = {
+                "type": ("general", "event", "study", "reel")[i % 4],
+                "author_id": f"auth0|user{i % 5000}",
+                "author_name": f"Sammy Slug {i % 5000}",
+                "content": f"post {i}",
+                "likes": [],
+                "comments": [],
+                "members": [],
+                "saved_by": [],
+                "like_count": 0,
+                "comment_count": 0,
+                "member_count": 0,
+                "save_count": 0,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+            if rng.random() < engaged:
+                post["trending_score"] = rng.expovariate(0.2)
+                post["trending_updated_at"] = created_at
+            docs.append(post)
+        await db.posts.insert_many(docs, ordered=False)
+    print(f"seeded {count} posts in {time.perf_counter() - started:.0f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--engaged", type=float, default=0.2, help="fraction with a score")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--database", default="sluggram_bench")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_NAME"] = args.database
+    os.environ["FEED_CACHE_BACKEND"] = "none"
+    from app.database import close_mongo_connection, connect_to_mongo, db
+    from app.routers.posts import get_posts, get_trending, toggle_like
+    from app.utils.trending import decay_trending_scores
+
+    await connect_to_mongo()
+    try:
+        await seed(db.db, args.posts, args.engaged)
+        feeds = {
+            "chronological": get_posts,
+            "trending": get_trending,
+        }
+        for name, endpoint in feeds.items():
+            cursor = None
+            for page in (1, 2):
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    response = await endpoint(
+                        post_type=None, cursor=cursor, limit=args.limit, view="full",
+                        current_user=None, db=db.db,
+                    )
+                    timings.append(time.perf_counter() - started)
+                p50, p99 = percentile(timings, 0.5), percentile(timings, 0.99)
+                print(f"{name:>14} page {page}: p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+                cursor = response.headers.get("X-Next-Cursor")
+
+        post = await db.db.posts.find_one({"trending_score": {"$gt": 0}}, {"_id": 1})
+        timings = []
+        for i in range(args.repeat):
+            started = time.perf_counter()
+            await toggle_like(str(post["_id"]), current_user={"sub": f"auth0|liker{i}"}, db=db.db)
+            timings.append(time.perf_counter() - started)
+        p50, p99 = percentile(timings, 0.5), percentile(timings, 0.99)
+        print(f"{'like + score':>14}       : p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+
+        started = time.perf_counter()
+        updated = await decay_trending_scores(db.db)
+        print(f"{'decay pass':>14}       : {updated} scores in {time.perf_counter() - started:.1f}s")
+    finally:
+        await db.client.drop_database(args.database)
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""Peak memory while handling parallel video uploads.
+
+Drives POST /api/upload/video in-process with N parallel uploads of the same
+on-disk file and samples the process RSS while they run. With streamed
+uploads the growth should stay roughly flat as the file size grows, instead
+of scaling with parallel uploads x file size.
+
+Run from the backend directory against a local MongoDB:
+
+    python -m benchmarks.bench_uploads --parallel 10 --size-mb 50
+"""
+import argparse
+import asyncio
+import os
+import resource
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is the peak so far (KB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def sample_peak(stop: asyncio.Event, interval: float = 0.01) -> int:
+    peak = current_rss()
+    while not stop.is_set():
+        peak = max(peak, current_rss())
+        await asyncio.sleep(interval)
+    return peak
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parallel", type=int, default=10)
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--database", default="sluggram_bench")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="sluggram-bench-"))
+    os.environ["UPLOAD_DIR"] = str(workdir / "uploads")
+    os.environ["MAX_FILE_SIZE"] = str((args.size_mb + 1) * 1024 * 1024)
+    os.environ["DATABASE_NAME"] = args.database
+
+    import httpx
+    from jose import jwt
+    from app.database import close_mongo_connection, connect_to_mongo, db
+    from app.main import app
+
+    source = workdir / "video.mp4"
+    with open(source, "wb") as f:
+        for _ in range(args.size_mb):
+            f.write(os.urandom(1024 * 1024))
+
+    # Uploads share content, but the hash is only known once each body has
+    # been streamed, so every upload still goes through the full copy.
+    # Auth0 is unconfigured here, so the dev-mode unverified token is accepted.
+    token = jwt.encode({"sub": "bench|uploader"}, "bench", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+
+    await connect_to_mongo()
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def upload():
+                with open(source, "rb") as f:
+                    response = await client.post(
+                        "/api/upload/video",
+                        files={"file": ("video.mp4", f, "video/mp4")},
+                        headers=headers,
+                        timeout=None,
+                    )
+                response.raise_for_status()
+
+            baseline = current_rss()
+            stop = asyncio.Event()
+            sampler = asyncio.create_task(sample_peak(stop))
+            started = time.perf_counter()
+            await asyncio.gather(*(upload() for _ in range(args.parallel)))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            peak = await sampler
+    finally:
+        await db.client.drop_database(args.database)
+        await close_mongo_connection()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total_mb = args.parallel * args.size_mb
+    print(f"uploads: {args.parallel} x {args.size_mb} MB in {elapsed:.2f}s ({total_mb / elapsed:.0f} MB/s)")
+    print(f"peak RSS growth: {(peak - baseline) / 2**20:.1f} MB (total uploaded {total_mb} MB)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
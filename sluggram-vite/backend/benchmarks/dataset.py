@@ -0,0 +1,184 @@
+"""Realistic SlugGram data for benchmarks.
+
+Seeds users and posts of all four types with the fields the app itself
+writes: event start times, study group course keys, members and open
+seats, skewed like counts, and comments in the `comments` collection with
+the latest few embedded on the post. Recently engaged posts get a
+trending score. Deterministic for a given seed.
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.config import get_settings
+from app.utils.events import event_local_fields
+from app.utils.study_groups import normalize_course
+from app.utils.trending import TRENDING_WEIGHTS
+from scripts.backfill_study_groups import rebuild_course_counts
+
+settings = get_settings()
+
+POST_TYPES = ("general", "event", "study", "reel")
+COURSES = [
+    f"{dept} {num}"
+    for dept in ("CSE", "AM", "MATH", "PHYS", "ECON", "LIT")
+    for num in range(1, 200, 5)
+]
+WORDS = (
+    "study session library midterm final review snacks quiz homework lab "
+    "slug banana campus porter kresge cowell stevenson oakes merrill crown "
+    "coffee music hike beach redwoods bus metro dining hall project group"
+).split()
+COLLEGES = ("Porter", "Kresge", "Cowell", "Stevenson", "Oakes", "Merrill", "Crown")
+
+
+def user_id(i: int) -> str:
+    return f"auth0|user{i}"
+
+
+def make_user(i: int, now: datetime) -> dict:
+    return {
+        "auth0_id": user_id(i),
+        "email": f"slug{i}@ucsc.edu",
+        "username": f"slug{i}",
+        "name": f"Sammy Slug {i}",
+        "major": ("CS", "Math", "Biology", "Economics", "Film")[i % 5],
+        "graduation_year": str(2026 + i % 4),
+        "bio": f"{COLLEGES[i % len(COLLEGES)]} college",
+        "avatar_url": f"https://example.com/avatars/{i}.png",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def engagement(rng: random.Random, scale: int) -> int:
+    """Heavy-tailed count: most posts get a little, a few get a lot."""
+    return min(int(rng.paretovariate(1.2)) - 1, scale)
+
+
+def make_post(
+    i: int,
+    post_id: ObjectId,
+    now: datetime,
+    rng: random.Random,
+    users: int,
+) -> tuple:
+    """A post and its comments, posted `i` minutes before `now`."""
+    post_type = POST_TYPES[i % len(POST_TYPES)]
+    author = rng.randrange(users)
+    created_at = now - timedelta(minutes=i)
+    likes = rng.sample(range(users), engagement(rng, min(users, 500)))
+    comments = [
+        {
+            "_id": ObjectId(),
+            "post_id": post_id,
+            "author_id": user_id(commenter),
+            "author_name": f"slug{commenter}",
+            "text": " ".join(rng.choices(WORDS, k=rng.randint(3, 15))),
+            "created_at": created_at + timedelta(seconds=n + 1),
+        }
+        for n, commenter in enumerate(
+            rng.choices(range(users), k=engagement(rng, 100) // 2)
+        )
+    ]
+    preview_size = settings.comment_preview_size
+    post = {
+        "_id": post_id,
+        "type": post_type,
+        "author_id": user_id(author),
+        "author_name": f"slug{author}",
+        "author_avatar": f"https://example.com/avatars/{author}.png",
+        "content": " ".join(rng.choices(WORDS, k=rng.randint(5, 40))),
+        "image_url": None,
+        "video_url": None,
+        "likes": [user_id(n) for n in likes],
+        "comments": [
+            {
+                "id": str(c["_id"]),
+                "author_id": c["author_id"],
+                "author_name": c["author_name"],
+                "text": c["text"],
+                "created_at": c["created_at"],
+            }
+            for c in (comments[-preview_size:] if preview_size else [])
+        ],
+        "members": [],
+        "like_count": len(likes),
+        "comment_count": len(comments),
+        "member_count": 0,
+        "save_count": 0,
+        "blob_ids": [],
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+    if post_type == "general" and i % 3 == 0:
+        post["image_url"] = f"https://example.com/images/{i}.jpg"
+    if post_type == "reel":
+        post["video_url"] = f"https://example.com/reels/{i}.mp4"
+    if post_type == "event":
+        starts_at = now + timedelta(hours=rng.randint(-72, 24 * 30))
+        post.update(
+            event_title=f"{rng.choice(WORDS).title()} night",
+            event_location=f"{rng.choice(COLLEGES)} {rng.choice(WORDS).title()}",
+            event_starts_at=starts_at,
+            **event_local_fields(starts_at),
+        )
+    if post_type == "study":
+        max_members = rng.choice((4, 6, 8, 10))
+        members = [author] + rng.sample(range(users), rng.randint(0, max_members - 1))
+        members = list(dict.fromkeys(members))
+        course = rng.choice(COURSES)
+        post.update(
+            group_name=f"{course} {rng.choice(WORDS)} crew",
+            course=course,
+            course_key=normalize_course(course),
+            meeting_time=f"{rng.choice(('Mon', 'Tue', 'Wed', 'Thu'))} 6pm",
+            study_location=f"{rng.choice(COLLEGES)} library",
+            max_members=max_members,
+            members=[user_id(n) for n in members],
+            member_count=len(members),
+            has_space=len(members) < max_members,
+        )
+
+    # Posts from the last two days with engagement are on the trending feed
+    if created_at > now - timedelta(days=2) and (likes or comments):
+        post["trending_score"] = (
+            len(likes) * TRENDING_WEIGHTS["likes"]
+            + len(comments) * TRENDING_WEIGHTS["comments"]
+        )
+        post["trending_updated_at"] = now
+    return post, comments
+
+
+async def seed(db, posts: int, users: int, batch: int = 10000, seed: int = 1) -> list:
+    """Insert `users` users and `posts` posts; returns the post ids, newest first."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    started = time.perf_counter()
+
+    for offset in range(0, users, batch):
+        await db.users.insert_many(
+            [make_user(i, now) for i in range(offset, min(offset + batch, users))],
+            ordered=False,
+        )
+
+    post_ids = [ObjectId() for _ in range(posts)]
+    comments = 0
+    for offset in range(0, posts, batch):
+        docs, comment_docs = [], []
+        for i in range(offset, min(offset + batch, posts)):
+            post, post_comments = make_post(i, post_ids[i], now, rng, users)
+            docs.append(post)
+            comment_docs.extend(post_comments)
+        await db.posts.insert_many(docs, ordered=False)
+        if comment_docs:
+            await db.comments.insert_many(comment_docs, ordered=False)
+        comments += len(comment_docs)
+
+    await rebuild_course_counts(db)
+    print(
+        f"seeded {users} users, {posts} posts and {comments} comments "
+        f"in {time.perf_counter() - started:.0f}s"
+    )
+    return post_ids
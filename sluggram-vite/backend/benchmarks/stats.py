@@ -0,0 +1,10 @@
+"""Latency statistics shared by the benchmarks."""
+
+
+def percentile(timings, fraction: float) -> float:
+    """Nearest-rank percentile of timings in seconds, in ms.
+
+    fraction is e.g. 0.5 for the median or 0.99 for p99.
+    """
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
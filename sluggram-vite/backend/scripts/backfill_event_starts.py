@@ -0,0 +1,67 @@
+"""One-off migration: parse legacy event date/time strings into event_starts_at.
+
+Streams event posts that have no `event_starts_at` yet and writes the start
+parsed from `event_date` and `event_time` (campus time, stored as UTC) in
+batches. Posts whose date can't be parsed get `event_starts_at: null` so a
+re-run skips them, and their ids are listed for manual cleanup.
+
+Run from the backend directory:
+
+    python -m scripts.backfill_event_starts --batch-size 500
+"""
+import argparse
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from app.config import get_settings
+from app.utils.events import parse_event_start
+
+settings = get_settings()
+
+
+async def backfill(db, batch_size: int):
+    cursor = db.posts.find(
+        {"type": "event", "event_starts_at": {"$exists": False}},
+        {"event_date": 1, "event_time": 1},
+    ).batch_size(batch_size)
+
+    ops = []
+    parsed = 0
+    unparsed = []
+    async for post in cursor:
+        starts_at = parse_event_start(post.get("event_date"), post.get("event_time"))
+        if starts_at is None:
+            unparsed.append(post)
+        else:
+            parsed += 1
+        ops.append(UpdateOne(
+            {"_id": post["_id"]},
+            {"$set": {"event_starts_at": starts_at}},
+        ))
+
+        if len(ops) >= batch_size:
+            await db.posts.bulk_write(ops, ordered=False)
+            ops = []
+            print(f"Backfilled {parsed} events, {len(unparsed)} unparseable")
+
+    if ops:
+        await db.posts.bulk_write(ops, ordered=False)
+    print(f"Done: backfilled {parsed} events, {len(unparsed)} unparseable")
+    for post in unparsed:
+        print(f"  {post['_id']}: date={post.get('event_date')!r} time={post.get('event_time')!r}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.mongodb_url)
+    try:
+        await backfill(client[settings.database_name], args.batch_size)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""One-off migration: index existing study groups by course and open seats.
+
+Streams study group posts that have no `course_key` yet and sets the
+normalized course, `member_count` and `has_space` in batches, then rebuilds
+the per-course counts in `course_counts` from scratch. Safe to re-run; run
+it while writes are quiet, since the rebuild replaces live counts.
+
+Run from the backend directory:
+
+    python -m scripts.backfill_study_groups --batch-size 500
+"""
+import argparse
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from app.config import get_settings
+from app.utils.study_groups import normalize_course
+
+settings = get_settings()
+
+
+async def backfill(db, batch_size: int):
+    cursor = db.posts.find(
+        {"type": "study", "course_key": {"$exists": False}},
+        {"course": 1, "members": 1, "max_members": 1},
+    ).batch_size(batch_size)
+
+    ops = []
+    posts = 0
+    async for post in cursor:
+        member_count = len(post.get("members", []))
+        max_members = post.get("max_members")
+        max_members = 10 if max_members is None else max_members
+        ops.append(UpdateOne(
+            {"_id": post["_id"]},
+            {
+                "$set": {
+                    "course_key": normalize_course(post.get("course")),
+                    "member_count": member_count,
+                    "has_space": member_count < max_members,
+                }
+            },
+        ))
+        posts += 1
+
+        if len(ops) >= batch_size:
+            await db.posts.bulk_write(ops, ordered=False)
+            ops = []
+            print(f"Backfilled {posts} study groups")
+
+    if ops:
+        await db.posts.bulk_write(ops, ordered=False)
+    print(f"Done: backfilled {posts} study groups")
+
+
+async def rebuild_course_counts(db):
+    await db.posts.aggregate([
+        {"$match": {"type": "study", "course_key": {"$ne": None}}},
+        {
+            "$group": {
+                "_id": "$course_key",
+                "groups": {"$sum": 1},
+                "open_groups": {"$sum": {"$cond": ["$has_space", 1, 0]}},
+            }
+        },
+        {"$out": "course_counts"},
+    ]).to_list(length=None)
+    courses = await db.course_counts.count_documents({})
+    print(f"Rebuilt counts for {courses} courses")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.mongodb_url)
+    try:
+        db = client[settings.database_name]
+        await backfill(db, args.batch_size)
+        await rebuild_course_counts(db)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
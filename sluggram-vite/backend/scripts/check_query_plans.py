@@ -0,0 +1,429 @@
+"""Check the query plan of every query shape the routers issue.
+
+Seeds a scratch database with benchmarks.dataset (indexes come from the
+registry in app/indexes.py, through connect_to_mongo), then runs explain()
+with execution stats on each shape below and flags:
+
+- COLLSCAN: the query reads the whole collection
+- SORT: results are sorted in memory instead of read in index order
+- a poor ratio of keys or documents examined to documents returned,
+  above `--max-ratio`
+
+Exits non-zero if any shape is flagged, so it can gate CI. When adding a
+query to a router, add its shape here; when a shape is flagged, fix the
+index in app/indexes.py or the query.
+
+Run from the backend directory against a local MongoDB:
+
+    python -m scripts.check_query_plans --posts 20000
+
+`--self-check` only checks the explain parser against PLAN_EXAMPLES and
+needs no MongoDB.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+# Queries examining fewer keys or documents than this are never flagged for
+# their examined ratio
+MIN_EXAMINED = 100
+
+
+def find(collection, filter, sort=None, limit=None, projection=None, allow=()):
+    command = {"find": collection, "filter": filter}
+    if sort:
+        command["sort"] = sort
+    if limit:
+        command["limit"] = limit
+    if projection:
+        command["projection"] = projection
+    return command, set(allow)
+
+
+def aggregate(collection, pipeline, allow=()):
+    return {"aggregate": collection, "pipeline": pipeline, "cursor": {}}, set(allow)
+
+
+def update(collection, filter, multi=False, allow=()):
+    # explain() plans the update without applying it. Writes return no
+    # documents, so only their plan is checked, not the examined ratio.
+    change = {"q": filter, "u": {"$set": {"updated_at": datetime.utcnow()}}, "multi": multi}
+    return {"update": collection, "updates": [change]}, {"RATIO", *allow}
+
+
+def delete(collection, filter, allow=()):
+    return {"delete": collection, "deletes": [{"q": filter, "limit": 0}]}, {"RATIO", *allow}
+
+
+def query_shapes(sample: dict) -> dict:
+    """Every query the routers and background tasks issue, with sample values."""
+    from app.routers.posts import POST_PROJECTION, summary_projection
+    from app.utils.pagination import after_cursor, encode_cursor
+    from app.utils.profiles import PROFILE_PROJECTION
+
+    now = datetime.utcnow()
+    post_id, user, viewer = sample["post_id"], sample["author_id"], sample["viewer"]
+    newest_first = {"created_at": -1, "_id": -1}
+    page = 51  # limit + 1 at the default page size
+    cursor = encode_cursor(now - timedelta(days=1), ObjectId())
+    course = {"type": "study", "course_key": sample["course_key"]}
+
+    def posts_page(name, query, field="created_at", direction=-1, cursor_value=None):
+        """The full and summary views of a page and the page after it."""
+        sort = {field: direction, "_id": direction}
+        next_cursor = encode_cursor(cursor_value, ObjectId()) if cursor_value else cursor
+        ranked = isinstance(cursor_value, float)
+        return {
+            name: find("posts", query, sort, page, {**POST_PROJECTION, field: 1}),
+            f"{name}, next page": find(
+                "posts",
+                after_cursor(query, next_cursor, field, direction, ranked=ranked),
+                sort,
+                page,
+            ),
+            f"{name}, summary": aggregate("posts", [
+                {"$match": query},
+                {"$sort": sort},
+                {"$limit": page},
+                {"$project": {**summary_projection(viewer), field: 1}},
+            ]),
+        }
+
+    return {
+        # posts router
+        **posts_page("feed", {}),
+        **posts_page("feed by type", {"type": "event"}),
+        **posts_page(
+            "trending", {"trending_score": {"$gt": 0}}, "trending_score", cursor_value=1.0
+        ),
+        **posts_page(
+            "trending by type",
+            {"trending_score": {"$gt": 0}, "type": "study"},
+            "trending_score",
+            cursor_value=1.0,
+        ),
+        **posts_page(
+            "upcoming events",
+            {"type": "event", "event_starts_at": {"$gte": now}},
+            "event_starts_at",
+            direction=1,
+            cursor_value=now + timedelta(days=1),
+        ),
+        **posts_page("study groups", {"type": "study"}),
+        **posts_page("study groups with space", {"type": "study", "has_space": True}),
+        **posts_page("study groups by course", {**course, "has_space": {"$in": [True, False]}}),
+        **posts_page("open study groups by course", {**course, "has_space": True}),
+        **posts_page("user's posts", {"author_id": user}),
+        "search": aggregate(
+            "posts",
+            [
+                {"$match": {"$text": {"$search": "midterm review"}}},
+                {"$addFields": {"rank": {"$meta": "textScore"}}},
+                {"$sort": {"rank": -1, "_id": -1}},
+                {"$limit": 21},
+            ],
+            # Ranked by text score, which no index is ordered by, so every
+            # match is read and sorted
+            allow={"SORT", "RATIO"},
+        ),
+        "single post": find("posts", {"_id": post_id}, limit=1, projection=POST_PROJECTION),
+        "batch posts": find("posts", {"_id": {"$in": sample["post_ids"]}}),
+        "like, comment, join": update("posts", {"_id": post_id}),
+        "delete post": delete("posts", {"_id": post_id}),
+        "comments page": find("comments", {"post_id": post_id}, newest_first, page),
+        "delete post's comments": delete("comments", {"post_id": post_id}),
+        "saved posts page": find(
+            "saves", {"user_id": viewer}, {"saved_at": -1, "_id": -1}, page,
+            {"post_id": 1, "saved_at": 1},
+        ),
+        "saved flags": find(
+            "saves",
+            {"user_id": viewer, "post_id": {"$in": sample["post_ids"]}},
+            projection={"post_id": 1, "_id": 0},
+        ),
+        "unsave": delete("saves", {"user_id": viewer, "post_id": post_id}),
+        "delete post's saves": delete("saves", {"post_id": post_id}),
+        "course facets": find(
+            "course_counts", {"groups": {"$gt": 0}}, {"_id": 1},
+            # One small document per course
+            allow={"COLLSCAN", "SORT"},
+        ),
+        # users router and author loader
+        "current user": find("users", {"auth0_id": user}, limit=1),
+        "user by id": find(
+            "users", {"$or": [{"_id": sample["user_oid"]}, {"auth0_id": user}]}, limit=1
+        ),
+        "batch users": find(
+            "users",
+            {
+                "$or": [
+                    {"_id": {"$in": [sample["user_oid"]]}},
+                    {"auth0_id": {"$in": sample["user_ids"]}},
+                ]
+            },
+        ),
+        "author profiles": find(
+            "users", {"auth0_id": {"$in": sample["user_ids"]}}, projection=PROFILE_PROJECTION
+        ),
+        # background tasks
+        "trending decay": update(
+            "posts",
+            {"trending_score": {"$gt": 0}, "trending_updated_at": {"$lt": now}},
+            multi=True,
+        ),
+        "image variants ready": update("posts", {"blob_ids": "0" * 64}, multi=True),
+        "blob by hash": find("blobs", {"_id": "0" * 64}, limit=1),
+    }
+
+
+def collect(node, key: str, found: list):
+    """Every value stored under `key` anywhere in an explain document."""
+    if isinstance(node, dict):
+        for name, value in node.items():
+            if name == key:
+                found.append(value)
+            elif name != "rejectedPlans":
+                collect(value, key, found)
+    elif isinstance(node, list):
+        for item in node:
+            collect(item, key, found)
+    return found
+
+
+def plan_problems(explain: dict, allow: set, max_ratio: float) -> tuple:
+    """A one-line plan summary and what is wrong with the plan, if anything."""
+    plans = collect(explain, "winningPlan", [])
+    stages, indexes = [], []
+    for plan in plans:
+        # Innermost stage first, i.e. in the order they run
+        stages += reversed(collect(plan, "stage", []))
+        indexes += collect(plan, "indexName", [])
+    # A $sort the pipeline couldn't push into the query sorts in memory too
+    if any("$sort" in stage for stage in explain.get("stages", [])):
+        stages.append("SORT")
+
+    stats = collect(explain, "executionStats", [])
+    keys = sum(s.get("totalKeysExamined", 0) for s in stats)
+    docs = sum(s.get("totalDocsExamined", 0) for s in stats)
+    returned = sum(s.get("nReturned", 0) for s in stats)
+
+    problems = []
+    for stage in ("COLLSCAN", "SORT"):
+        if stage in stages and stage not in allow:
+            problems.append("collection scan" if stage == "COLLSCAN" else "in-memory sort")
+    examined = max(keys, docs)
+    too_many = examined >= MIN_EXAMINED and examined > max_ratio * max(returned, 1)
+    if too_many and "RATIO" not in allow:
+        problems.append(f"examined {examined} to return {returned}")
+
+    summary = (
+        f"{' > '.join(dict.fromkeys(stages))} "
+        f"[{', '.join(dict.fromkeys(indexes)) or 'no index'}] "
+        f"keys {keys} docs {docs} returned {returned}"
+    )
+    return summary, problems
+
+
+def ixscan(index: str) -> dict:
+    return {"stage": "IXSCAN", "indexName": index, "direction": "forward"}
+
+
+def fetch(input_stage: dict) -> dict:
+    return {"stage": "FETCH", "inputStage": input_stage}
+
+
+def execution_stats(keys: int, docs: int, returned: int) -> dict:
+    return {"nReturned": returned, "totalKeysExamined": keys, "totalDocsExamined": docs}
+
+
+# Explain output in the shapes MongoDB returns it, reduced to the fields
+# plan_problems reads, with the problems each should be flagged for.
+# --self-check runs them, as does every full run, so the parser stays
+# pinned to the explain format.
+PLAN_EXAMPLES = {
+    "find, classic engine": (
+        {
+            "queryPlanner": {
+                "winningPlan": {
+                    "stage": "LIMIT",
+                    "inputStage": {
+                        "stage": "PROJECTION_SIMPLE",
+                        "inputStage": fetch(ixscan("type_1_created_at_-1__id_-1")),
+                    },
+                },
+                # Rejected plans never run, so their stages don't count
+                "rejectedPlans": [{"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}],
+            },
+            "executionStats": execution_stats(51, 51, 51),
+        },
+        set(),
+        [],
+    ),
+    "find, slot-based engine": (
+        {
+            "explainVersion": "2",
+            "queryPlanner": {
+                "winningPlan": {
+                    "queryPlan": {
+                        "stage": "SORT",
+                        "inputStage": {"stage": "COLLSCAN", "direction": "forward"},
+                    },
+                    "slotBasedPlan": {"slots": "...", "stages": "..."},
+                },
+                "rejectedPlans": [],
+            },
+            "executionStats": execution_stats(0, 20000, 51),
+        },
+        set(),
+        ["collection scan", "in-memory sort", "examined 20000 to return 51"],
+    ),
+    "aggregate, pushed down whole": (
+        {
+            "explainVersion": "2",
+            "queryPlanner": {
+                "winningPlan": {
+                    "queryPlan": {
+                        "stage": "PROJECTION_DEFAULT",
+                        "inputStage": {
+                            "stage": "LIMIT",
+                            "inputStage": fetch(ixscan("created_at_-1__id_-1")),
+                        },
+                    },
+                },
+                "rejectedPlans": [],
+            },
+            "executionStats": execution_stats(51, 51, 51),
+        },
+        set(),
+        [],
+    ),
+    "aggregate, $sort left in the pipeline": (
+        {
+            "explainVersion": "1",
+            "stages": [
+                {
+                    "$cursor": {
+                        "queryPlanner": {
+                            "winningPlan": fetch(ixscan("post_search")),
+                            "rejectedPlans": [],
+                        },
+                        "executionStats": execution_stats(640, 640, 640),
+                    }
+                },
+                {"$addFields": {"rank": {"$meta": "textScore"}}},
+                {"$sort": {"sortKey": {"rank": -1, "_id": -1}, "limit": 21}},
+            ],
+        },
+        set(),
+        ["in-memory sort"],
+    ),
+    "$or merged in index order": (
+        {
+            "queryPlanner": {
+                "winningPlan": {
+                    "stage": "LIMIT",
+                    "inputStage": fetch({
+                        "stage": "SORT_MERGE",
+                        "inputStages": [
+                            ixscan("created_at_-1__id_-1"),
+                            ixscan("created_at_-1__id_-1"),
+                        ],
+                    }),
+                },
+                "rejectedPlans": [],
+            },
+            "executionStats": execution_stats(52, 51, 51),
+        },
+        set(),
+        [],
+    ),
+    "update, examined ratio allowed": (
+        {
+            "queryPlanner": {
+                "winningPlan": {
+                    "stage": "UPDATE",
+                    "inputStage": fetch(ixscan("trending_score_-1__id_-1")),
+                },
+                "rejectedPlans": [],
+            },
+            "executionStats": execution_stats(5000, 5000, 0),
+        },
+        {"RATIO"},
+        [],
+    ),
+}
+
+
+def check_plan_parser(max_ratio: float):
+    """Exit if plan_problems misreads any of PLAN_EXAMPLES."""
+    for name, (explain, allow, expected) in PLAN_EXAMPLES.items():
+        summary, problems = plan_problems(explain, allow, max_ratio)
+        if problems != expected:
+            sys.exit(f"plan_problems misread {name!r}: {problems} from {summary}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--max-ratio", type=float, default=10)
+    parser.add_argument("--database", default="sluggram_query_plans")
+    parser.add_argument(
+        "--self-check", action="store_true",
+        help="only check the explain parser against PLAN_EXAMPLES; needs no MongoDB",
+    )
+    args = parser.parse_args()
+
+    check_plan_parser(args.max_ratio)
+    if args.self_check:
+        print(f"Explain parser reads all {len(PLAN_EXAMPLES)} examples correctly")
+        return
+
+    os.environ["DATABASE_NAME"] = args.database
+    from app.database import close_mongo_connection, connect_to_mongo, db
+    from benchmarks.dataset import seed, user_id
+
+    await connect_to_mongo()
+    failed = 0
+    try:
+        post_ids = await seed(db.db, args.posts, max(100, args.posts // 20))
+        viewer = user_id(0)
+        await db.db.saves.insert_many([
+            {"user_id": viewer, "post_id": post_id, "saved_at": datetime.utcnow()}
+            for post_id in post_ids[:300]
+        ])
+        study = await db.db.posts.find_one({"type": "study"}, {"course_key": 1})
+        user = await db.db.users.find_one({"auth0_id": user_id(1)})
+        sample = {
+            "post_id": post_ids[len(post_ids) // 2],
+            "post_ids": post_ids[:50],
+            "author_id": user_id(1),
+            "user_oid": user["_id"],
+            "user_ids": [user_id(i) for i in range(50)],
+            "viewer": viewer,
+            "course_key": study["course_key"],
+        }
+
+        for name, (command, allow) in query_shapes(sample).items():
+            explain = await db.db.command(
+                {"explain": command, "verbosity": "executionStats"}
+            )
+            summary, problems = plan_problems(explain, allow, args.max_ratio)
+            failed += bool(problems)
+            status = "FAIL" if problems else "ok"
+            print(f"{status:>4} {name}: {summary}")
+            for problem in problems:
+                print(f"       {problem}")
+    finally:
+        await db.client.drop_database(args.database)
+        await close_mongo_connection()
+
+    if failed:
+        sys.exit(f"{failed} query shapes need an index")
+    print("All query shapes use an index")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
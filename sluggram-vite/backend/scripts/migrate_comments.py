@@ -0,0 +1,89 @@
+"""One-off migration: move embedded post comments into the comments collection.
+
+Streams posts that have not been migrated yet (no `comment_count`), copies
+their embedded comments into `comments`, and trims each post down to the
+latest `comment_preview_size` comments plus a total count. Safe to re-run:
+comments keep their original ids, so duplicates are skipped.
+
+Posts that already have a count also get their preview copied. Before the
+comment route copied old embedded comments itself, commenting on an
+unmigrated post trimmed it without copying them; the preview is all that is
+left of those comments.
+
+Run from the backend directory:
+
+    python -m scripts.migrate_comments --batch-size 500
+"""
+import argparse
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import get_settings
+from app.utils.comments import comment_document
+
+settings = get_settings()
+
+
+async def flush(db, comment_ops, post_ops):
+    if comment_ops:
+        try:
+            await db.comments.bulk_write(comment_ops, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys mean an earlier run already copied the comment.
+            if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+                raise
+    # Only trim posts once their comments are safely copied.
+    if post_ops:
+        await db.posts.bulk_write(post_ops, ordered=False)
+
+
+async def migrate(db, batch_size: int):
+    preview_size = settings.comment_preview_size
+    cursor = db.posts.find(
+        {"$or": [{"comment_count": {"$exists": False}}, {"comments.0": {"$exists": True}}]},
+        {"comments": 1, "comment_count": 1},
+    ).batch_size(batch_size)
+
+    comment_ops, post_ops = [], []
+    posts = comments = previews = 0
+    async for post in cursor:
+        embedded = post.get("comments", [])
+        for comment in embedded:
+            comment_ops.append(InsertOne(comment_document(post["_id"], comment)))
+
+        if "comment_count" in post:
+            # Already trimmed; only its preview can be missing from comments
+            previews += 1
+        else:
+            preview = embedded[-preview_size:] if preview_size else []
+            post_ops.append(UpdateOne(
+                {"_id": post["_id"]},
+                {"$set": {"comments": preview, "comment_count": len(embedded)}},
+            ))
+            posts += 1
+            comments += len(embedded)
+
+        if len(post_ops) >= batch_size or len(comment_ops) >= batch_size:
+            await flush(db, comment_ops, post_ops)
+            comment_ops, post_ops = [], []
+            print(f"Migrated {posts} posts, {comments} comments; copied {previews} previews")
+
+    await flush(db, comment_ops, post_ops)
+    print(f"Done: migrated {posts} posts, {comments} comments; copied {previews} previews")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.mongodb_url)
+    try:
+        await migrate(client[settings.database_name], args.batch_size)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
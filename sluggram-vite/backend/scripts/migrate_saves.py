@@ -0,0 +1,102 @@
+"""One-off migration: move post saved_by arrays into the saves collection.
+
+Streams posts that still have a `saved_by` array, copies each entry into
+`saves` as a (user_id, post_id, saved_at) document, then sets the post's
+`save_count` from the saves collection and drops the array. Safe to re-run:
+the unique (user_id, post_id) index skips saves copied by an earlier run.
+
+The arrays don't record when each save happened, so migrated saves are
+dated at the post's creation time; "My saved posts" lists them after any
+save made since the deploy, newest post first.
+
+Run from the backend directory:
+
+    python -m scripts.migrate_saves --batch-size 500
+"""
+import argparse
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import get_settings
+from app.indexes import sync_indexes
+
+settings = get_settings()
+
+
+async def flush(db, save_ops, post_ids):
+    if save_ops:
+        try:
+            await db.saves.bulk_write(save_ops, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys mean the save already exists.
+            if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+                raise
+    if not post_ids:
+        return
+
+    # Count from the collection rather than the arrays, so saves made through
+    # the new endpoint while the migration runs are included.
+    counts = {
+        row["_id"]: row["count"]
+        async for row in db.saves.aggregate([
+            {"$match": {"post_id": {"$in": post_ids}}},
+            {"$group": {"_id": "$post_id", "count": {"$sum": 1}}},
+        ])
+    }
+    # Only drop the arrays once their saves are safely copied.
+    await db.posts.bulk_write(
+        [
+            UpdateOne(
+                {"_id": post_id},
+                {"$set": {"save_count": counts.get(post_id, 0)}, "$unset": {"saved_by": ""}},
+            )
+            for post_id in post_ids
+        ],
+        ordered=False,
+    )
+
+
+async def migrate(db, batch_size: int):
+    await sync_indexes(db, ["saves"])
+    cursor = db.posts.find(
+        {"saved_by": {"$exists": True}},
+        {"saved_by": 1, "created_at": 1},
+    ).batch_size(batch_size)
+
+    save_ops, post_ids = [], []
+    posts = saves = 0
+    async for post in cursor:
+        for user_id in dict.fromkeys(post.get("saved_by") or []):
+            save_ops.append(InsertOne({
+                "user_id": user_id,
+                "post_id": post["_id"],
+                "saved_at": post["created_at"],
+            }))
+            saves += 1
+        post_ids.append(post["_id"])
+        posts += 1
+
+        if len(post_ids) >= batch_size:
+            await flush(db, save_ops, post_ids)
+            save_ops, post_ids = [], []
+            print(f"Migrated {posts} posts, {saves} saves")
+
+    await flush(db, save_ops, post_ids)
+    print(f"Done: migrated {posts} posts, {saves} saves")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.mongodb_url)
+    try:
+        await migrate(client[settings.database_name], args.batch_size)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+"""Make the database's indexes match app/indexes.py.
+
+Builds missing indexes, rebuilds those whose definition changed and drops
+those no longer listed. The server itself only builds missing indexes on
+startup, so run this once after deploying a change that alters or removes
+an index, from one place rather than from every worker.
+
+Run from the backend directory:
+
+    python -m scripts.sync_indexes
+    python -m scripts.sync_indexes --collections posts saves
+"""
+import argparse
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import get_settings
+from app.indexes import INDEXES, sync_indexes
+
+settings = get_settings()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collections", nargs="+", choices=sorted(INDEXES))
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.mongodb_url)
+    try:
+        await sync_indexes(client[settings.database_name], args.collections)
+    finally:
+        client.close()
+    print("Indexes match app/indexes.py")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -294,7 +294,7 @@ export function ProfilePage() {
                       <p className="text-sm text-gray-600 mt-1 line-clamp-2">{post.content}</p>
                       <div className="flex items-center gap-4 mt-2 text-xs text-gray-400">
                         <span>{post.likes.length} likes</span>
-                        <span>{post.comments.length} comments</span>
+                        <span>{post.commentCount} comments</span>
                       </div>
                     </div>
                   </div>
@@ -1,16 +1,18 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { useAuth0 } from '@auth0/auth0-react';
 import { Layout } from './Layout';
-import { usePosts } from '../contexts/PostsContext';
+import { usePosts, type Comment } from '../contexts/PostsContext';
 import { AnimatedSlug } from './AnimatedSlug';
 import { VideoPlayer } from './VideoPlayer';
 
 export function ReelsPage() {
   const { user } = useAuth0();
-  const { posts, likePost, addComment, savedPosts, savePost } = usePosts();
+  const { posts, likePost, addComment, loadComments, savedPosts, savePost } = usePosts();
   const [currentReelIndex, setCurrentReelIndex] = useState(0);
   const [commentText, setCommentText] = useState('');
   const [showComments, setShowComments] = useState(false);
+  const [comments, setComments] = useState<Comment[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
   // Filter only reels
   const reels = posts.filter(post => post.type === 'reel');
@@ -27,6 +29,34 @@ export function ReelsPage() {
   const safeIndex = Math.min(currentReelIndex, Math.max(0, reels.length - 1));
   const currentReel = reels.length > 0 ? reels[safeIndex] : null;
 
+  // The reel only carries a preview of its comments; page the full list in
+  // when the panel opens, and reload it after a new comment
+  useEffect(() => {
+    if (!showComments || !currentReel) return;
+    let cancelled = false;
+    loadComments(currentReel.id)
+      .then(page => {
+        if (cancelled) return;
+        setComments(page.comments);
+        setNextCursor(page.nextCursor);
+      })
+      .catch(error => console.error('Failed to load comments:', error));
+    return () => {
+      cancelled = true;
+    };
+  }, [showComments, currentReel?.id, currentReel?.commentCount]);
+
+  const loadMoreComments = async () => {
+    if (!currentReel || !nextCursor) return;
+    try {
+      const page = await loadComments(currentReel.id, nextCursor);
+      setComments(prev => [...prev, ...page.comments]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Failed to load comments:', error);
+    }
+  };
+
   const handleComment = () => {
     if (commentText.trim() && currentReel) {
       addComment(currentReel.id, commentText);
@@ -37,17 +67,23 @@ export function ReelsPage() {
   const isLiked = currentReel ? currentReel.likes.includes(user?.sub || '') : false;
   const isSaved = currentReel ? savedPosts.includes(currentReel.id) : false;
 
+  const closeComments = () => {
+    setShowComments(false);
+    setComments([]);
+    setNextCursor(null);
+  };
+
   const goToNextReel = () => {
     if (safeIndex < reels.length - 1) {
       setCurrentReelIndex(safeIndex + 1);
-      setShowComments(false);
+      closeComments();
     }
   };
 
   const goToPrevReel = () => {
     if (safeIndex > 0) {
       setCurrentReelIndex(safeIndex - 1);
-      setShowComments(false);
+      closeComments();
     }
   };
 
@@ -168,13 +204,13 @@ export function ReelsPage() {
             </button>
 
             <button
-              onClick={() => setShowComments(!showComments)}
+              onClick={() => (showComments ? closeComments() : setShowComments(true))}
               className="flex flex-col items-center gap-1"
             >
               <svg className="w-8 h-8 text-white" fill="none" stroke="currentColor" strokeWidth={2} viewBox="0 0 24 24">
                 <path strokeLinecap="round" strokeLinejoin="round" d="M12 20.25c4.97 0 9-3.694 9-8.25s-4.03-8.25-9-8.25S3 7.444 3 12c0 2.104.859 4.023 2.273 5.48.432.447.74 1.04.586 1.641a4.483 4.483 0 01-.923 1.785A5.969 5.969 0 006 21c1.282 0 2.47-.402 3.445-1.087.81.22 1.668.337 2.555.337z" />
               </svg>
-              <span className="text-white text-xs">{currentReel.comments.length}</span>
+              <span className="text-white text-xs">{currentReel.commentCount}</span>
             </button>
 
             <button
@@ -198,18 +234,18 @@ export function ReelsPage() {
             <div className="absolute inset-x-0 bottom-0 bg-white rounded-t-2xl p-4 max-h-[60%] overflow-y-auto">
               <div className="flex items-center justify-between mb-4">
                 <h3 className="font-bold text-gray-900">Comments</h3>
-                <button onClick={() => setShowComments(false)} className="text-gray-500">
+                <button onClick={closeComments} className="text-gray-500">
                   <svg className="w-6 h-6" fill="none" stroke="currentColor" strokeWidth={2} viewBox="0 0 24 24">
                     <path strokeLinecap="round" strokeLinejoin="round" d="M6 18L18 6M6 6l12 12" />
                   </svg>
                 </button>
               </div>
 
-              {currentReel.comments.length === 0 ? (
+              {comments.length === 0 ? (
                 <p className="text-gray-500 text-center py-4">No comments yet. Be the first!</p>
               ) : (
                 <div className="space-y-3 mb-4">
-                  {currentReel.comments.map(comment => (
+                  {comments.map(comment => (
                     <div key={comment.id} className="flex gap-2">
                       <div className="w-8 h-8 rounded-full bg-gray-200 flex items-center justify-center text-xs font-bold text-gray-600">
                         {comment.authorName?.[0] || 'U'}
@@ -223,6 +259,14 @@ export function ReelsPage() {
                       </div>
                     </div>
                   ))}
+                  {nextCursor && (
+                    <button
+                      onClick={loadMoreComments}
+                      className="w-full text-sm text-ucsc-blue font-medium py-1 hover:underline"
+                    >
+                      Load more comments
+                    </button>
+                  )}
                 </div>
               )}
 
@@ -1,6 +1,6 @@
 import { createContext, useContext, useState, useEffect, type ReactNode } from 'react';
 import { useAuth0 } from '@auth0/auth0-react';
-import { api, type Post as ApiPost, type PostCreate } from '../lib/api';
+import { api, type Comment as ApiComment, type Post as ApiPost, type PostCreate } from '../lib/api';
 
 export interface Post {
   id: string;
@@ -13,7 +13,9 @@ export interface Post {
   videoUrl?: string;
   timestamp: number;
   likes: string[];
+  // Only the latest few comments; commentCount is the total
   comments: Comment[];
+  commentCount: number;
   // Event-specific fields
   eventTitle?: string;
   eventDate?: string;
@@ -36,13 +38,19 @@ export interface Comment {
   timestamp: number;
 }
 
+export interface CommentPage {
+  comments: Comment[];
+  nextCursor: string | null;
+}
+
 interface PostsContextType {
   posts: Post[];
   savedPosts: string[];
   loading: boolean;
-  addPost: (post: Omit<Post, 'id' | 'timestamp' | 'likes' | 'comments' | 'authorId' | 'authorName' | 'authorAvatar'>) => Promise<void>;
+  addPost: (post: Omit<Post, 'id' | 'timestamp' | 'likes' | 'comments' | 'commentCount' | 'authorId' | 'authorName' | 'authorAvatar'>) => Promise<void>;
   likePost: (postId: string) => Promise<void>;
   addComment: (postId: string, text: string) => Promise<void>;
+  loadComments: (postId: string, cursor?: string | null) => Promise<CommentPage>;
   joinStudyGroup: (postId: string) => Promise<void>;
   savePost: (postId: string) => Promise<void>;
   refreshPosts: () => Promise<void>;
@@ -50,6 +58,16 @@ interface PostsContextType {
 
 const PostsContext = createContext<PostsContextType | null>(null);
 
+function convertComment(c: ApiComment): Comment {
+  return {
+    id: c.id,
+    authorId: c.author_id,
+    authorName: c.author_name,
+    text: c.text,
+    timestamp: new Date(c.created_at).getTime(),
+  };
+}
+
 // Convert API post to frontend format
 function convertPost(apiPost: ApiPost): Post {
   return {
@@ -63,13 +81,8 @@ function convertPost(apiPost: ApiPost): Post {
     videoUrl: apiPost.video_url,
     timestamp: new Date(apiPost.created_at).getTime(),
     likes: apiPost.likes,
-    comments: apiPost.comments.map(c => ({
-      id: c.id,
-      authorId: c.author_id,
-      authorName: c.author_name,
-      text: c.text,
-      timestamp: new Date(c.created_at).getTime(),
-    })),
+    comments: apiPost.comments.map(convertComment),
+    commentCount: apiPost.comment_count,
     eventTitle: apiPost.event_title,
     eventDate: apiPost.event_date,
     eventTime: apiPost.event_time,
@@ -83,6 +96,11 @@ function convertPost(apiPost: ApiPost): Post {
   };
 }
 
+// localStorage posts keep every comment, and older ones have no commentCount
+function parseStoredPosts(stored: string): Post[] {
+  return JSON.parse(stored).map((post: Post) => ({ ...post, commentCount: post.comments.length }));
+}
+
 // Sample posts for when backend is not available
 const samplePosts: Post[] = [
   {
@@ -97,6 +115,7 @@ const samplePosts: Post[] = [
     comments: [
       { id: 'c1', authorId: 'user2', authorName: 'alex_cs26', text: 'Amazing view!', timestamp: Date.now() - 1000 * 60 * 30 }
     ],
+    commentCount: 1,
   },
   {
     id: '2',
@@ -107,6 +126,7 @@ const samplePosts: Post[] = [
     timestamp: Date.now() - 1000 * 60 * 60 * 5,
     likes: ['user1'],
     comments: [],
+    commentCount: 0,
     eventTitle: 'UCSC Winter Career Fair',
     eventDate: '2026-01-25',
     eventTime: '10:00',
@@ -121,6 +141,7 @@ const samplePosts: Post[] = [
     timestamp: Date.now() - 1000 * 60 * 60 * 24,
     likes: [],
     comments: [],
+    commentCount: 0,
     groupName: 'Organic Chemistry Study Group',
     course: 'CHEM 108A',
     meetingTime: 'Mondays & Wednesdays, 4 PM',
@@ -138,6 +159,7 @@ const samplePosts: Post[] = [
     timestamp: Date.now() - 1000 * 60 * 60 * 3,
     likes: ['user2', 'user4'],
     comments: [],
+    commentCount: 0,
   },
 ];
 
@@ -184,7 +206,7 @@ export function PostsProvider({ children }: { children: ReactNode }) {
         // Fallback to localStorage
         const storedPosts = localStorage.getItem('sluggram_posts');
         if (storedPosts) {
-          setPosts(JSON.parse(storedPosts));
+          setPosts(parseStoredPosts(storedPosts));
         } else {
           setPosts(samplePosts);
           localStorage.setItem('sluggram_posts', JSON.stringify(samplePosts));
@@ -202,7 +224,7 @@ export function PostsProvider({ children }: { children: ReactNode }) {
       // Load from localStorage
       const storedPosts = localStorage.getItem('sluggram_posts');
       if (storedPosts) {
-        setPosts(JSON.parse(storedPosts));
+        setPosts(parseStoredPosts(storedPosts));
       } else {
         setPosts(samplePosts);
       }
@@ -223,7 +245,7 @@ export function PostsProvider({ children }: { children: ReactNode }) {
     }
   }, [posts, useLocalStorage]);
 
-  const addPost = async (postData: Omit<Post, 'id' | 'timestamp' | 'likes' | 'comments' | 'authorId' | 'authorName' | 'authorAvatar'>) => {
+  const addPost = async (postData: Omit<Post, 'id' | 'timestamp' | 'likes' | 'comments' | 'commentCount' | 'authorId' | 'authorName' | 'authorAvatar'>) => {
     if (!useLocalStorage) {
       try {
         const createData: PostCreate = {
@@ -267,6 +289,7 @@ export function PostsProvider({ children }: { children: ReactNode }) {
       timestamp: Date.now(),
       likes: [],
       comments: [],
+    commentCount: 0,
       members: postData.type === 'study' ? [user?.sub || 'anonymous'] : undefined,
     };
 
@@ -336,12 +359,25 @@ export function PostsProvider({ children }: { children: ReactNode }) {
     setPosts(prev =>
       prev.map(post =>
         post.id === postId
-          ? { ...post, comments: [...post.comments, newComment] }
+          ? { ...post, comments: [...post.comments, newComment], commentCount: post.comments.length + 1 }
           : post
       )
     );
   };
 
+  // The post only carries a preview; the full list is paged from the API,
+  // newest first
+  const loadComments = async (postId: string, cursor?: string | null): Promise<CommentPage> => {
+    if (!useLocalStorage) {
+      const page = await api.getComments(postId, cursor);
+      return { comments: page.items.map(convertComment), nextCursor: page.nextCursor };
+    }
+
+    // localStorage posts keep every comment
+    const post = posts.find(p => p.id === postId);
+    return { comments: post ? [...post.comments].reverse() : [], nextCursor: null };
+  };
+
   const joinStudyGroup = async (postId: string) => {
     if (!useLocalStorage) {
       try {
@@ -399,7 +435,7 @@ export function PostsProvider({ children }: { children: ReactNode }) {
   };
 
   return (
-    <PostsContext.Provider value={{ posts, savedPosts, loading, addPost, likePost, addComment, joinStudyGroup, savePost, refreshPosts }}>
+    <PostsContext.Provider value={{ posts, savedPosts, loading, addPost, likePost, addComment, loadComments, joinStudyGroup, savePost, refreshPosts }}>
       {children}
     </PostsContext.Provider>
   );
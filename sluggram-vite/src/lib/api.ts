@@ -7,10 +7,7 @@ class ApiClient {
     this.token = token;
   }
 
-  private async request<T>(
-    endpoint: string,
-    options: RequestInit = {}
-  ): Promise<T> {
+  private async send(endpoint: string, options: RequestInit = {}): Promise<Response> {
     const headers: HeadersInit = {
       'Content-Type': 'application/json',
       ...options.headers,
@@ -30,6 +27,15 @@ class ApiClient {
       throw new Error(error.detail || `HTTP error ${response.status}`);
     }
 
+    return response;
+  }
+
+  private async request<T>(
+    endpoint: string,
+    options: RequestInit = {}
+  ): Promise<T> {
+    const response = await this.send(endpoint, options);
+
     if (response.status === 204) {
       return null as T;
     }
@@ -37,6 +43,15 @@ class ApiClient {
     return response.json();
   }
 
+  // Cursor-paged lists send the next page's cursor in a header
+  private async requestPage<T>(endpoint: string): Promise<Page<T>> {
+    const response = await this.send(endpoint);
+    return {
+      items: await response.json(),
+      nextCursor: response.headers.get('X-Next-Cursor'),
+    };
+  }
+
   // User endpoints
   async getCurrentUser() {
     return this.request<User>('/users/me');
@@ -81,6 +96,11 @@ class ApiClient {
     });
   }
 
+  async getComments(postId: string, cursor?: string | null) {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    return this.requestPage<Comment>(`/posts/${postId}/comments${query}`);
+  }
+
   async savePost(postId: string) {
     return this.request<Post>(`/posts/${postId}/save`, {
       method: 'POST',
@@ -180,6 +200,11 @@ export interface Comment {
   created_at: string;
 }
 
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
 export interface Post {
   id: string;
   type: 'general' | 'event' | 'study' | 'reel';
@@ -191,8 +216,8 @@ export interface Post {
   video_url?: string;
   likes: string[];
   comments: Comment[];
+  comment_count: number;
   members: string[];
-  saved_by: string[];
   created_at: string;
   // Event fields
   event_title?: string;